@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI giriş noktası (production, uvicorn worker'ları)
+    GATEWAY_SERVER_MODE=asgi gunicorn -c gunicorn.conf.py asgi:app
+
+Flask uygulaması asgiref WsgiToAsgi ile sarılır; blocking Mongo/Redis
+çağrıları asgiref thread pool'unda çalışır (ASGI_THREADS ile boyutlanır).
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from wsgi import app as wsgi_app
+
+app = WsgiToAsgi(wsgi_app)
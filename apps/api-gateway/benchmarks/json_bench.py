@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON response benchmark
+Büyük liste yanıtlarında eski yol (str(_id) döngüsü + stdlib json, Flask
+default provider davranışı) ile FastJSONProvider'ı karşılaştırır.
+
+Kullanım:
+    python benchmarks/json_bench.py
+    python benchmarks/json_bench.py --sizes 100,1000,10000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.shared.json_provider import dumps, orjson, raw_json  # noqa: E402
+
+
+def make_documents(count):
+    """scheduled_content benzeri Mongo dokümanları"""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": f"user-{i % 50}",
+            "title": f"Maç özeti #{i} — Galatasaray",
+            "platforms": ["tiktok", "instagram", "youtube"],
+            "status": "scheduled",
+            "scheduled_time": now + timedelta(minutes=i),
+            "created_at": now,
+            "metrics": {"views": i * 17, "likes": i * 3, "ctr": 0.042},
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_encode(documents):
+    """Eski yol: doküman başına str(_id), stdlib json, sort_keys (Flask default)"""
+    for doc in documents:
+        doc["_id"] = str(doc["_id"])
+
+    def default(obj):
+        if isinstance(obj, datetime):
+            return format_datetime(obj)  # Flask DefaultJSONProvider: HTTP date
+        raise TypeError(type(obj).__name__)
+
+    payload = {"success": True, "data": documents, "timestamp": datetime.utcnow().isoformat()}
+    return json.dumps(payload, default=default, sort_keys=True).encode("utf-8")
+
+
+def fast_encode(documents):
+    """Yeni yol: dokümanlar olduğu gibi provider'a"""
+    return dumps({"success": True, "data": documents, "timestamp": datetime.utcnow()})
+
+
+def measure(encode, make, repeat):
+    samples = []
+    for _ in range(repeat):
+        documents = make()
+        started = time.perf_counter()
+        body = encode(documents)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON response benchmark")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        documents = make_documents(size)
+        make = lambda: [dict(doc) for doc in documents]  # noqa: E731
+        legacy_ms, legacy_bytes = measure(legacy_encode, make, args.repeat)
+        fast_ms, fast_bytes = measure(fast_encode, make, args.repeat)
+
+        # Cache'ten gelen hazır payload: encode maliyeti yalnızca zarf
+        cached = fast_encode(make())
+        passthrough_ms, _ = measure(
+            lambda _: dumps({"success": True, "data": raw_json(cached)}), make, args.repeat
+        )
+
+        print(
+            f"{size:>7} docs  legacy {legacy_ms:8.2f} ms ({legacy_bytes / 1024:,.0f} KiB)  "
+            f"fast {fast_ms:8.2f} ms ({fast_bytes / 1024:,.0f} KiB)  "
+            f"x{legacy_ms / max(fast_ms, 1e-6):.1f}  raw passthrough {passthrough_ms:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
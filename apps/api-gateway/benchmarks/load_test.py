@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP load test
+Keep-alive bağlantılarla N eşzamanlı istemci çalıştırır; RPS, hata oranı
+ve p50/p95/p99 gecikmeyi raporlar. README'deki throughput sayıları bu
+script ile üretilir.
+
+Kullanım:
+    gunicorn -c gunicorn.conf.py wsgi:app
+    python benchmarks/load_test.py --url http://localhost:5000/health
+    python benchmarks/load_test.py --url http://localhost:5000/api/info \\
+        --concurrency 64 --duration 30 --header "Authorization: Bearer <token>"
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def worker(url, headers, deadline, samples, errors, lock):
+    """Tek keep-alive bağlantı üzerinden deadline'a kadar istek at"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    conn_cls = (
+        http.client.HTTPSConnection
+        if parts.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    conn = conn_cls(parts.netloc, timeout=30)
+    local_samples, local_errors = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                local_errors += 1
+            local_samples.append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = conn_cls(parts.netloc, timeout=30)
+    conn.close()
+    with lock:
+        samples.extend(local_samples)
+        errors[0] += local_errors
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * q))
+    return sorted_samples[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API gateway load test")
+    parser.add_argument("--url", default="http://localhost:5000/health")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--header", action="append", default=[])
+    args = parser.parse_args()
+
+    headers = {"Connection": "keep-alive"}
+    for header in args.header:
+        name, _, value = header.partition(":")
+        headers[name.strip()] = value.strip()
+
+    # Warmup: worker'lar bağlantı havuzlarını doldursun
+    if args.warmup > 0:
+        worker(args.url, headers, time.perf_counter() + args.warmup, [], [0], threading.Lock())
+
+    samples, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(
+            target=worker, args=(args.url, headers, deadline, samples, errors, lock)
+        )
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    total = len(samples) + errors[0]
+    print(f"url          {args.url}")
+    print(f"concurrency  {args.concurrency}")
+    print(f"requests     {total} in {elapsed:.1f}s")
+    print(f"rps          {len(samples) / elapsed:,.0f}")
+    print(f"errors       {errors[0]} ({errors[0] / max(total, 1):.2%})")
+    if samples:
+        print(f"mean         {statistics.fmean(samples):.2f} ms")
+        print(f"p50          {percentile(samples, 0.50):.2f} ms")
+        print(f"p95          {percentile(samples, 0.95):.2f} ms")
+        print(f"p99          {percentile(samples, 0.99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging benchmark
+Simüle edilmiş request handler'ında logging'in p99 gecikmedeki payını ölçer:
+
+    none    logging yok (baseline)
+    before  5 senkron dosya sink'i, substring filter'lar, istek başına 4 satır
+    after   kuyruklu (enqueue) sink'ler, channel filter'ları, istek başına
+            tek örneklenmiş access satırı
+
+Kullanım:
+    python benchmarks/logging_bench.py
+    python benchmarks/logging_bench.py --requests 20000 --threads 8 --sample-rate 0.1
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from loguru import logger
+
+FORMAT = (
+    "<level>[{time:YYYY-MM-DD HH:mm:ss.SSS}]</level> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+
+def configure(mode, log_dir):
+    """logging_setup.setup_logging'in eski/yeni sink düzeni"""
+    logger.remove()
+    if mode == "none":
+        return
+    enqueue = mode == "after"
+    console = open(os.devnull, "w")
+
+    def by_channel(*channels):
+        return lambda record: record["extra"].get("channel") in channels
+
+    def by_substring(text):
+        return lambda record: text in record["message"]
+
+    logger.add(console, format=FORMAT, level="INFO", enqueue=enqueue)
+    logger.add(
+        os.path.join(log_dir, "api_gateway.log"),
+        format=FORMAT,
+        level="INFO",
+        enqueue=enqueue,
+        filter=(lambda r: r["extra"].get("channel") != "access") if enqueue else None,
+    )
+    if enqueue:
+        logger.add(
+            os.path.join(log_dir, "access.log"),
+            format=FORMAT,
+            level="INFO",
+            enqueue=True,
+            filter=by_channel("access"),
+        )
+    logger.add(os.path.join(log_dir, "errors.log"), format=FORMAT, level="ERROR", enqueue=enqueue)
+    logger.add(
+        os.path.join(log_dir, "performance.log"),
+        format=FORMAT,
+        level="INFO",
+        enqueue=enqueue,
+        filter=by_channel("perf") if enqueue else by_substring("PERF:"),
+    )
+    logger.add(
+        os.path.join(log_dir, "audit.log"),
+        format=FORMAT,
+        level="INFO",
+        enqueue=enqueue,
+        filter=by_channel("audit") if enqueue else by_substring("AUDIT:"),
+    )
+
+
+def handler_work(work_us):
+    """View'in kendi işi (CPU)"""
+    deadline = time.perf_counter() + work_us / 1_000_000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def run(mode, requests, threads, work_us, sample_rate, error_rate):
+    access = logger.bind(channel="access")
+    samples = []
+    lock = threading.Lock()
+    per_thread = requests // threads
+
+    def worker():
+        local = []
+        for i in range(per_thread):
+            started = time.perf_counter()
+            status = 500 if random.random() < error_rate else 200
+            if mode == "before":
+                # setup_middleware + main_v2 before/after satırları
+                logger.info(f"📥 GET /api/video/{i}")
+                logger.info(f"→ GET /api/video/{i} | Remote: 127.0.0.1 | ID: req-{i}")
+            handler_work(work_us)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if mode == "before":
+                logger.info(f"← {status} GET /api/video/{i} | Duration: {duration_ms:.1f}ms | ID: req-{i}")
+                logger.info(f"📤 GET /api/video/{i} - {status} ({duration_ms / 1000:.3f}s)")
+            elif mode == "after":
+                if status >= 500:
+                    access.error("{} GET /api/video/{} {:.1f}ms", status, i, duration_ms)
+                elif random.random() < sample_rate:
+                    access.info("{} GET /api/video/{} {:.1f}ms", status, i, duration_ms)
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    logger.complete()
+    samples.sort()
+    return {
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99)],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--work-us", type=float, default=300)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in ("none", "before", "after"):
+            configure(mode, log_dir)
+            results[mode] = run(
+                mode, args.requests, args.threads, args.work_us, args.sample_rate, args.error_rate
+            )
+        logger.remove()
+
+    baseline = results["none"]["p99"]
+    for mode, stats in results.items():
+        share = (stats["p99"] - baseline) / stats["p99"] if stats["p99"] else 0
+        print(
+            f"{mode:<7} p50 {stats['p50']:7.3f} ms  p99 {stats['p99']:7.3f} ms  "
+            f"mean {stats['mean']:7.3f} ms  logging share of p99 {max(share, 0):6.1%}"
+        )
+    logger.add(sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
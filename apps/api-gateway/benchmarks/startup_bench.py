@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark
+Her servis giriş noktası için taze bir interpreter'da import süresini,
+time-to-first-request'i (process başlangıcından ilk /health yanıtına)
+ve `-X importtime` ile en pahalı import'ları ölçer.
+
+Kullanım:
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --entry main --entry main_v2 --runs 5 --top 15
+    python benchmarks/startup_bench.py --init --json startup.json   # create_app() dahil (Mongo/Redis gerekir)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+ENTRY_POINTS = ["main", "main_v2", "main_simple"]
+
+# Child process: import -> (opsiyonel create_app) -> ilk istek
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+module = __import__({module!r})
+imported = time.perf_counter()
+app = module.create_app() if {init!r} and hasattr(module, "create_app") else module.app
+initialized = time.perf_counter()
+status = app.test_client().get("/health").status_code
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "init_ms": (initialized - imported) * 1000,
+    "first_request_ms": (done - initialized) * 1000,
+    "status": status,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def probe(module, init):
+    """Taze interpreter'da giriş noktasını yükle ve ilk isteği at"""
+    code = PROBE.format(module=module, init=init)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["time_to_first_request_ms"] = wall_ms
+    return sample
+
+
+def import_profile(module, top):
+    """-X importtime çıktısından top-level paket bazında toplam self süre (ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition(":")
+        self_us, _, name = (part.strip() for part in rest.split("|"))
+        # Self süreler toplanır; cumulative iç içe import'ları iki kez sayar
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1000
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway startup benchmark")
+    parser.add_argument("--entry", action="append", help="Modül adı (tekrarlanabilir)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--init", action="store_true", help="create_app() dahil et")
+    parser.add_argument("--json", help="Sonuçları dosyaya yaz (trend takibi için)")
+    args = parser.parse_args()
+
+    report = {}
+    for module in args.entry or ENTRY_POINTS:
+        try:
+            samples = [probe(module, args.init) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:<14} FAILED: {e}")
+            report[module] = {"error": str(e)}
+            continue
+        summary = {
+            key: statistics.median(sample[key] for sample in samples)
+            for key in ("import_ms", "init_ms", "first_request_ms", "time_to_first_request_ms")
+        }
+        summary["modules"] = samples[-1]["modules"]
+        summary["status"] = samples[-1]["status"]
+        summary["top_imports_ms"] = import_profile(module, args.top)
+        report[module] = summary
+
+        print(
+            f"{module:<14} import {summary['import_ms']:8.1f} ms  "
+            f"init {summary['init_ms']:8.1f} ms  "
+            f"first request {summary['first_request_ms']:6.1f} ms  "
+            f"TTFR {summary['time_to_first_request_ms']:8.1f} ms  "
+            f"({summary['modules']} modules, /health {summary['status']})"
+        )
+        for package, ms in summary["top_imports_ms"]:
+            print(f"    {package:<28} {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trending benchmark
+Farklı katalog büyüklüklerinde top-N okuma gecikmesini ölçer;
+ZREVRANGE O(log N + M) olduğundan gecikme katalogla neredeyse sabit kalmalı
+
+Kullanım:
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/trending_bench.py
+    python benchmarks/trending_bench.py --sizes 1000,100000,1000000 --reads 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.shared.trending import EPOCHS_KEY, TrendingEngine, trending_key  # noqa: E402
+
+BENCH_WINDOW = "bench"
+
+
+def populate(client, engine, size, batch=1000):
+    """size adet videoya rastgele skor yaz (record ile, gerçek yol)"""
+    for start in range(0, size, batch):
+        weights = {
+            f"video-{i}": random.uniform(1, 100)
+            for i in range(start, min(start + batch, size))
+        }
+        engine.record(weights, {})
+
+
+def measure(engine, reads, limit):
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        engine.top(BENCH_WINDOW, limit=limit)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def cleanup(client):
+    key = trending_key(BENCH_WINDOW)
+    client.unlink(key)
+    client.hdel(EPOCHS_KEY, key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trending benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    client = redis.from_url(
+        os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True
+    )
+    client.ping()
+    engine = TrendingEngine(client, half_lives={BENCH_WINDOW: 86400})
+
+    print(f"top-{args.limit} okuma, {args.reads} tekrar")
+    print(f"{'katalog':>10} {'p50 µs':>10} {'p99 µs':>10} {'compact ms':>12}")
+    print("-" * 46)
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            cleanup(client)
+            populate(client, engine, size)
+            result = measure(engine, args.reads, args.limit)
+            started = time.perf_counter()
+            engine.compact()
+            compact_ms = (time.perf_counter() - started) * 1000
+            print(f"{size:>10} {result['p50']:>10.1f} {result['p99']:>10.1f} {compact_ms:>12.1f}")
+    finally:
+        cleanup(client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Gunicorn production ayarları (env ile override edilir)
+
+    gunicorn -c gunicorn.conf.py wsgi:app                            # prefork WSGI
+    GATEWAY_SERVER_MODE=asgi gunicorn -c gunicorn.conf.py asgi:app   # uvicorn worker
+
+Uygulama master'da preload edilir (blueprint'ler, config, rate limit planları);
+her worker fork sonrası kendi MongoClient ve Redis bağlantılarını açar.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+SERVER_MODE = os.getenv("GATEWAY_SERVER_MODE", "wsgi").lower()
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_class = (
+    "uvicorn.workers.UvicornWorker" if SERVER_MODE == "asgi" else "gthread"
+)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Keep-alive ve worker recycle (bellek sızıntılarına karşı, jitter ile kademeli)
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Prometheus multiprocess: prometheus_client import edilmeden önce ayarlanmalı
+# (config, preload'dan önce yüklenir). /metrics tüm worker'ları toplar.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc"
+)
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Önceki çalıştırmadan kalan metric dosyalarını temizle"""
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Ölen/recycle edilen worker'ın live gauge'larını düşür"""
+    from src.shared.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """Master'dan kopyalanan Mongo/Redis bağlantılarını worker'da yenile"""
+    if preload_app:
+        from src.shared.lifecycle import post_fork_reinit
+
+        post_fork_reinit()
@@ -5,6 +5,7 @@ Ultrarslanoglu API Gateway
 Tüm mikroservisleri tek çatı altında toplayan merkezi API
 """
 
+import importlib
 import json
 import logging
 import os
@@ -13,33 +14,33 @@ from dotenv import load_dotenv
 from flask import Flask, jsonify
 from flask_cors import CORS
 from loguru import logger
-from src.modules.ai_editor import ai_editor_bp
-from src.modules.analytics import analytics_bp
-
-# Modüller
-from src.modules.auth import auth_bp
-from src.modules.automation import automation_bp
-from src.modules.brand_kit import brand_kit_bp
-from src.modules.iot import iot_bp
-from src.modules.scheduler import scheduler_bp
-from src.modules.video import video_bp
-from src.shared.auth import init_auth
-from src.shared.celery_app import init_celery
-
-# Shared utilities
-from src.shared.database import init_database
-from src.shared.middleware import setup_middleware
+from src.shared.http_cache import http_cache
+from src.shared.json_provider import init_json
+
+# Modüller (module, blueprint, url_prefix) - create_app() içinde import edilir;
+# `import main` celery/pymongo/redis/paho yüklemez ve servis bağlantısı açmaz
+BLUEPRINTS = [
+    ("src.modules.auth", "auth_bp", "/api/auth"),
+    ("src.modules.video", "video_bp", "/api/video"),
+    ("src.modules.ai_editor", "ai_editor_bp", "/api/ai-editor"),
+    ("src.modules.analytics", "analytics_bp", "/api/analytics"),
+    ("src.modules.automation", "automation_bp", "/api/automation"),
+    ("src.modules.brand_kit", "brand_kit_bp", "/api/brand"),
+    ("src.modules.scheduler", "scheduler_bp", "/api/scheduler"),
+    ("src.modules.iot", "iot_bp", "/api/iot"),
+]
 
 # Environment variables
 load_dotenv()
 
 # Flask app
 app = Flask(__name__)
+init_json(app)
 CORS(app)
 
 # Loglama
 os.makedirs("logs", exist_ok=True)
-logger.add("logs/api_gateway.log", rotation="500 MB")
+logger.add("logs/api_gateway.log", rotation="500 MB", enqueue=True)
 logger.info("🚀 Ultrarslanoglu API Gateway başlatılıyor...")
 
 
@@ -63,15 +64,13 @@ def setup_logging(config):
 
 
 def register_blueprints(app):
-    """Blueprint'leri kaydet"""
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
-    app.register_blueprint(video_bp, url_prefix="/api/video")
-    app.register_blueprint(ai_editor_bp, url_prefix="/api/ai-editor")
-    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
-    app.register_blueprint(automation_bp, url_prefix="/api/automation")
-    app.register_blueprint(brand_kit_bp, url_prefix="/api/brand")
-    app.register_blueprint(scheduler_bp, url_prefix="/api/scheduler")
-    app.register_blueprint(iot_bp, url_prefix="/api/iot")
+    """Blueprint'leri import et ve kaydet"""
+    from src.shared.rate_limiter import compile_rate_limit_plans
+
+    for module_name, attr, url_prefix in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(module_name), attr)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    compile_rate_limit_plans(app)
     logger.info("✅ Tüm modüller yüklendi")
 
 
@@ -98,9 +97,9 @@ def health():
 
 
 @app.route("/api/info", methods=["GET"])
+@http_cache(max_age=300, stale_while_revalidate=3600)
 def info():
     """API bilgileri"""
-    config = load_config()
     return jsonify(
         {
             "name": "Ultrarslanoglu API Gateway",
@@ -133,8 +132,31 @@ def internal_error(error):
     return jsonify({"error": "Sunucu hatası"}), 500
 
 
-def main():
-    """Ana fonksiyon"""
+_initialized = False
+
+
+def create_app():
+    """
+    Uygulamayı başlat ve döndür (idempotent)
+    Gunicorn/uvicorn wsgi.py/asgi.py üzerinden master'da bir kez çağırır;
+    worker'lar fork sonrası src.shared.lifecycle ile bağlantıları yeniler.
+    """
+    global _initialized
+    if _initialized:
+        return app
+
+    # Init hook'ları: ağır import'lar ve bağlantılar burada
+    from src.shared.auth import init_auth
+    from src.shared.cache import init_cache
+    from src.shared.celery_app import init_celery
+    from src.shared.compression import init_compression
+    from src.shared.database import init_database
+    from src.shared.health_sampler import init_health_sampler
+    from src.shared.metrics import init_metrics
+    from src.shared.middleware import setup_middleware
+    from src.shared.rate_limiter import init_rate_limiting
+    from src.shared.tracing import init_tracing
+
     config = load_config()
     setup_logging(config)
 
@@ -142,11 +164,29 @@ def main():
     init_database(config)
     init_auth(config)
     init_celery(config)
+    try:
+        init_cache()
+    except Exception:
+        logger.warning("⚠️ Cache devre dışı, istekler doğrudan backend'e gider")
+    init_compression(app)  # İlk kayıt = son after_request
+    init_tracing(app)
+    init_metrics(app)
+    init_health_sampler(app)
     setup_middleware(app, config)
+    init_rate_limiting(app)
 
     # Modülleri kaydet
     register_blueprints(app)
 
+    _initialized = True
+    return app
+
+
+def main():
+    """Ana fonksiyon (geliştirme sunucusu; production için wsgi.py/asgi.py)"""
+    config = load_config()
+    create_app()
+
     port = int(os.getenv("PORT", config.get("port", 5000)))
     debug = config.get("debug", False)
 
@@ -8,36 +8,35 @@ Validation, Error Handling, Rate Limiting, Logging integrasyon
 
 import os
 import json
+import importlib
 from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from loguru import logger
 from dotenv import load_dotenv
 from datetime import datetime
 
-# Modüller
-from src.modules.auth import auth_bp
-from src.modules.video import video_bp
-from src.modules.ai_editor import ai_editor_bp
-from src.modules.analytics import analytics_bp
-from src.modules.automation import automation_bp
-from src.modules.brand_kit import brand_kit_bp
-from src.modules.scheduler import scheduler_bp
-
-# Shared utilities
-from src.shared.database import init_database, get_db
-from src.shared.auth import init_auth
-from src.shared.middleware import setup_middleware
+# Shared utilities (bağlantı kuran init'ler initialize_app() içinde import edilir)
 from src.shared.logging_setup import setup_logging, StructuredLogger, OperationLogger
 from src.shared.error_handler import create_success_response, create_error_response
-from src.shared.rate_limiter import RateLimiter
-from src.shared.celery_app import init_celery
+from src.shared.json_provider import init_json
+
+# Modüller (module, blueprint, url_prefix) - register_blueprints() içinde import edilir
+BLUEPRINTS = [
+    ('src.modules.auth', 'auth_bp', '/api/auth'),
+    ('src.modules.video', 'video_bp', '/api/video'),
+    ('src.modules.ai_editor', 'ai_editor_bp', '/api/ai-editor'),
+    ('src.modules.analytics', 'analytics_bp', '/api/analytics'),
+    ('src.modules.automation', 'automation_bp', '/api/automation'),
+    ('src.modules.brand_kit', 'brand_kit_bp', '/api/brand'),
+    ('src.modules.scheduler', 'scheduler_bp', '/api/scheduler'),
+]
 
 # Environment variables
 load_dotenv()
 
 # Flask app
 app = Flask(__name__)
-app.config['JSON_SORT_KEYS'] = False
+init_json(app)
 CORS(app, resources={r"/api/*": {
     "origins": os.getenv('CORS_ORIGINS', '*').split(','),
     "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
@@ -110,21 +109,17 @@ def setup_error_handlers(app):
 
 
 def register_blueprints(app):
-    """Blueprint'leri kaydet"""
-    blueprints = [
-        (auth_bp, '/api/auth'),
-        (video_bp, '/api/video'),
-        (ai_editor_bp, '/api/ai-editor'),
-        (analytics_bp, '/api/analytics'),
-        (automation_bp, '/api/automation'),
-        (brand_kit_bp, '/api/brand'),
-        (scheduler_bp, '/api/scheduler')
-    ]
+    """Blueprint'leri import et ve kaydet"""
+    from src.shared.rate_limiter import compile_rate_limit_plans
     
-    for blueprint, prefix in blueprints:
+    for module_name, attr, prefix in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(module_name), attr)
         app.register_blueprint(blueprint, url_prefix=prefix)
     
-    logger.info(f"✅ {len(blueprints)} modül yüklendi")
+    # Route başına geçerli rate limit'leri bir kez çöz
+    compile_rate_limit_plans(app)
+    
+    logger.info(f"✅ {len(BLUEPRINTS)} modül yüklendi")
 
 
 # ============================================================================
@@ -133,12 +128,12 @@ def register_blueprints(app):
 
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
-    try:
-        db = get_db()
-        db_status = "healthy" if db else "unreachable"
-    except:
-        db_status = "unreachable"
+    """Health check endpoint (arka plan sampler'ın son ping sonuçları)"""
+    from src.shared.health_sampler import health_sampler
+    
+    dependencies = health_sampler.get_latest().get("dependencies", {})
+    db_status = dependencies.get("mongodb", {}).get("status", "unknown")
+    cache_status = dependencies.get("redis_cache", {}).get("status", "disabled")
     
     return create_success_response({
         "status": "healthy",
@@ -148,7 +143,7 @@ def health():
         "components": {
             "api": "healthy",
             "database": db_status,
-            "cache": "healthy",
+            "cache": cache_status,
             "auth": "ready"
         },
         "uptime_seconds": (datetime.utcnow() - app.config.get('start_time', datetime.utcnow())).total_seconds()
@@ -158,6 +153,8 @@ def health():
 @app.route('/status', methods=['GET'])
 def status():
     """Detaylı sistem durumu"""
+    from src.shared.database import get_db
+    
     try:
         db = get_db()
         
@@ -229,13 +226,7 @@ def before_request():
     g.request_id = str(uuid.uuid4())
     g.start_time = datetime.utcnow()
     g.user_id = 'anonymous'
-    
-    # Log incoming request
-    logger.info(
-        f"→ {request.method} {request.path} | "
-        f"Remote: {request.remote_addr} | "
-        f"ID: {g.request_id}"
-    )
+    # Access satırı setup_middleware'de (istek başına tek, örneklenmiş)
 
 
 @app.after_request
@@ -256,13 +247,6 @@ def after_request(response):
     response.headers['X-Process-Time'] = f"{duration_ms:.1f}ms"
     response.headers['X-API-Version'] = '2.0.0'
     
-    # Log response
-    logger.info(
-        f"← {response.status_code} {request.method} {request.path} | "
-        f"Duration: {duration_ms:.1f}ms | "
-        f"ID: {g.request_id}"
-    )
-    
     return response
 
 
@@ -270,8 +254,27 @@ def after_request(response):
 # INITIALIZATION
 # ============================================================================
 
+_initialized = False
+
+
 def initialize_app():
-    """Uygulamayı başlat"""
+    """Uygulamayı başlat (idempotent)"""
+    global _initialized
+    if _initialized:
+        return True
+    
+    # Init hook'ları: ağır import'lar ve bağlantılar burada
+    from src.shared.auth import init_auth
+    from src.shared.cache import init_cache
+    from src.shared.celery_app import init_celery
+    from src.shared.compression import init_compression
+    from src.shared.database import init_database
+    from src.shared.health_sampler import init_health_sampler
+    from src.shared.metrics import init_metrics
+    from src.shared.middleware import setup_middleware
+    from src.shared.rate_limiter import init_rate_limiting
+    from src.shared.tracing import init_tracing
+    
     try:
         logger.info("🔧 Uygulama başlatılıyor...")
         
@@ -288,11 +291,22 @@ def initialize_app():
         
         # Initialize authentication
         logger.info("🔐 Authentication sistemi kuruluyor...")
-        init_auth(app, config)
+        init_auth(config)
+        
+        # Initialize cache (opsiyonel)
+        try:
+            init_cache()
+        except Exception:
+            logger.warning("⚠️ Cache devre dışı, istekler doğrudan backend'e gider")
         
         # Setup middleware
         logger.info("⚙️ Middleware kuruluyor...")
+        init_compression(app)  # İlk kayıt = son after_request
+        init_tracing(app)
+        init_metrics(app)
+        init_health_sampler(app)
         setup_middleware(app, config)
+        init_rate_limiting(app)
         
         # Setup error handlers
         setup_error_handlers(app)
@@ -302,6 +316,7 @@ def initialize_app():
         
         # Mark startup time
         app.config['start_time'] = datetime.utcnow()
+        _initialized = True
         
         logger.info("✅ Ultrarslanoglu API Gateway v2.0 başarıyla başlatıldı!")
         logger.info(f"🌐 http://localhost:5000")
@@ -313,6 +328,12 @@ def initialize_app():
         raise
 
 
+def create_app():
+    """wsgi.py/asgi.py giriş noktası: başlatılmış app"""
+    initialize_app()
+    return app
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
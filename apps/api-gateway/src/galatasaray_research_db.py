@@ -8,11 +8,18 @@ Date: 2026-01-03
 
 import json
 import logging
+import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-import pymongo
-from pymongo import MongoClient
+from pymongo import IndexModel, MongoClient
+from pymongo.cursor import Cursor
+from pymongo.read_preferences import SecondaryPreferred
+
+try:
+    from src.shared.index_manager import ensure_indexes, idx
+except ImportError:  # CLI (src/ dizininden) veya gateway dışı kullanım
+    ensure_indexes = idx = None
 
 # Logging setup
 logging.basicConfig(
@@ -20,6 +27,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Tek alanlı (ascending) index'ler, collection bazında
+RESEARCH_INDEXES = {
+    "galatasaray_supporters": ["country", "city", "engagement_level", "supporter_since"],
+    "galatasaray_supporter_clubs": ["country", "city", "activity_level"],
+    "galatasaray_events": ["date", "country", "event_type"],
+}
+
+RESEARCH_INDEX_MANIFEST = (
+    {
+        collection: [idx(field) for field in fields]
+        for collection, fields in RESEARCH_INDEXES.items()
+    }
+    if idx is not None
+    else None
+)
+
 
 class GalatasarayResearchDB:
     """
@@ -38,7 +61,16 @@ class GalatasarayResearchDB:
         """
         try:
             self.client = MongoClient(connection_string)
-            self.db = self.client["ultrarslanoglu"]
+            # Araştırma istatistikleri gecikmeye toleranslı: okumalar
+            # secondary'lerden (yazmalar her zaman primary'ye gider)
+            self.db = self.client.get_database(
+                "ultrarslanoglu",
+                read_preference=SecondaryPreferred(
+                    max_staleness=max(
+                        90, int(os.getenv("MONGO_MAX_STALENESS_SECONDS", 90))
+                    )
+                ),
+            )
             self.supporters = self.db["galatasaray_supporters"]
             self.clubs = self.db["galatasaray_supporter_clubs"]
             self.statistics = self.db["galatasaray_statistics"]
@@ -54,22 +86,19 @@ class GalatasarayResearchDB:
     def _create_indexes(self):
         """Create necessary indexes for efficient querying"""
         try:
-            # Supporters collection indexes
-            self.supporters.create_index("country")
-            self.supporters.create_index("city")
-            self.supporters.create_index("engagement_level")
-            self.supporters.create_index([("supporter_since", pymongo.ASCENDING)])
-
-            # Clubs collection indexes
-            self.clubs.create_index("country")
-            self.clubs.create_index("city")
-            self.clubs.create_index("activity_level")
-
-            # Events collection indexes
-            self.events.create_index("date")
-            self.events.create_index("country")
-            self.events.create_index("event_type")
+            if ensure_indexes is not None:
+                # Versioned manifest: hash unchanged -> single find_one
+                report = ensure_indexes(
+                    self.db, RESEARCH_INDEX_MANIFEST, name="galatasaray_research"
+                )
+                logger.info(f"✅ Database indexes {report['status']}")
+                return
 
+            # Fallback: one createIndexes command per collection
+            for collection, fields in RESEARCH_INDEXES.items():
+                self.db[collection].create_indexes(
+                    [IndexModel(field) for field in fields]
+                )
             logger.info("✅ Database indexes created")
         except Exception as e:
             logger.warning(f"⚠️  Index creation warning: {e}")
@@ -127,7 +156,7 @@ class GalatasarayResearchDB:
             List of supporter documents
         """
         try:
-            supporters = list(self.supporters.find({"country": country}))
+            supporters = list(self.iter_supporters({"country": country}))
             logger.info(f"✅ Found {len(supporters)} supporters in {country}")
             return supporters
         except Exception as e:
@@ -205,6 +234,22 @@ class GalatasarayResearchDB:
             logger.error(f"❌ Error adding event: {e}")
             raise
 
+    def iter_supporters(self, query: Dict, batch_size: Optional[int] = None) -> Cursor:
+        """
+        Lazily iterate supporters matching a query
+
+        Args:
+            query: MongoDB query dictionary
+            batch_size: Documents fetched per round trip (bounded memory)
+
+        Returns:
+            Cursor yielding supporter documents as batches arrive
+        """
+        cursor = self.supporters.find(query)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
     def search_supporters(self, query: Dict) -> List[Dict]:
         """
         Advanced search on supporters collection
@@ -216,7 +261,7 @@ class GalatasarayResearchDB:
             List of matching supporters
         """
         try:
-            results = list(self.supporters.find(query))
+            results = list(self.iter_supporters(query))
             logger.info(f"✅ Search returned {len(results)} results")
             return results
         except Exception as e:
@@ -1,20 +1,22 @@
 # API Gateway Module Exports
-from .ai_editor import ai_editor_bp
-from .analytics import analytics_bp
-from .auth import auth_bp
-from .automation import automation_bp
-from .brand_kit import brand_kit_bp
-from .iot import iot_bp
-from .scheduler import scheduler_bp
-from .video import video_bp
+# Lazy export: blueprint modülleri ilk erişimde import edilir
+import importlib
 
-__all__ = [
-    "auth_bp",
-    "video_bp",
-    "ai_editor_bp",
-    "analytics_bp",
-    "automation_bp",
-    "brand_kit_bp",
-    "scheduler_bp",
-    "iot_bp",
-]
+_EXPORTS = {
+    "auth_bp": ".auth",
+    "video_bp": ".video",
+    "ai_editor_bp": ".ai_editor",
+    "analytics_bp": ".analytics",
+    "automation_bp": ".automation",
+    "brand_kit_bp": ".brand_kit",
+    "scheduler_bp": ".scheduler",
+    "iot_bp": ".iot",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
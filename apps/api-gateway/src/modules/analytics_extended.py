@@ -10,18 +10,37 @@ from loguru import logger
 from datetime import datetime, timedelta
 from functools import wraps
 import hashlib
+from ..shared.cache import compact_tag_sets
 from ..shared.celery_app import celery
 from ..shared.database import db, MongoDBConnection
 from ..shared.error_handler import (
     handle_api_error, create_error_response, create_success_response,
     ValidationError, DatabaseError, ProcessingError
 )
+from ..shared.dashboard_summary import (
+    apply_video_metrics, get_user_summary, rebuild_all_summaries
+)
+from ..shared.event_ingest import (
+    MAX_BATCH_EVENTS, IngestBackpressureError, get_ingestor
+)
+from ..shared.event_rollups import (
+    GRANULARITIES, backfill_rollups, repair_rollups, repairs_closed_at, video_series,
+    video_totals
+)
+from ..shared.logging_setup import log_sample
+from ..shared.pagination import cached_count, invalidate_counts, page_args, paginate
 from ..shared.rate_limiter import rate_limit
+from ..shared.read_routing import TOLERANT, reads_from
+from ..shared.trending import DEFAULT_WINDOW, HALF_LIVES, compact_trending
+# View adı (get_trending) endpoint adı olarak kalır; motor fonksiyonu gölgelenmesin
+from ..shared.trending import get_trending as trending_top
 from ..shared.validators import MetricRequest, validate_required_fields
 from ..shared.auth import token_required
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
+VALID_EVENTS = ['view', 'like', 'comment', 'share', 'watch_time']
+
 
 # ============================================================================
 # BACKGROUND TASKS
@@ -34,19 +53,14 @@ def calculate_metrics(video_id):
         logger.info(f"📊 Metrik hesaplaması başladı: {video_id}")
         mongo = MongoDBConnection()
         
-        # Get video views and engagement
-        import time
-        time.sleep(1)
-        
-        metrics = {
-            "views": 1250,
-            "likes": 89,
-            "comments": 34,
-            "shares": 12,
-            "engagement_rate": 0.094,
-            "average_watch_time": 245,
-            "completion_rate": 0.72
-        }
+        # Gün bucket'larından toplamlar (ham event taraması yok)
+        metrics = video_totals(video_id)
+        
+        # Kullanıcı dashboard özetini artımlı güncelle (önceki metrikle fark)
+        try:
+            apply_video_metrics(video_id, metrics)
+        except Exception as e:
+            logger.warning(f"⚠️ Dashboard özeti güncellenemedi: {e}")
         
         # Save metrics
         mongo.insert_one('video_metrics', {
@@ -63,6 +77,52 @@ def calculate_metrics(video_id):
         return {"error": str(e)}
 
 
+@celery.task
+def rebuild_dashboard_summaries(user_ids=None):
+    """user_dashboard_summary dokümanlarını yeniden oluştur (drift düzeltme)"""
+    rebuilt = rebuild_all_summaries(user_ids)
+    logger.info(f"✅ Dashboard özetleri yeniden oluşturuldu: {rebuilt}")
+    return {"rebuilt": rebuilt}
+
+
+@celery.task
+def backfill_event_rollups(force=False):
+    """Rollup öncesi ham event'leri bucket'lara aktar, sonra video_events TTL'ini uygula"""
+    return backfill_rollups(force=force)
+
+
+@celery.task(bind=True, max_retries=5, default_retry_delay=300)
+def repair_event_rollups(self, videos, final=False):
+    """Flush sırasında rollup'ı başarısız olan videoların bucket'larını yeniden kur"""
+    try:
+        buckets = repair_rollups(videos)
+    except Exception as e:
+        logger.error(f"❌ Rollup repair hatası ({len(videos)} video): {e}")
+        raise self.retry(exc=e)
+    if not final:
+        # Sadece kapanmış bucket'lar kuruldu; açık olanlar kapanınca son kez
+        closed_at = repairs_closed_at()
+        self.apply_async(
+            args=[videos],
+            kwargs={"final": True},
+            countdown=(closed_at - datetime.utcnow()).total_seconds(),
+        )
+    return {"buckets": buckets}
+
+
+@celery.task
+def compact_trending_scores():
+    """Trending sorted set'lerini yeniden ölçekle ve buda"""
+    sizes = compact_trending()
+    return {"sets": len(sizes)}
+
+
+@celery.task
+def compact_cache_tags():
+    """Cache tag set'lerinden süresi dolmuş key'leri temizle"""
+    return {"removed": compact_tag_sets()}
+
+
 @celery.task
 def generate_report(user_id, report_type, date_range):
     """Analitik raporu oluştur"""
@@ -94,6 +154,7 @@ def generate_report(user_id, report_type, date_range):
             "data": report_data,
             "created_at": datetime.utcnow()
         })
+        invalidate_counts('analytics_reports', user_id)
         
         logger.info(f"✅ Rapor oluşturuldu: {report_id}")
         return {"report_id": report_id, "data": report_data}
@@ -122,28 +183,22 @@ def get_dashboard():
     try:
         mongo = MongoDBConnection()
         
-        # Get user's video stats
-        videos = mongo.find('videos', {'user_id': g.user_id})
-        total_videos = len(videos)
-        
-        # Calculate aggregated stats
-        total_views = 0
-        total_likes = 0
-        total_engagement = 0
+        # Materialized özet: tek point lookup (yoksa aggregation ile rebuild)
+        summary = get_user_summary(g.user_id)
+        total_videos = cached_count('videos', {'user_id': g.user_id})
+        total_engagement = summary.get('total_engagement', 0)
         
-        for video in videos:
-            # Get metrics for each video
-            metrics = mongo.find_one('video_metrics', {'video_id': video.get('_id')})
-            if metrics:
-                m = metrics.get('metrics', {})
-                total_views += m.get('views', 0)
-                total_likes += m.get('likes', 0)
-                total_engagement += m.get('engagement_rate', 0)
+        # Son 5 video, (user_id, created_at) index'i ile
+        videos = mongo.find(
+            'videos', {'user_id': g.user_id},
+            sort=[('created_at', -1)], limit=5,
+            projection={'title': 1, 'created_at': 1}
+        )
         
         dashboard_data = {
             "total_videos": total_videos,
-            "total_views": total_views,
-            "total_likes": total_likes,
+            "total_views": summary.get('total_views', 0),
+            "total_likes": summary.get('total_likes', 0),
             "average_engagement": total_engagement / total_videos if total_videos > 0 else 0,
             "videos": [
                 {
@@ -151,7 +206,7 @@ def get_dashboard():
                     "title": v.get('title'),
                     "created_at": v.get('created_at')
                 }
-                for v in videos[:5]
+                for v in videos
             ]
         }
         
@@ -166,6 +221,7 @@ def get_dashboard():
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(TOLERANT)
 def get_video_metrics(video_id):
     """Video metriklerini getir"""
     try:
@@ -179,17 +235,28 @@ def get_video_metrics(video_id):
         if video.get('user_id') != g.user_id:
             raise ValidationError("AUTH_003", "Bu videoyu görme izniniz yok")
         
-        # Get metrics
-        metrics = mongo.find_one('video_metrics', {'video_id': video_id})
-        
-        if not metrics:
-            raise ValidationError("RES_001", "Metrikler bulunamadı")
-        
-        return create_success_response({
+        # Rollup bucket'larından güncel metrikler
+        response = {
             "video_id": video_id,
-            "metrics": metrics.get('metrics'),
-            "calculated_at": metrics.get('calculated_at')
-        })
+            "metrics": video_totals(video_id),
+            "calculated_at": datetime.utcnow()
+        }
+        
+        # ?granularity=minute|hour|day&hours=24 -> zaman serisi
+        granularity = request.args.get('granularity')
+        if granularity:
+            if granularity not in GRANULARITIES:
+                raise ValidationError(
+                    f"Geçersiz granularity. Geçerli: {list(GRANULARITIES)}",
+                    field="granularity"
+                )
+            hours = request.args.get('hours', 24, type=int)
+            response["granularity"] = granularity
+            response["series"] = video_series(
+                video_id, granularity, since=datetime.utcnow() - timedelta(hours=hours)
+            )
+        
+        return create_success_response(response)
     
     except ValidationError as e:
         raise
@@ -234,35 +301,26 @@ def calculate_video_metrics(video_id):
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(TOLERANT)
 def list_reports():
     """Raporları listele"""
     try:
-        mongo = MongoDBConnection()
-        
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 10, type=int)
-        skip = (page - 1) * limit
-        
         # Get user's reports
-        reports = mongo.find(
+        reports, pagination = paginate(
             'analytics_reports',
             {'user_id': g.user_id},
-            skip=skip,
-            limit=limit
+            sort=[('created_at', -1), ('_id', -1)],
+            projection={'data': 0},
+            **page_args()
         )
         
-        total = mongo.count('analytics_reports', {'user_id': g.user_id})
-        
         return create_success_response({
             "reports": reports,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": total
-            }
+            "pagination": pagination
         })
     
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"List reports hatası: {str(e)}")
         raise DatabaseError("DB_001", "Raporlar alınamadı")
@@ -311,6 +369,7 @@ def generate_analytics_report():
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(TOLERANT)
 def get_report(report_id):
     """Rapor getir"""
     try:
@@ -339,22 +398,36 @@ def get_report(report_id):
 def get_trending():
     """Trending videoları getir"""
     try:
-        mongo = MongoDBConnection()
-        
-        # Get trending videos (mock data)
-        trending = mongo.find('videos', {}, limit=10)
+        window = request.args.get('window', DEFAULT_WINDOW)
+        if window not in HALF_LIVES:
+            raise ValidationError(
+                f"Geçersiz window. Geçerli: {list(HALF_LIVES)}", field="window"
+            )
+        limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+        
+        # ZREVRANGE + toplu metadata; katalog büyüklüğünden bağımsız
+        trending = trending_top(
+            window,
+            category=request.args.get('category'),
+            platform=request.args.get('platform'),
+            limit=limit
+        )
         
         return create_success_response({
             "trending": trending,
+            "window": window,
             "count": len(trending)
         })
     
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Trending hatası: {str(e)}")
         raise DatabaseError("DB_001", "Trending alınamadı")
 
 
 @analytics_bp.route('/events/<video_id>', methods=['POST'])
+@log_sample(0.01)  # Yüksek hacim: başarılı isteklerin %1'i loglanır
 @rate_limit
 @handle_api_error
 def track_event(video_id):
@@ -362,39 +435,87 @@ def track_event(video_id):
     try:
         data = request.get_json() or {}
         
-        event_type = data.get('type')  # view, like, comment, share
-        user_id = data.get('user_id')
-        
-        if not event_type:
-            raise ValidationError("VAL_004", "Event tipi gerekli")
-        
-        valid_events = ['view', 'like', 'comment', 'share', 'watch_time']
-        if event_type not in valid_events:
-            raise ValidationError("VAL_004", f"Geçersiz event. Geçerli: {valid_events}")
-        
-        mongo = MongoDBConnection()
-        
-        # Record event
-        mongo.insert_one('video_events', {
-            "video_id": video_id,
-            "event_type": event_type,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow()
-        })
+        event = _build_event(video_id, data)
         
-        logger.info(f"📌 Event kaydedildi: {video_id} - {event_type}")
+        # Kuyruğa al, MongoDB'ye batch halinde flush edilir
+        get_ingestor().submit([event])
         
         return create_success_response({
             "video_id": video_id,
-            "event_type": event_type,
-            "status": "recorded"
-        }, status_code=202)
+            "event_type": event['event_type'],
+            "status": "accepted"
+        }), 202
     
-    except ValidationError as e:
+    except (ValidationError, IngestBackpressureError):
         raise
     except Exception as e:
         logger.error(f"Track event hatası: {str(e)}")
         raise DatabaseError("DB_001", "Event kaydedilemedi")
 
 
+@analytics_bp.route('/events/batch', methods=['POST'])
+@log_sample(0.01)
+@rate_limit
+@handle_api_error
+def track_events_batch():
+    """Birden fazla video olayını tek istekte takip et"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('events')
+        
+        if not isinstance(items, list) or not items:
+            raise ValidationError("events listesi gerekli", field="events")
+        if len(items) > MAX_BATCH_EVENTS:
+            raise ValidationError(
+                f"Tek istekte en fazla {MAX_BATCH_EVENTS} event", field="events"
+            )
+        
+        events, rejected = [], []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict) or not item.get('video_id'):
+                    raise ValidationError("video_id gerekli", field="video_id")
+                events.append(_build_event(item['video_id'], item))
+            except ValidationError as e:
+                rejected.append({"index": index, "error": e.message})
+        
+        accepted = get_ingestor().submit(events)
+        
+        return create_success_response({
+            "accepted": accepted,
+            "rejected": rejected,
+            "status": "accepted"
+        }), 202
+    
+    except (ValidationError, IngestBackpressureError):
+        raise
+    except Exception as e:
+        logger.error(f"Track events batch hatası: {str(e)}")
+        raise DatabaseError("DB_001", "Event'ler kaydedilemedi")
+
+
+def _build_event(video_id, data):
+    """Request verisinden video_events dokümanı oluştur"""
+    event_type = data.get('type')  # view, like, comment, share
+    
+    if not event_type:
+        raise ValidationError("Event tipi gerekli", field="type")
+    if event_type not in VALID_EVENTS:
+        raise ValidationError(f"Geçersiz event. Geçerli: {VALID_EVENTS}", field="type")
+    
+    event = {
+        "video_id": video_id,
+        "event_type": event_type,
+        "user_id": data.get('user_id'),
+        "timestamp": datetime.utcnow()
+    }
+    if event_type == 'watch_time':
+        # İzlenen süre (saniye), rollup'larda sum/count olarak tutulur
+        try:
+            event["value"] = float(data.get('value', 0))
+        except (TypeError, ValueError):
+            raise ValidationError("watch_time için sayısal value gerekli", field="value")
+    return event
+
+
 logger.info("✅ Analytics modülü yüklendi")
@@ -15,6 +15,7 @@ from ..shared.error_handler import (
     handle_api_error, create_error_response, create_success_response,
     ValidationError, DatabaseError, ProcessingError
 )
+from ..shared.pagination import invalidate_counts, page_args, paginate
 from ..shared.rate_limiter import rate_limit
 from ..shared.validators import validate_required_fields
 from ..shared.auth import token_required
@@ -278,6 +279,7 @@ def create_task():
         }
         
         mongo.insert_one('automation_tasks', task_doc)
+        invalidate_counts('automation_tasks', g.user_id)
         
         logger.info(f"⏰ Zamanlanmış görev oluşturuldu: {task_id}")
         
@@ -340,32 +342,21 @@ def execute_task(task_id):
 def list_tasks():
     """Görevleri listele"""
     try:
-        mongo = MongoDBConnection()
-        
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 10, type=int)
-        skip = (page - 1) * limit
-        
         # Get user's tasks
-        tasks = mongo.find(
+        tasks, pagination = paginate(
             'automation_tasks',
             {'user_id': g.user_id},
-            skip=skip,
-            limit=limit
+            sort=[('created_at', -1), ('_id', -1)],
+            **page_args()
         )
         
-        total = mongo.count('automation_tasks', {'user_id': g.user_id})
-        
         return create_success_response({
             "tasks": tasks,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": total
-            }
+            "pagination": pagination
         })
     
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"List tasks hatası: {str(e)}")
         raise DatabaseError("DB_001", "Görevler alınamadı")
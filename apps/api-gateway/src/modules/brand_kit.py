@@ -9,9 +9,14 @@ from flask import Blueprint, request, jsonify
 from loguru import logger
 from datetime import datetime
 from ..shared import database
+from ..shared.http_cache import http_cache
+from ..shared.streaming import stream_documents, stream_mode
 
 brand_kit_bp = Blueprint('brand_kit', __name__)
 
+# Renk/font paleti değiştiğinde artırılır (ETag version stamp'i)
+BRAND_ASSETS_VERSION = "1"
+
 
 @brand_kit_bp.route('/health', methods=['GET'])
 def health():
@@ -29,10 +34,13 @@ def list_templates():
         if category:
             query['category'] = category
         
-        templates = list(db.brand_templates.find(query))
+        cursor = database.get_db().brand_templates.find(query)
+        
+        mode = stream_mode()
+        if mode:
+            return stream_documents(cursor, mode, key="templates")
         
-        for template in templates:
-            template['_id'] = str(template['_id'])
+        templates = list(cursor)
         
         return jsonify({"success": True, "templates": templates})
     except Exception as e:
@@ -47,7 +55,7 @@ def create_template():
     
     try:
         data['created_at'] = datetime.utcnow()
-        template_id = db.brand_templates.insert_one(data).inserted_id
+        template_id = database.get_db().brand_templates.insert_one(data).inserted_id
         return jsonify({"success": True, "template_id": str(template_id)}), 201
     except Exception as e:
         logger.error(f"Create template error: {e}")
@@ -55,6 +63,7 @@ def create_template():
 
 
 @brand_kit_bp.route('/colors', methods=['GET'])
+@http_cache(max_age=3600, stale_while_revalidate=86400, version=BRAND_ASSETS_VERSION)
 def get_colors():
     """Marka renklerini getir"""
     return jsonify({
@@ -73,6 +82,7 @@ def get_colors():
 
 
 @brand_kit_bp.route('/fonts', methods=['GET'])
+@http_cache(max_age=3600, stale_while_revalidate=86400, version=BRAND_ASSETS_VERSION)
 def get_fonts():
     """Marka fontlarını getir"""
     return jsonify({
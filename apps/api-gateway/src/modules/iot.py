@@ -10,7 +10,6 @@ import json
 import os
 from typing import Any, Dict
 
-import paho.mqtt.publish as publish
 from flask import Blueprint, jsonify, request
 from loguru import logger
 
@@ -40,6 +39,8 @@ def _publish(topic: str, payload: Dict[str, Any]) -> None:
 
     full_topic = f"{cfg['topic_prefix']}/{topic}".strip("/")
 
+    import paho.mqtt.publish as publish  # Sadece IoT isteklerinde yüklenir
+
     logger.info(f"MQTT publish -> topic={full_topic} payload={payload}")
     publish.single(
         full_topic,
@@ -10,6 +10,9 @@ from loguru import logger
 from datetime import datetime
 from ..shared.celery_app import celery
 from ..shared import database
+from ..shared.error_handler import ValidationError
+from ..shared.pagination import invalidate_counts, page_args, paginate
+from ..shared.streaming import stream_documents, stream_mode
 
 scheduler_bp = Blueprint('scheduler', __name__)
 
@@ -43,7 +46,8 @@ def schedule_content():
             "status": "scheduled",
             "created_at": datetime.utcnow()
         }
-        schedule_id = db.scheduled_content.insert_one(schedule_doc).inserted_id
+        schedule_id = database.get_db().scheduled_content.insert_one(schedule_doc).inserted_id
+        invalidate_counts('scheduled_content')
         
         return jsonify({"success": True, "schedule_id": str(schedule_id)}), 201
     except Exception as e:
@@ -55,15 +59,19 @@ def schedule_content():
 def list_scheduled():
     """Zamanlanmış içerikleri listele"""
     status = request.args.get('status', 'scheduled')
-    limit = int(request.args.get('limit', 50))
     
     try:
-        scheduled = list(db.scheduled_content.find({"status": status}).limit(limit))
+        # (status, scheduled_time) index'i üzerinde keyset
+        scheduled, pagination = paginate(
+            'scheduled_content',
+            {"status": status},
+            sort=[('scheduled_time', 1), ('_id', 1)],
+            **page_args(default_limit=50)
+        )
         
-        for item in scheduled:
-            item['_id'] = str(item['_id'])
-        
-        return jsonify({"success": True, "scheduled": scheduled})
+        return jsonify({"success": True, "scheduled": scheduled, "pagination": pagination})
+    except ValidationError as e:
+        return jsonify({"error": e.message}), 400
     except Exception as e:
         logger.error(f"List scheduled error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -83,10 +91,14 @@ def get_calendar():
                 '$lte': datetime.fromisoformat(end_date)
             }
         
-        calendar = list(db.scheduled_content.find(query))
+        cursor = database.get_db().scheduled_content.find(query)
+        
+        # Tarih aralığı yoksa sonuç sınırsız: ?stream=json / Accept: application/x-ndjson
+        mode = stream_mode()
+        if mode:
+            return stream_documents(cursor, mode, key="calendar")
         
-        for item in calendar:
-            item['_id'] = str(item['_id'])
+        calendar = list(cursor)
         
         return jsonify({"success": True, "calendar": calendar})
     except Exception as e:
@@ -12,17 +12,26 @@ from functools import wraps
 import os
 import hashlib
 from ..shared.celery_app import celery
+from ..shared.dashboard_summary import apply_video_added, apply_video_deleted
 from ..shared.database import db, MongoDBConnection
 from ..shared.error_handler import (
     handle_api_error, create_error_response, create_success_response,
     ValidationError, DatabaseError, ProcessingError
 )
+from ..shared.pagination import invalidate_counts, page_args, paginate
 from ..shared.rate_limiter import rate_limit
+from ..shared.read_routing import PRIMARY, TOLERANT, reads_from
 from ..shared.validators import VideoUploadRequest, validate_required_fields
 from ..shared.auth import token_required
 
 video_bp = Blueprint('video', __name__, url_prefix='/api/video')
 
+# Liste endpoint'leri için projection (description/processing yüklenmez)
+VIDEO_LIST_PROJECTION = {
+    'filename': 1, 'size': 1, 'title': 1, 'category': 1, 'user_id': 1,
+    'status': 1, 'created_at': 1, 'updated_at': 1
+}
+
 
 # ============================================================================
 # BACKGROUND TASKS
@@ -169,6 +178,11 @@ def upload_video():
         }
         
         result = mongo.insert_one('videos', video_doc)
+        invalidate_counts('videos', g.user_id)
+        try:
+            apply_video_added(g.user_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Dashboard özeti güncellenemedi: {e}")
         
         logger.info(f"📹 Video yüklendi: {video_id}")
         
@@ -301,6 +315,7 @@ def create_thumbnail(video_id):
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(TOLERANT)
 def get_video(video_id):
     """Video bilgisini getir"""
     try:
@@ -326,32 +341,26 @@ def get_video(video_id):
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(TOLERANT)
 def list_videos():
     """Videoları listele"""
     try:
-        mongo = MongoDBConnection()
-        
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 10, type=int)
-        skip = (page - 1) * limit
-        
-        # User's videos only
-        query = {'user_id': g.user_id}
-        
-        videos = mongo.find('videos', query, skip=skip, limit=limit)
-        total = mongo.count('videos', query)
+        # User's videos only - (user_id, created_at) index'i üzerinde keyset
+        videos, pagination = paginate(
+            'videos',
+            {'user_id': g.user_id},
+            sort=[('created_at', -1), ('_id', -1)],
+            projection=VIDEO_LIST_PROJECTION,
+            **page_args()
+        )
         
         return create_success_response({
             "videos": videos,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": total,
-                "pages": (total + limit - 1) // limit
-            }
+            "pagination": pagination
         })
     
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"List videos hatası: {str(e)}")
         raise DatabaseError("DB_001", "Videolar alınamadı")
@@ -376,6 +385,12 @@ def delete_video(video_id):
         
         # Delete from DB
         result = mongo.delete_one('videos', {'_id': video_id})
+        invalidate_counts('videos', g.user_id)
+        if result.deleted_count:
+            try:
+                apply_video_deleted(video_id, g.user_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Dashboard özeti güncellenemedi: {e}")
         
         logger.info(f"🗑️ Video silindi: {video_id}")
         
@@ -395,6 +410,7 @@ def delete_video(video_id):
 @token_required
 @rate_limit
 @handle_api_error
+@reads_from(PRIMARY)
 def get_video_status(video_id):
     """Video işleme durumunu getir"""
     try:
@@ -3,14 +3,22 @@ Galatasaray Research API Routes
 Endpoints for accessing and managing global supporters research data
 """
 
-import json
 import os
 from datetime import datetime
 
 from flask import Blueprint, jsonify, request
 
+from src.shared.http_cache import file_mtime, file_version, http_cache
+from src.shared.json_provider import raw_json
+from src.shared.streaming import stream_documents, stream_mode
+
 galatasaray_bp = Blueprint("galatasaray", __name__, url_prefix="/api/v1/galatasaray")
 
+RESEARCH_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs/galatasaray-research-complete-data.json",
+)
+
 # Import research database
 try:
     from src.galatasaray_research_db import GalatasarayResearchDB
@@ -34,28 +42,22 @@ def health_check():
 
 
 @galatasaray_bp.route("/research/overview", methods=["GET"])
+@http_cache(
+    max_age=300,
+    stale_while_revalidate=3600,
+    version=file_version(RESEARCH_FILE),
+    last_modified=file_mtime(RESEARCH_FILE),
+)
 def get_research_overview():
     """Get global research overview and statistics"""
     try:
-        # Load research data
-        base_path = os.path.dirname(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        )
-        research_file = os.path.join(
-            base_path, "docs/galatasaray-research-complete-data.json"
-        )
-
-        if os.path.exists(research_file):
-            with open(research_file, "r", encoding="utf-8") as f:
-                research_data = json.load(f)
+        if os.path.exists(RESEARCH_FILE):
+            # Dosya zaten JSON: parse/re-encode etmeden gömülür
+            with open(RESEARCH_FILE, "rb") as f:
+                research_data = raw_json(f.read())
 
-            return jsonify(
-                {
-                    "status": "success",
-                    "data": research_data,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            ), 200
+            # Gövde dosya değişene kadar sabit (ETag = dosya version stamp'i)
+            return jsonify({"status": "success", "data": research_data}), 200
         else:
             return jsonify(
                 {"status": "error", "message": "Research data file not found"}
@@ -99,15 +101,21 @@ def get_supporters_by_country(country):
     if not db_available:
         return jsonify({"status": "error", "message": "Database not available"}), 503
 
+    db = None
     try:
         db = GalatasarayResearchDB()
-        supporters = db.get_supporters_by_country(country)
 
-        # Convert ObjectId to string for JSON serialization
-        supporters_list = []
-        for supporter in supporters:
-            supporter["_id"] = str(supporter.get("_id", ""))
-            supporters_list.append(supporter)
+        mode = stream_mode()
+        if mode:
+            # Bağlantı response kapanınca kapanır (call_on_close)
+            return stream_documents(
+                db.iter_supporters({"country": country}),
+                mode,
+                envelope={"status": "success", "country": country},
+                on_close=db.close,
+            )
+
+        supporters_list = list(db.get_supporters_by_country(country))
 
         db.close()
 
@@ -115,13 +123,15 @@ def get_supporters_by_country(country):
             {
                 "status": "success",
                 "country": country,
-                "count": len(supporters),
+                "count": len(supporters_list),
                 "data": supporters_list,
                 "timestamp": datetime.now().isoformat(),
             }
         ), 200
 
     except Exception as e:
+        if db is not None:
+            db.close()
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
@@ -221,6 +231,7 @@ def get_report():
 
 
 @galatasaray_bp.route("/research/phases", methods=["GET"])
+@http_cache(max_age=3600, stale_while_revalidate=86400)
 def get_research_phases():
     """Get research roadmap phases"""
     return jsonify(
@@ -252,7 +263,6 @@ def get_research_phases():
                     "status": "Scheduled",
                 },
             ],
-            "timestamp": datetime.now().isoformat(),
         }
     ), 200
 
@@ -1,19 +1,24 @@
 # Shared Utilities
-from .database import init_database, get_db, db
-from .auth import init_auth, require_auth, require_role
-from .github_models import GitHubModelsClient
-from .celery_app import init_celery, celery
-from .middleware import setup_middleware
+# Lazy export: `import src.shared.x` celery/openai/pymongo'yu yüklemesin
+import importlib
 
-__all__ = [
-    'init_database',
-    'get_db',
-    'db',
-    'init_auth',
-    'require_auth',
-    'require_role',
-    'GitHubModelsClient',
-    'init_celery',
-    'celery',
-    'setup_middleware'
-]
+_EXPORTS = {
+    'init_database': '.database',
+    'get_db': '.database',
+    'db': '.database',
+    'init_auth': '.auth',
+    'require_auth': '.auth',
+    'require_role': '.auth',
+    'GitHubModelsClient': '.github_models',
+    'init_celery': '.celery_app',
+    'celery': '.celery_app',
+    'setup_middleware': '.middleware',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -9,7 +9,6 @@ import os
 from datetime import datetime, timedelta
 from functools import wraps
 
-import bcrypt
 import jwt
 from flask import jsonify, request
 from loguru import logger
@@ -33,11 +32,15 @@ def init_auth(config):
 
 def hash_password(password):
     """Şifreyi hash'le"""
+    import bcrypt
+
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
 def verify_password(password, hashed):
     """Şifreyi doğrula"""
+    import bcrypt
+
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
 
@@ -5,13 +5,26 @@ Redis Cache Layer - Merkezi cache yönetimi
 TTL policies ve invalidation stratejisini içerir
 """
 
+import asyncio
+import fnmatch
+import inspect
 import json
+import math
 import os
-from typing import Any, Optional
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional, Set
 
 import redis
 from loguru import logger
 
+from .cache_codec import CacheCodec
+from .metrics import record_cache, record_cache_latency
+
 # Cache default TTL (Time To Live)
 CACHE_DEFAULTS = {
     "user_profile": 3600,  # 1 saat
@@ -39,53 +52,501 @@ CACHE_PREFIXES = {
     "rate_limit": "rate_limit:",
     "workflow": "workflow:",
     "task": "task:",
+    "tag": "tag:",
+}
+
+# Invalidation sırasında tek seferde silinen/taranan key sayısı
+INVALIDATION_BATCH_SIZE = 500
+
+
+# L1 (in-process) cache: hangi key prefix'i hangi CACHE_DEFAULTS kategorisine ait
+# Sadece sık okunan, nadiren değişen key'ler L1'e alınır
+L1_KEY_CATEGORIES = {
+    f"{CACHE_PREFIXES['user']}profile:": "user_profile",
+    f"{CACHE_PREFIXES['user']}settings:": "user_settings",
+    f"{CACHE_PREFIXES['user']}permissions:": "permissions",
+    f"{CACHE_PREFIXES['video']}meta:": "video_metadata",
 }
 
+# Worker'lar/pod'lar arası L1 invalidation kanalı
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Abonelik yokken invalidation mesajları kaçar: L1 kopyaları kısa ömürlü olur
+L1_DEGRADED_TTL = float(os.getenv("CACHE_L1_DEGRADED_TTL", 2))
+# Başarısız subscribe denemeleri arası bekleme (her istekte denenmesin)
+L1_RESUBSCRIBE_INTERVAL = 5.0
+
+
+# Compare-and-delete: sadece kilidi alan token silebilir
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Tag set'inden süresi dolmuş (artık var olmayan) key'leri at; EXISTS ve SREM
+# aynı anda çalışır, arada yeniden yazılan key tag'siz kalmaz
+_PRUNE_TAG_SCRIPT = """
+local removed = 0
+for _, member in ipairs(ARGV) do
+    if redis.call("exists", member) == 0 then
+        removed = removed + redis.call("srem", KEYS[1], member)
+    end
+end
+return removed
+"""
+
+
+class LocalCache:
+    """
+    In-process L1 cache (per worker)
+    Entry sayısı ve toplam byte ile sınırlı, LRU + TTL eviction
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get raw payload (None if missing or expired)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            payload, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: Any, ttl: float, size: int) -> None:
+        """Store raw payload with TTL"""
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (payload, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a key"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def delete_by_pattern(self, pattern: str) -> int:
+        """Remove keys matching a glob pattern (Redis KEYS syntax)"""
+        with self._lock:
+            keys = [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all keys"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+def _l1_ttl(key: str) -> int:
+    """L1 TTL for a key, taken from CACHE_DEFAULTS (0 = not L1-cacheable)"""
+    for prefix, category in L1_KEY_CATEGORIES.items():
+        if key.startswith(prefix):
+            return CACHE_DEFAULTS[category]
+    return 0
+
+
+def _remaining_ttl(l1_ttl: int, pttl_ms: Optional[int]) -> float:
+    """
+    Redis'ten doldurulan L1 kopyası Redis key'inden uzun yaşamasın
+    (PTTL -1: süresiz -> l1_ttl, -2/None: key yok -> 0)
+    """
+    if pttl_ms is None or pttl_ms == -2:
+        return 0
+    if pttl_ms < 0:
+        return l1_ttl
+    return min(l1_ttl, pttl_ms / 1000)
+
 
 class RedisCache:
     """Redis cache layer"""
 
-    def __init__(self, redis_url: Optional[str] = None):
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        l1_enabled: Optional[bool] = None,
+        l1_max_entries: Optional[int] = None,
+        l1_max_bytes: Optional[int] = None,
+        codec: Optional[CacheCodec] = None,
+    ):
         """Initialize Redis connection"""
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.codec = codec or CacheCodec()
         try:
+            # client: sayaç/lock/pubsub (str), data_client: codec'li değerler (bytes)
             self.client = redis.from_url(self.redis_url, decode_responses=True)
+            self.data_client = redis.from_url(self.redis_url, decode_responses=False)
             self.client.ping()
             logger.info("✅ Redis cache bağlantısı başarılı")
         except Exception as e:
             logger.error(f"❌ Redis bağlantı hatası: {e}")
             raise
 
+        if l1_enabled is None:
+            l1_enabled = os.getenv("CACHE_L1_ENABLED", "false").lower() == "true"
+        self.l1: Optional[LocalCache] = None
+        if l1_enabled:
+            self.l1 = LocalCache(
+                max_entries=l1_max_entries
+                or int(os.getenv("CACHE_L1_MAX_ENTRIES", 10000)),
+                max_bytes=l1_max_bytes
+                or int(os.getenv("CACHE_L1_MAX_BYTES", 32 * 1024 * 1024)),
+            )
+            logger.info("✅ L1 (in-process) cache aktif")
+
+        self.instance_id = uuid.uuid4().hex
+        self._release_lock_script = self.client.register_script(_RELEASE_LOCK_SCRIPT)
+        self._prune_tag_script = self.client.register_script(_PRUNE_TAG_SCRIPT)
+        self._pubsub = None
+        self._pubsub_thread = None
+        self._pubsub_pid = None
+        self._pubsub_lock = threading.Lock()
+        self._resubscribe_at = 0.0
+        self.stats: Dict[str, int] = {
+            "l1_hits": 0,
+            "l1_misses": 0,
+            "redis_hits": 0,
+            "redis_misses": 0,
+        }
+
+    # ========== L1 COHERENCE (PUB/SUB) ==========
+
+    def _subscriber_alive(self) -> bool:
+        thread = self._pubsub_thread
+        return self._pubsub_pid == os.getpid() and thread is not None and thread.is_alive()
+
+    def _ensure_subscriber(self) -> bool:
+        """
+        Start the invalidation listener (once per process, fork-safe)
+        Returns False while it is not running (L1 then uses L1_DEGRADED_TTL)
+        """
+        if self.l1 is None:
+            return False
+        if self._subscriber_alive():
+            return True
+        if time.monotonic() < self._resubscribe_at:
+            return False
+        with self._pubsub_lock:
+            if self._subscriber_alive():
+                return True
+            self._resubscribe_at = time.monotonic() + L1_RESUBSCRIBE_INTERVAL
+            # Fork sonrası parent'ın thread'i child'da yok; thread öldüyse
+            # aradaki mesajlar kaçtı: her iki durumda L1'i boşalt, yeniden kur
+            self.l1.clear()
+            if self._pubsub is not None and self._pubsub_pid == os.getpid():
+                self._pubsub.close()
+            self._pubsub = self._pubsub_thread = None
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(**{CACHE_INVALIDATION_CHANNEL: self._on_invalidation})
+                self._pubsub_thread = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_subscriber_error,
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Cache invalidation subscribe error: {e}")
+                pubsub.close()
+                return False
+            self._pubsub = pubsub
+            self._pubsub_pid = os.getpid()
+            return True
+
+    def _on_subscriber_error(self, error: Exception, pubsub, thread) -> None:
+        """
+        Listener thread hatası (bağlantı koptu vb.): thread'i durdur, L1'i
+        boşalt; bir sonraki cache erişimi hemen yeniden abone olur
+        """
+        logger.warning(f"⚠️ Cache invalidation listener error, resubscribing: {error}")
+        if self._pubsub_thread is thread:
+            self._pubsub_thread = None
+            self._resubscribe_at = 0.0
+        thread.stop()
+        self.l1.clear()
+
+    def _l1_fill_ttl(self, ttl: float) -> float:
+        """L1 TTL, capped while invalidations cannot be received"""
+        if self._ensure_subscriber():
+            return ttl
+        return min(ttl, L1_DEGRADED_TTL)
+
+    def _on_invalidation(self, message: dict) -> None:
+        """Apply an invalidation message published by another worker"""
+        try:
+            payload = json.loads(message["data"])
+            if payload.get("origin") == self.instance_id:
+                return
+            if payload.get("flush"):
+                self.l1.clear()
+                return
+            for key in payload.get("keys", []):
+                self.l1.delete(key)
+            for pattern in payload.get("patterns", []):
+                self.l1.delete_by_pattern(pattern)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache invalidation message error: {e}")
+
+    def _publish_invalidation(
+        self,
+        keys: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        flush: bool = False,
+    ) -> None:
+        """Notify other workers/pods to drop their L1 copies"""
+        if self.l1 is None:
+            return
+        keys = [k for k in keys if _l1_ttl(k)]
+        patterns = list(patterns)
+        if not (keys or patterns or flush):
+            return
+        try:
+            self.client.publish(
+                CACHE_INVALIDATION_CHANNEL,
+                json.dumps(
+                    {
+                        "origin": self.instance_id,
+                        "keys": keys,
+                        "patterns": patterns,
+                        "flush": flush,
+                    }
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Cache invalidation publish error: {e}")
+
+    def get_stats(self) -> dict:
+        """Per-tier hit/miss counters"""
+        stats = dict(self.stats)
+        stats["l1_enabled"] = self.l1 is not None
+        if self.l1 is not None:
+            stats["l1_entries"] = len(self.l1)
+            stats["l1_bytes"] = self.l1.size_bytes
+            stats["l1_evictions"] = self.l1.evictions
+        return stats
+
+    # ========== BASIC OPERATIONS ==========
+
+    def _decode(self, payload: bytes) -> Any:
+        try:
+            return self.codec.decode(payload)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache decode error: {e}")
+            return None
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
+        l1_ttl = _l1_ttl(key) if self.l1 is not None else 0
+        if l1_ttl:
+            self._ensure_subscriber()
+            # L1 ham payload tutar; her hit'te decode edilir ki
+            # çağıranlar paylaşılan nesneyi değiştiremesin
+            payload = self.l1.get(key)
+            if payload is not None:
+                self.stats["l1_hits"] += 1
+                record_cache("l1", True)
+                return self._decode(payload)
+            self.stats["l1_misses"] += 1
+            record_cache("l1", False)
+
         try:
-            value = self.client.get(key)
+            start = time.perf_counter()
+            if l1_ttl:
+                # Kalan TTL aynı round trip'te: L1 kopyası Redis'ten uzun yaşamasın
+                pipe = self.data_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = pipe.execute()
+            else:
+                value = self.data_client.get(key)
+            record_cache_latency("get", time.perf_counter() - start)
             if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
+                self.stats["redis_hits"] += 1
+                record_cache("redis", True)
+                if l1_ttl:
+                    ttl = self._l1_fill_ttl(_remaining_ttl(l1_ttl, pttl))
+                    self.l1.set(key, value, ttl, len(value))
+                return self._decode(value)
+            self.stats["redis_misses"] += 1
+            record_cache("redis", False)
             return None
         except Exception as e:
             logger.warning(f"⚠️ Cache get error ({key}): {e}")
             return None
 
-    def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL"""
-        try:
-            # Serialize if needed
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+    def set(
+        self, key: str, value: Any, ttl: int = 300, tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set value in cache with TTL
 
-            self.client.setex(key, ttl, value)
+        tags: key'i "user:{id}", "video:{id}" gibi tag set'lerine ekler;
+        invalidate_tags() bu key'leri KEYS/SCAN olmadan siler
+        """
+        try:
+            payload = self.codec.encode(value)
+            start = time.perf_counter()
+            if tags:
+                pipe = self.data_client.pipeline(transaction=False)
+                self._queue_set(pipe, key, payload, ttl, tags)
+                pipe.execute()
+            else:
+                self.data_client.setex(key, ttl, payload)
+            record_cache_latency("set", time.perf_counter() - start)
             logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
-            return True
         except Exception as e:
             logger.warning(f"⚠️ Cache set error ({key}): {e}")
             return False
 
+        if self._fill_l1(key, payload, ttl):
+            self._publish_invalidation(keys=[key])
+        return True
+
+    @staticmethod
+    def _queue_set(pipe, key: str, payload: bytes, ttl: int, tags) -> None:
+        pipe.setex(key, ttl, payload)
+        for tag in tags or ():
+            tag_key = f"{CACHE_PREFIXES['tag']}{tag}"
+            pipe.sadd(tag_key, key)
+            # Set, en uzun yaşayan üyesi kadar yaşar: yeni set'e TTL ver,
+            # var olanınkini sadece uzatırsa güncelle (Redis 7+)
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+
+    def _fill_l1(self, key: str, payload: bytes, ttl: int) -> bool:
+        """Store payload in L1 if the key is L1-cacheable"""
+        l1_ttl = _l1_ttl(key) if self.l1 is not None else 0
+        if not l1_ttl:
+            return False
+        self.l1.set(key, payload, self._l1_fill_ttl(min(ttl, l1_ttl)), len(payload))
+        return True
+
+    # ========== BULK OPERATIONS ==========
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get many values in one round trip (MGET)
+        Returns only hits: {key: value}
+        """
+        result: Dict[str, Any] = {}
+        remote = []
+        for key in keys:
+            if self.l1 is not None and _l1_ttl(key):
+                self._ensure_subscriber()
+                payload = self.l1.get(key)
+                if payload is not None:
+                    self.stats["l1_hits"] += 1
+                    record_cache("l1", True)
+                    result[key] = self._decode(payload)
+                    continue
+                self.stats["l1_misses"] += 1
+                record_cache("l1", False)
+            remote.append(key)
+
+        if not remote:
+            return result
+        l1_keys = [k for k in remote if _l1_ttl(k)] if self.l1 is not None else []
+        try:
+            start = time.perf_counter()
+            if l1_keys:
+                pipe = self.data_client.pipeline(transaction=False)
+                pipe.mget(remote)
+                for key in l1_keys:
+                    pipe.pttl(key)
+                values, *pttls = pipe.execute()
+            else:
+                values, pttls = self.data_client.mget(remote), []
+            record_cache_latency("mget", time.perf_counter() - start)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache get_many error ({len(remote)} keys): {e}")
+            return result
+        remaining = dict(zip(l1_keys, pttls))
+
+        for key, payload in zip(remote, values):
+            if payload is None:
+                self.stats["redis_misses"] += 1
+                record_cache("redis", False)
+                continue
+            self.stats["redis_hits"] += 1
+            record_cache("redis", True)
+            if key in remaining:
+                ttl = self._l1_fill_ttl(_remaining_ttl(_l1_ttl(key), remaining[key]))
+                self.l1.set(key, payload, ttl, len(payload))
+            result[key] = self._decode(payload)
+        return result
+
+    def set_many(
+        self,
+        mapping: Dict[str, Any],
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Set many values (same TTL/tags) in one pipelined round trip"""
+        if not mapping:
+            return True
+        tags = list(tags or ())
+        try:
+            payloads = {key: self.codec.encode(value) for key, value in mapping.items()}
+            pipe = self.data_client.pipeline(transaction=False)
+            for key, payload in payloads.items():
+                self._queue_set(pipe, key, payload, ttl, tags)
+            pipe.execute()
+            logger.debug(f"Cache SET_MANY: {len(payloads)} keys (TTL: {ttl}s)")
+        except Exception as e:
+            logger.warning(f"⚠️ Cache set_many error ({len(mapping)} keys): {e}")
+            return False
+
+        filled = [key for key, payload in payloads.items() if self._fill_l1(key, payload, ttl)]
+        self._publish_invalidation(keys=filled)
+        return True
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete many keys in batched UNLINK calls"""
+        try:
+            return self._delete_batched(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache delete_many error: {e}")
+            return 0
+
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
+        if self.l1 is not None:
+            self.l1.delete(key)
+            self._publish_invalidation(keys=[key])
         try:
             self.client.delete(key)
             logger.debug(f"Cache DELETE: {key}")
@@ -94,19 +555,106 @@ class RedisCache:
             logger.warning(f"⚠️ Cache delete error ({key}): {e}")
             return False
 
+    def _delete_batched(self, keys: Iterable[str], publish: bool = True) -> int:
+        """UNLINK keys in fixed-size batches (one round trip per batch)"""
+        deleted = 0
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) >= INVALIDATION_BATCH_SIZE:
+                deleted += self._unlink(batch, publish)
+                batch = []
+        if batch:
+            deleted += self._unlink(batch, publish)
+        return deleted
+
+    def _unlink(self, batch: list, publish: bool) -> int:
+        if self.l1 is not None:
+            for key in batch:
+                self.l1.delete(key)
+            if publish:
+                self._publish_invalidation(keys=batch)
+        return self.client.unlink(*batch)
+
     def delete_by_pattern(self, pattern: str) -> int:
-        """Delete multiple keys matching pattern"""
+        """
+        Delete multiple keys matching pattern
+        KEYS yerine artımlı SCAN kullanır; Redis'i bloklamaz ama maliyet
+        hâlâ keyspace boyutuyla orantılı, mümkünse invalidate_tags() kullanın
+        """
+        if self.l1 is not None:
+            self.l1.delete_by_pattern(pattern)
+            self._publish_invalidation(patterns=[pattern])
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                deleted = self.client.delete(*keys)
-                logger.debug(f"Cache PATTERN DELETE: {pattern} ({deleted} keys)")
-                return deleted
-            return 0
+            deleted = self._delete_batched(
+                self.client.scan_iter(match=pattern, count=INVALIDATION_BATCH_SIZE),
+                publish=False,
+            )
+            logger.debug(f"Cache PATTERN DELETE: {pattern} ({deleted} keys)")
+            return deleted
         except Exception as e:
             logger.warning(f"⚠️ Cache pattern delete error ({pattern}): {e}")
             return 0
 
+    def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key attached to the given tags, O(keys-in-tag)"""
+        deleted = 0
+        for tag in tags:
+            tag_key = f"{CACHE_PREFIXES['tag']}{tag}"
+            # Tag set'i önce atomik olarak kenara al; silme sırasında
+            # eklenen yeni key'ler yeni set'e düşer ve kaybolmaz
+            purge_key = f"{tag_key}:purge:{uuid.uuid4().hex}"
+            try:
+                self.client.rename(tag_key, purge_key)
+            except redis.ResponseError:
+                continue  # tag set yok
+            except Exception as e:
+                logger.warning(f"⚠️ Cache tag invalidation error ({tag}): {e}")
+                continue
+            try:
+                deleted += self._delete_batched(
+                    self.client.sscan_iter(purge_key, count=INVALIDATION_BATCH_SIZE)
+                )
+                self.client.unlink(purge_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Cache tag invalidation error ({tag}): {e}")
+        logger.debug(f"Cache TAG DELETE: {', '.join(tags)} ({deleted} keys)")
+        return deleted
+
+    def compact_tags(self, *tags: str) -> int:
+        """
+        Drop expired members from tag sets (all tag sets if none given)
+        Sık yazılan tag'lerin ("metrics" gibi) set'i hiç expire olmaz;
+        içindeki ölü key'ler periyodik olarak buradan temizlenir
+        """
+        prefix = CACHE_PREFIXES["tag"]
+        if tags:
+            tag_keys = [f"{prefix}{tag}" for tag in tags]
+        else:
+            tag_keys = self.client.scan_iter(match=f"{prefix}*", count=INVALIDATION_BATCH_SIZE)
+        removed = 0
+        try:
+            for tag_key in tag_keys:
+                if ":purge:" in tag_key:
+                    continue  # invalidate_tags() o an bu set'i siliyor
+                removed += self._prune_tag(tag_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache tag compaction error: {e}")
+        logger.debug(f"Cache TAG COMPACT: {removed} expired members")
+        return removed
+
+    def _prune_tag(self, tag_key: str) -> int:
+        removed = 0
+        batch = []
+        for member in self.client.sscan_iter(tag_key, count=INVALIDATION_BATCH_SIZE):
+            batch.append(member)
+            if len(batch) >= INVALIDATION_BATCH_SIZE:
+                removed += self._prune_tag_script(keys=[tag_key], args=batch)
+                batch = []
+        if batch:
+            removed += self._prune_tag_script(keys=[tag_key], args=batch)
+        return removed
+
     def exists(self, key: str) -> bool:
         """Check if key exists"""
         try:
@@ -125,6 +673,9 @@ class RedisCache:
 
     def clear_all(self) -> bool:
         """Clear all cache (use with caution)"""
+        if self.l1 is not None:
+            self.l1.clear()
+            self._publish_invalidation(flush=True)
         try:
             self.client.flushdb()
             logger.warning("⚠️ Cache tamamen temizlendi")
@@ -145,11 +696,19 @@ class RedisCache:
             f"{CACHE_PREFIXES['user']}profile:{user_id}",
             profile,
             CACHE_DEFAULTS["user_profile"],
+            tags=[f"user:{user_id}"],
         )
 
-    def invalidate_user(self, user_id: str) -> int:
-        """Invalidate all cache for a user"""
-        return self.delete_by_pattern(f"{CACHE_PREFIXES['user']}*:{user_id}")
+    def invalidate_user(self, user_id: str, scan_fallback: bool = True) -> int:
+        """
+        Invalidate all cache for a user
+        scan_fallback: tag'siz (veya tag'ler gelmeden önce) yazılmış key'ler
+        için ek olarak SCAN yap; sadece tüm yazanların tag'lediği biliniyorsa kapatın
+        """
+        deleted = self.invalidate_tags(f"user:{user_id}")
+        if scan_fallback:
+            deleted += self.delete_by_pattern(f"{CACHE_PREFIXES['user']}*:{user_id}")
+        return deleted
 
     def get_video_metadata(self, video_id: str) -> Optional[dict]:
         """Get cached video metadata"""
@@ -161,11 +720,19 @@ class RedisCache:
             f"{CACHE_PREFIXES['video']}meta:{video_id}",
             metadata,
             CACHE_DEFAULTS["video_metadata"],
+            tags=[f"video:{video_id}"],
         )
 
-    def invalidate_video(self, video_id: str) -> int:
-        """Invalidate all cache for a video"""
-        return self.delete_by_pattern(f"{CACHE_PREFIXES['video']}*:{video_id}")
+    def invalidate_video(self, video_id: str, scan_fallback: bool = True) -> int:
+        """
+        Invalidate all cache for a video
+        scan_fallback: tag'siz (veya tag'ler gelmeden önce) yazılmış key'ler
+        için ek olarak SCAN yap; sadece tüm yazanların tag'lediği biliniyorsa kapatın
+        """
+        deleted = self.invalidate_tags(f"video:{video_id}")
+        if scan_fallback:
+            deleted += self.delete_by_pattern(f"{CACHE_PREFIXES['video']}*:{video_id}")
+        return deleted
 
     def get_metrics(self, metric_key: str) -> Optional[dict]:
         """Get cached metrics"""
@@ -177,16 +744,35 @@ class RedisCache:
             f"{CACHE_PREFIXES['metrics']}{metric_key}",
             metrics,
             CACHE_DEFAULTS["metrics"],
+            tags=["metrics"],
         )
 
     def invalidate_metrics(self, prefix: str = "") -> int:
         """Invalidate metrics cache"""
-        pattern = (
-            f"{CACHE_PREFIXES['metrics']}{prefix}*"
-            if prefix
-            else f"{CACHE_PREFIXES['metrics']}*"
-        )
-        return self.delete_by_pattern(pattern)
+        if not prefix:
+            return self.invalidate_tags("metrics")
+        return self.delete_by_pattern(f"{CACHE_PREFIXES['metrics']}{prefix}*")
+
+    # ========== LOCKS ==========
+
+    def acquire_lock(self, name: str, timeout: float = 10.0) -> Optional[str]:
+        """Acquire a short-lived distributed lock, returns token or None"""
+        token = uuid.uuid4().hex
+        try:
+            if self.client.set(f"lock:{name}", token, nx=True, px=int(timeout * 1000)):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Cache lock error ({name}): {e}")
+            # Redis erişilemiyorsa kilitsiz devam et
+            return token
+
+    def release_lock(self, name: str, token: str) -> None:
+        """Release a lock only if we still own it"""
+        try:
+            self._release_lock_script(keys=[f"lock:{name}"], args=[token])
+        except Exception as e:
+            logger.warning(f"⚠️ Cache unlock error ({name}): {e}")
 
     def increment_rate_limit(self, user_id: str, endpoint: str) -> int:
         """Increment rate limit counter"""
@@ -218,10 +804,20 @@ class RedisCache:
 _cache_instance: Optional[RedisCache] = None
 
 
-def init_cache(redis_url: Optional[str] = None) -> RedisCache:
+def reset_cache_connections():
+    """Fork sonrası: master'dan kopyalanan Redis bağlantılarını bırak"""
+    if _cache_instance is None:
+        return
+    _cache_instance.client.connection_pool.reset()
+    _cache_instance.data_client.connection_pool.reset()
+
+
+def init_cache(
+    redis_url: Optional[str] = None, l1_enabled: Optional[bool] = None
+) -> RedisCache:
     """Initialize global cache instance"""
     global _cache_instance
-    _cache_instance = RedisCache(redis_url)
+    _cache_instance = RedisCache(redis_url, l1_enabled=l1_enabled)
     return _cache_instance
 
 
@@ -232,39 +828,283 @@ def get_cache() -> RedisCache:
     return _cache_instance
 
 
-# Cache decorator for functions
-def cached(cache_key: str, ttl: int = 300):
-    """Decorator to cache function results"""
+def compact_tag_sets() -> int:
+    """Periyodik görev: tüm tag set'lerinden süresi dolmuş üyeleri at"""
+    cache = _get_cache_or_none()
+    if cache is None:
+        return 0
+    removed = cache.compact_tags()
+    logger.info(f"✅ Cache tag compaction: {removed} üye silindi")
+    return removed
+
+
+def _get_cache_or_none() -> Optional[RedisCache]:
+    """Global cache instance, or None when cache is not available"""
+    return _cache_instance
+
+
+# ========== CACHE DECORATOR ==========
+
+_ENVELOPE_MARKER = "__cached__"
+
+
+class _Flight:
+    """In-process single-flight slot for one cache key"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _make_envelope(value: Any, ttl: int, delta: float) -> dict:
+    return {
+        _ENVELOPE_MARKER: 1,
+        "v": value,
+        "exp": time.time() + ttl,
+        "delta": delta,
+    }
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and entry.get(_ENVELOPE_MARKER) == 1
+
+
+def _needs_refresh(entry: dict, beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch)
+    Hesaplama süresi (delta) uzun olan key'ler expiry'den biraz önce,
+    rastgele tek bir çağıran tarafından yenilenir
+    """
+    now = time.time()
+    if now >= entry["exp"]:
+        return True
+    if beta <= 0:
+        return False
+    return now - entry.get("delta", 0) * beta * math.log(random.random() or 1e-12) >= entry["exp"]
+
+
+def _key_builder(cache_key, func):
+    """Build a key function from a template ("video:meta:{video_id}") or callable"""
+    if callable(cache_key):
+        return cache_key
+    if "{" not in cache_key:
+        return lambda *args, **kwargs: cache_key
+
+    signature = inspect.signature(func)
+
+    def build(*args, **kwargs):
+        bound = signature.bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        return cache_key.format(**bound.arguments)
+
+    return build
+
+
+def cached(
+    cache_key,
+    ttl: int = 300,
+    stale_ttl: int = 0,
+    beta: float = 1.0,
+    lock_timeout: float = 10.0,
+    tags: Optional[Iterable] = None,
+):
+    """
+    Decorator to cache function results
+
+    Args:
+        cache_key: Sabit key, argüman şablonu ("user:dashboard:{user_id}")
+            veya key üreten callable
+        ttl: Değerin taze sayıldığı süre (saniye)
+        stale_ttl: TTL dolduktan sonra bayat değerin sunulabileceği süre;
+            bu sürede değer arka planda yenilenir (stale-while-revalidate)
+        beta: Probabilistic early expiration katsayısı (0 = kapalı)
+        lock_timeout: Başka bir çağıranın hesaplamasını bekleme süresi
+        tags: Invalidation tag şablonları (["user:{user_id}"]), key gibi
+            argümanlardan üretilir
+
+    Cache yoksa (init_cache çağrılmamış) fonksiyon doğrudan çalıştırılır.
+    """
 
     def decorator(func):
-        async def async_wrapper(*args, **kwargs):
-            cache = get_cache()
+        build_key = _key_builder(cache_key, func)
+        tag_builders = [_key_builder(tag, func) for tag in (tags or [])]
+        redis_ttl = ttl + stale_ttl
+        inflight: Dict[str, Any] = {}
+        inflight_lock = threading.Lock()
+        # Event loop task'lara sadece zayıf referans tutar; bitene kadar burada dursun
+        background_tasks: Set[asyncio.Task] = set()
 
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
+        def store(cache, key, value, delta, args, kwargs):
+            cache.set(
+                key,
+                _make_envelope(value, ttl, delta),
+                redis_ttl,
+                tags=[build(*args, **kwargs) for build in tag_builders],
+            )
 
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
+        # ---------- sync ----------
+
+        def compute(cache, key, args, kwargs):
+            started = time.monotonic()
+            result = func(*args, **kwargs)
+            store(cache, key, result, time.monotonic() - started, args, kwargs)
             return result
 
+        def refresh_in_background(cache, key, args, kwargs):
+            token = cache.acquire_lock(key, lock_timeout)
+            if token is None:
+                return  # başka bir worker zaten yeniliyor
+
+            def run():
+                try:
+                    compute(cache, key, args, kwargs)
+                    logger.debug(f"Cache REFRESH: {key}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Cache refresh error ({key}): {e}")
+                finally:
+                    cache.release_lock(key, token)
+
+            threading.Thread(target=run, daemon=True).start()
+
+        def compute_single_flight(cache, key, args, kwargs):
+            with inflight_lock:
+                flight = inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = inflight[key] = _Flight()
+
+            if not leader:
+                # Aynı process'te hesaplayan var, sonucu bekle
+                if flight.event.wait(lock_timeout):
+                    if flight.error is not None:
+                        raise flight.error
+                    return flight.result
+                return func(*args, **kwargs)
+
+            try:
+                token = cache.acquire_lock(key, lock_timeout)
+                if token is None:
+                    # Başka bir process hesaplıyor, cache'e yazılmasını bekle
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        time.sleep(0.05)
+                        entry = cache.get(key)
+                        if _is_envelope(entry):
+                            flight.result = entry["v"]
+                            return flight.result
+                try:
+                    flight.result = compute(cache, key, args, kwargs)
+                    return flight.result
+                finally:
+                    if token is not None:
+                        cache.release_lock(key, token)
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                flight.event.set()
+                with inflight_lock:
+                    inflight.pop(key, None)
+
+        @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            cache = get_cache()
+            cache = _get_cache_or_none()
+            if cache is None:
+                return func(*args, **kwargs)
 
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
+            key = build_key(*args, **kwargs)
+            entry = cache.get(key)
+            if _is_envelope(entry):
+                if _needs_refresh(entry, beta):
+                    refresh_in_background(cache, key, args, kwargs)
+                logger.debug(f"Cache HIT: {key}")
+                return entry["v"]
 
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
+            return compute_single_flight(cache, key, args, kwargs)
+
+        # ---------- async ----------
+
+        async def compute_async(cache, key, args, kwargs):
+            started = time.monotonic()
+            result = await func(*args, **kwargs)
+            store(cache, key, result, time.monotonic() - started, args, kwargs)
             return result
 
+        def refresh_in_background_async(cache, key, args, kwargs):
+            token = cache.acquire_lock(key, lock_timeout)
+            if token is None:
+                return
+
+            async def run():
+                try:
+                    await compute_async(cache, key, args, kwargs)
+                    logger.debug(f"Cache REFRESH: {key}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Cache refresh error ({key}): {e}")
+                finally:
+                    cache.release_lock(key, token)
+
+            task = asyncio.ensure_future(run())
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
+        async def compute_single_flight_async(cache, key, args, kwargs):
+            flight = inflight.get(key)
+            if flight is not None:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(flight), lock_timeout)
+                except asyncio.TimeoutError:
+                    if flight.done():
+                        raise  # lider'in kendi hatası
+                    # Lider takıldı: sync yol gibi kendimiz hesaplayalım
+                    return await func(*args, **kwargs)
+
+            flight = inflight[key] = asyncio.get_running_loop().create_future()
+            try:
+                token = cache.acquire_lock(key, lock_timeout)
+                result = None
+                filled = False
+                if token is None:
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                        entry = cache.get(key)
+                        if _is_envelope(entry):
+                            result, filled = entry["v"], True
+                            break
+                if not filled:
+                    try:
+                        result = await compute_async(cache, key, args, kwargs)
+                    finally:
+                        if token is not None:
+                            cache.release_lock(key, token)
+                flight.set_result(result)
+                return result
+            except BaseException as e:
+                flight.set_exception(e)
+                # Bekleyen yoksa "exception never retrieved" uyarısını engelle
+                flight.exception()
+                raise
+            finally:
+                inflight.pop(key, None)
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            cache = _get_cache_or_none()
+            if cache is None:
+                return await func(*args, **kwargs)
+
+            key = build_key(*args, **kwargs)
+            entry = cache.get(key)
+            if _is_envelope(entry):
+                if _needs_refresh(entry, beta):
+                    refresh_in_background_async(cache, key, args, kwargs)
+                logger.debug(f"Cache HIT: {key}")
+                return entry["v"]
+
+            return await compute_single_flight_async(cache, key, args, kwargs)
+
         # Return appropriate wrapper
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
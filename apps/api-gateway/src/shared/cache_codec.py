@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache value codec
+Pluggable serializer (json / orjson / msgpack) + transparent compression
+datetime ve ObjectId değerleri type tag ile round-trip yapar
+"""
+
+import json
+import os
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - pymongo ile gelir
+    ObjectId = None
+
+# Encoded payload formatı: MAGIC + serializer id + compression id + body
+# MAGIC geçerli bir JSON/metin başlangıcı olamaz, eski (düz JSON) değerler
+# bu sayede ayırt edilir ve okunmaya devam eder
+MAGIC = b"\x00"
+COMPRESSION_NONE = b"n"
+COMPRESSION_ZLIB = b"z"
+
+# Type tag'leri (JSON tabanlı codec'ler için)
+TAG_DATETIME = "$dt"
+TAG_DATE = "$date"
+TAG_OBJECTID = "$oid"
+
+# msgpack ext type kodları
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_OBJECTID = 3
+
+
+def _tag_default(obj: Any) -> Any:
+    """JSON default hook: datetime/ObjectId -> tagged dict"""
+    if isinstance(obj, datetime):
+        return {TAG_DATETIME: obj.isoformat()}
+    if isinstance(obj, date):
+        return {TAG_DATE: obj.isoformat()}
+    if ObjectId is not None and isinstance(obj, ObjectId):
+        return {TAG_OBJECTID: str(obj)}
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def _untag(obj: Dict) -> Any:
+    """JSON object hook: tagged dict -> datetime/ObjectId"""
+    if len(obj) == 1:
+        if TAG_DATETIME in obj:
+            return datetime.fromisoformat(obj[TAG_DATETIME])
+        if TAG_DATE in obj:
+            return date.fromisoformat(obj[TAG_DATE])
+        if TAG_OBJECTID in obj and ObjectId is not None:
+            return ObjectId(obj[TAG_OBJECTID])
+    return obj
+
+
+def _untag_tree(value: Any) -> Any:
+    """Walk a decoded tree and restore tagged values (orjson has no object_hook)"""
+    if isinstance(value, dict):
+        value = {k: _untag_tree(v) for k, v in value.items()}
+        return _untag(value)
+    if isinstance(value, list):
+        return [_untag_tree(v) for v in value]
+    return value
+
+
+class JsonSerializer:
+    """Stdlib json (her zaman mevcut)"""
+
+    id = b"j"
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_tag_default, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=_untag)
+
+
+class OrjsonSerializer:
+    """orjson - stdlib json'dan ~5-10x hızlı"""
+
+    id = b"o"
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(
+            value,
+            default=_tag_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+    def loads(self, data: bytes) -> Any:
+        value = orjson.loads(data)
+        # Tag yoksa ağacı dolaşmaya gerek yok
+        if b'"$' in data:
+            return _untag_tree(value)
+        return value
+
+
+class MsgpackSerializer:
+    """msgpack - binary, en küçük payload"""
+
+    id = b"m"
+    name = "msgpack"
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode("utf-8"))
+        if isinstance(obj, date):
+            return msgpack.ExtType(EXT_DATE, obj.isoformat().encode("utf-8"))
+        if ObjectId is not None and isinstance(obj, ObjectId):
+            return msgpack.ExtType(EXT_OBJECTID, obj.binary)
+        raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == EXT_DATETIME:
+            return datetime.fromisoformat(data.decode("utf-8"))
+        if code == EXT_DATE:
+            return date.fromisoformat(data.decode("utf-8"))
+        if code == EXT_OBJECTID and ObjectId is not None:
+            return ObjectId(data)
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(
+            data, ext_hook=self._ext_hook, raw=False, strict_map_key=False
+        )
+
+
+SERIALIZERS = {JsonSerializer.id: JsonSerializer()}
+if orjson is not None:
+    SERIALIZERS[OrjsonSerializer.id] = OrjsonSerializer()
+if msgpack is not None:
+    SERIALIZERS[MsgpackSerializer.id] = MsgpackSerializer()
+
+_SERIALIZERS_BY_NAME = {s.name: s for s in SERIALIZERS.values()}
+
+
+class CacheCodec:
+    """Encode/decode cache values"""
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compress_min_bytes: Optional[int] = None,
+        compress_level: Optional[int] = None,
+    ):
+        name = serializer or os.getenv(
+            "CACHE_SERIALIZER", "orjson" if orjson is not None else "json"
+        )
+        if name not in _SERIALIZERS_BY_NAME:
+            logger.warning(f"⚠️ Cache serializer '{name}' yok, json kullanılıyor")
+            name = "json"
+        self.serializer = _SERIALIZERS_BY_NAME[name]
+        self.compress_min_bytes = (
+            compress_min_bytes
+            if compress_min_bytes is not None
+            else int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+        )
+        self.compress_level = (
+            compress_level
+            if compress_level is not None
+            else int(os.getenv("CACHE_COMPRESS_LEVEL", 6))
+        )
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize and (above threshold) compress a value"""
+        body = self.serializer.dumps(value)
+        compression = COMPRESSION_NONE
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            compressed = zlib.compress(body, self.compress_level)
+            if len(compressed) < len(body):
+                body = compressed
+                compression = COMPRESSION_ZLIB
+        return MAGIC + self.serializer.id + compression + body
+
+    def decode(self, payload: Any) -> Any:
+        """Decode a payload written by any codec (or a legacy plain value)"""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if not payload.startswith(MAGIC):
+            # Codec öncesi yazılmış düz JSON / string değer
+            text = payload.decode("utf-8")
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                return text
+
+        serializer = SERIALIZERS.get(payload[1:2])
+        if serializer is None:
+            raise ValueError(f"Unknown cache serializer: {payload[1:2]!r}")
+        body = payload[3:]
+        if payload[2:3] == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        return serializer.loads(body)
@@ -9,11 +9,16 @@ import os
 from celery import Celery
 from loguru import logger
 
+from .tracing import instrument_celery, instrument_redis
+
 # Global celery instance - preemptively create
 celery = Celery(
     'ultrarslanoglu',
     broker=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-    backend=os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    backend=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    # Beat/repair task'ları bu modüllerde; worker -A src.shared.celery_app ile
+    # başladığında da kayıtlı olmalı
+    include=['src.modules.analytics'],
 )
 
 # Default configuration
@@ -26,8 +31,29 @@ celery.conf.update(
     task_track_started=True,
     task_time_limit=3600,  # 1 hour
     task_soft_time_limit=3000,  # 50 minutes
+    beat_schedule={
+        # Artımlı dashboard özetlerindeki olası drift'i gece düzelt
+        'rebuild-dashboard-summaries': {
+            'task': 'src.modules.analytics.rebuild_dashboard_summaries',
+            'schedule': 24 * 60 * 60,
+        },
+        # Trending skorlarını yeniden ölçekle, düşük skorları at
+        'compact-trending': {
+            'task': 'src.modules.analytics.compact_trending_scores',
+            'schedule': 10 * 60,
+        },
+        # Sürekli yazılan tag set'lerinde biriken ölü key'leri temizle
+        'compact-cache-tags': {
+            'task': 'src.modules.analytics.compact_cache_tags',
+            'schedule': 30 * 60,
+        },
+    },
 )
 
+# Worker'lar da bu modülü yükler: publish/execute span'leri ve traceparent header
+instrument_celery()
+instrument_redis()
+
 
 def init_celery(config):
     """Celery'yi başlat"""
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response compression
+Accept-Encoding'e göre zstd / br / gzip, minimum boyut eşiği ve
+ayarlanabilir seviye. ETag'li (statik/cache'lenebilir) yanıtların sıkışmış
+varyantları LRU'da tutulur, aynı byte'lar her istekte tekrar sıkıştırılmaz;
+yüksek seviyeli varyant arka plan thread'inde üretilip cache'e yazılır.
+"""
+
+import gzip
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from flask import request
+from loguru import logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+LEVELS = {
+    "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    "br": int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
+    "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)),
+}
+# Precompressed varyantlar bir kez, istek yolu dışında üretilir: yüksek seviye
+# karşılanabilir (istek ilk seferde LEVELS ile sıkıştırılıp cache'lenir)
+STATIC_LEVELS = {
+    "gzip": int(os.getenv("COMPRESSION_STATIC_GZIP_LEVEL", 9)),
+    "br": int(os.getenv("COMPRESSION_STATIC_BROTLI_QUALITY", 11)),
+    "zstd": int(os.getenv("COMPRESSION_STATIC_ZSTD_LEVEL", 19)),
+}
+CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# Arka plan yükseltme kuyruğu (dolarsa varyant normal seviyede kalır)
+STATIC_QUEUE_SIZE = int(os.getenv("COMPRESSION_STATIC_QUEUE_SIZE", 64))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Sunucu tercih sırası (eşit q-değerinde ilk gelen seçilir)
+ENCODERS = {"gzip": _gzip}
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd
+
+PREFERENCE = [
+    name
+    for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if name in ENCODERS
+]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding -> seçilen encoding (q-değeri en yüksek, eşitse tercih sırası)"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in PREFERENCE:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionStats:
+    """Encoding başına CPU süresi ve kazanılan byte'lar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = {}
+        self.skipped = 0
+
+    def skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def record(self, encoding: str, size_in: int, size_out: int, cpu_ms: float, cached: bool):
+        with self._lock:
+            entry = self._data.setdefault(
+                encoding,
+                {"responses": 0, "cache_hits": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0},
+            )
+            entry["responses"] += 1
+            entry["bytes_in"] += size_in
+            entry["bytes_out"] += size_out
+            if cached:
+                entry["cache_hits"] += 1
+            else:
+                entry["cpu_ms"] += cpu_ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            result = {"skipped": self.skipped, "encodings": {}}
+            for name, entry in self._data.items():
+                saved = entry["bytes_in"] - entry["bytes_out"]
+                result["encodings"][name] = {
+                    **entry,
+                    "cpu_ms": round(entry["cpu_ms"], 2),
+                    "bytes_saved": saved,
+                    "ratio": round(entry["bytes_out"] / entry["bytes_in"], 3)
+                    if entry["bytes_in"]
+                    else None,
+                    # CPU ms başına kazanılan KiB: seviye ayarı için
+                    "kib_saved_per_cpu_ms": round(saved / 1024 / entry["cpu_ms"], 1)
+                    if entry["cpu_ms"]
+                    else None,
+                }
+            return result
+
+
+class PrecompressedCache:
+    """(ETag, encoding) -> sıkışmış gövde, byte sınırlı LRU"""
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is not None:
+                self._entries.move_to_end((etag, encoding))
+            return body
+
+    def set(self, etag: str, encoding: str, body: bytes, replace: bool = False):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            key = (etag, encoding)
+            previous = self._entries.get(key)
+            if previous is not None:
+                if not replace:
+                    return
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class StaticRecompressor:
+    """
+    Cache'lenen varyantları STATIC_LEVELS ile yeniden sıkıştırır
+    (sınırlı kuyruk + process başına tek thread, fork-safe)
+    """
+
+    def __init__(self, cache: PrecompressedCache):
+        self.cache = cache
+        self._queue: "queue.Queue[Tuple[str, str, bytes]]" = queue.Queue(maxsize=STATIC_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._pid = None
+        self.stats = {"upgraded": 0, "dropped": 0, "cpu_ms": 0.0}
+
+    def submit(self, etag: str, encoding: str, data: bytes) -> None:
+        if STATIC_LEVELS[encoding] <= LEVELS[encoding]:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((etag, encoding, data))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _ensure_thread(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=STATIC_QUEUE_SIZE)
+            threading.Thread(target=self._run, name="static-compressor", daemon=True).start()
+            self._pid = os.getpid()
+
+    def upgrade(self, etag: str, encoding: str, data: bytes) -> None:
+        started = time.thread_time()
+        body = ENCODERS[encoding](data, STATIC_LEVELS[encoding])
+        self.stats["cpu_ms"] += (time.thread_time() - started) * 1000
+        current = self.cache.get(etag, encoding)
+        if current is not None and len(body) < len(current):
+            self.cache.set(etag, encoding, body, replace=True)
+            self.stats["upgraded"] += 1
+
+    def _run(self) -> None:
+        while True:
+            etag, encoding, data = self._queue.get()
+            try:
+                self.upgrade(etag, encoding, data)
+            except Exception as e:
+                logger.warning(f"⚠️ Statik sıkıştırma hatası ({encoding}): {e}")
+
+
+_stats = CompressionStats()
+_precompressed = PrecompressedCache()
+_recompressor = StaticRecompressor(_precompressed)
+
+
+def _compressible(response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.is_streamed or response.direct_passthrough:
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    if "no-transform" in response.headers.get("Cache-Control", ""):
+        return False
+    mimetype = response.mimetype or ""
+    return any(mimetype.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+
+def compress_response(response):
+    """after_request: yanıtı negotiate edilen encoding ile sıkıştır"""
+    if response.status_code == 304:
+        # 200'de gönderilen (weak) ETag ile tutarlı kalsın
+        etag, weak = response.get_etag()
+        if etag and not weak and negotiate(request.headers.get("Accept-Encoding", "")):
+            response.set_etag(etag, weak=True)
+        return response
+    if not _compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+    data = response.get_data()
+    if encoding is None or len(data) < MIN_BYTES:
+        _stats.skip()
+        return response
+
+    etag, _ = response.get_etag()
+    # Sadece public yanıtlar paylaşılır (private gövde kullanıcıya göre değişir)
+    if "public" not in response.headers.get("Cache-Control", ""):
+        etag = None
+    body = _precompressed.get(etag, encoding) if etag else None
+    cached = body is not None
+    cpu_ms = 0.0
+    if body is None:
+        started = time.thread_time()
+        body = ENCODERS[encoding](data, LEVELS[encoding])
+        cpu_ms = (time.thread_time() - started) * 1000
+        if etag:
+            # Sonraki istekler bunu alır; yüksek seviyeli varyant arka planda gelir
+            _precompressed.set(etag, encoding, body)
+            _recompressor.submit(etag, encoding, data)
+
+    if len(body) >= len(data):
+        _stats.skip()
+        return response
+
+    _stats.record(encoding, len(data), len(body), cpu_ms, cached)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Temsil değişti: strong ETag weak'e çevrilir (If-None-Match weak karşılaştırır)
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def get_compression_stats() -> Dict:
+    """Encoding bazında CPU/byte metrikleri + precompressed cache"""
+    stats = _stats.snapshot()
+    stats["available"] = PREFERENCE
+    stats["min_bytes"] = MIN_BYTES
+    stats["precompressed"] = {
+        **_precompressed.stats(),
+        "static_upgrades": {
+            **_recompressor.stats,
+            "cpu_ms": round(_recompressor.stats["cpu_ms"], 2),
+        },
+    }
+    return stats
+
+
+def init_compression(app):
+    """
+    Compression'ı kur
+    after_request'ler ters sırada çalıştığından diğer middleware'lerden önce
+    çağrılmalı (gövde en son sıkıştırılır).
+    """
+    if os.getenv("COMPRESSION_ENABLED", "true").lower() != "true":
+        return
+    app.after_request(compress_response)
+    logger.info(f"✅ Response compression: {', '.join(PREFERENCE)} (min {MIN_BYTES}B)")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Materialized analytics dashboard summary
+user_dashboard_summary: kullanıcı başına tek doküman, calculate_metrics
+her yeni metrik yazdığında artımlı ($inc) güncellenir. Özete uygulanan son
+değerler video başına video_summary_applied'da tutulur; fark bu dokümanın
+atomik takasından hesaplanır (eşzamanlı hesaplamalar farkı iki kez uygulamaz).
+Eksik/bozulmuş özetler tek bir $lookup/$group pipeline'ı ile yeniden
+oluşturulur.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from pymongo import DESCENDING, ReplaceOne, ReturnDocument
+
+from .database import MongoDBConnection
+
+SUMMARY_COLLECTION = "user_dashboard_summary"
+# video_id -> özete en son uygulanan metrik değerleri
+APPLIED_COLLECTION = "video_summary_applied"
+
+# Özetlenen metrik alanları: summary alanı -> video_metrics.metrics alanı
+SUMMARY_FIELDS = {
+    "total_views": "views",
+    "total_likes": "likes",
+    "total_engagement": "engagement_rate",
+}
+
+
+def _latest_per_video_stages(match: Dict) -> List[Dict]:
+    """videos -> her videonun en güncel metriği (latest: [] veya [{metrics}])"""
+    return [
+        {"$match": match},
+        {
+            "$lookup": {
+                "from": "video_metrics",
+                "let": {"video_id": "$_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$video_id", "$$video_id"]}}},
+                    {"$sort": {"calculated_at": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "metrics": 1}},
+                ],
+                "as": "latest",
+            }
+        },
+    ]
+
+
+def _latest_metrics_pipeline(match: Dict) -> List[Dict]:
+    """videos -> her videonun en güncel metriği -> kullanıcı toplamları"""
+    return _latest_per_video_stages(match) + [
+        {
+            "$group": {
+                "_id": "$user_id",
+                "total_videos": {"$sum": 1},
+                "videos_with_metrics": {
+                    "$sum": {"$cond": [{"$gt": [{"$size": "$latest"}, 0]}, 1, 0]}
+                },
+                **{
+                    field: {
+                        "$sum": {
+                            "$ifNull": [
+                                {"$arrayElemAt": [f"$latest.metrics.{source}", 0]},
+                                0,
+                            ]
+                        }
+                    }
+                    for field, source in SUMMARY_FIELDS.items()
+                },
+            }
+        },
+    ]
+
+
+def aggregate_user_summary(user_id: str) -> Dict:
+    """Özeti tek bir aggregation ile hesapla (materialize etmeden)"""
+    mongo = MongoDBConnection()
+    rows = mongo.aggregate("videos", _latest_metrics_pipeline({"user_id": user_id}))
+    if rows:
+        summary = rows[0]
+    else:
+        summary = {"_id": user_id, "total_videos": 0, "videos_with_metrics": 0}
+    for field in SUMMARY_FIELDS:
+        summary.setdefault(field, 0)
+    return summary
+
+
+def _applied_values(metrics: Dict) -> Dict:
+    """video_metrics.metrics -> özet alanları"""
+    return {field: metrics.get(source, 0) for field, source in SUMMARY_FIELDS.items()}
+
+
+def rebuild_user_summary(user_id: str) -> Dict:
+    """
+    Kullanıcının özetini sıfırdan oluştur ve kaydet; video başına uygulanan
+    değerler de aynı kaynaktan yeniden yazılır ki sonraki farklar tutarlı olsun
+    """
+    mongo = MongoDBConnection()
+    now = datetime.utcnow()
+    videos = mongo.aggregate(
+        "videos",
+        _latest_per_video_stages({"user_id": user_id}) + [{"$project": {"latest": 1}}],
+    )
+    summary = {"_id": user_id, "total_videos": len(videos), "videos_with_metrics": 0}
+    for field in SUMMARY_FIELDS:
+        summary[field] = 0
+    applied = []
+    for video in videos:
+        if not video["latest"]:
+            continue
+        values = _applied_values(video["latest"][0].get("metrics", {}))
+        summary["videos_with_metrics"] += 1
+        for field, value in values.items():
+            summary[field] += value
+        applied.append(
+            ReplaceOne(
+                {"_id": video["_id"]},
+                {"user_id": user_id, "values": values, "applied_at": now},
+                upsert=True,
+            )
+        )
+    if applied:
+        mongo.db[APPLIED_COLLECTION].bulk_write(applied, ordered=False)
+    summary["rebuilt_at"] = summary["updated_at"] = now
+    mongo.db[SUMMARY_COLLECTION].replace_one({"_id": user_id}, summary, upsert=True)
+    return summary
+
+
+def rebuild_all_summaries(user_ids: Optional[Iterable[str]] = None) -> int:
+    """Tüm (veya verilen) kullanıcıların özetlerini yeniden oluştur"""
+    mongo = MongoDBConnection()
+    if user_ids is None:
+        user_ids = mongo.db.videos.distinct("user_id")
+    rebuilt = 0
+    for user_id in user_ids:
+        try:
+            rebuild_user_summary(user_id)
+            rebuilt += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Dashboard özeti oluşturulamadı ({user_id}): {e}")
+    return rebuilt
+
+
+def _legacy_applied(mongo, video_id: str, before: datetime) -> Optional[Dict]:
+    """
+    Applied dokümanı olmayan (bu şemadan önce hesaplanmış) videolar için
+    özetteki değer: before'dan önceki en güncel video_metrics
+    """
+    previous = mongo.db.video_metrics.find_one(
+        {"video_id": video_id, "calculated_at": {"$lt": before}},
+        {"metrics": 1},
+        sort=[("calculated_at", DESCENDING)],
+        max_time_ms=mongo.max_time_ms,
+    )
+    return _applied_values(previous["metrics"]) if previous else None
+
+
+def _inc_summary(mongo, user_id: str, increments: Dict) -> None:
+    # Özet hiç oluşturulmamışsa kısmi $inc yapılmaz, ilk okumada rebuild edilir
+    mongo.db[SUMMARY_COLLECTION].update_one(
+        {"_id": user_id},
+        {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+    )
+
+
+def apply_video_metrics(video_id: str, metrics: Dict) -> None:
+    """
+    Yeni metrik yazılmadan önce çağrılır: applied dokümanını yeni değerlerle
+    atomik olarak takas eder, eski değerle farkı özete $inc ile uygular
+    """
+    mongo = MongoDBConnection()
+    video = mongo.find_one("videos", {"_id": video_id}, projection={"user_id": 1})
+    if not video or not video.get("user_id"):
+        return
+
+    now = datetime.utcnow()
+    values = _applied_values(metrics)
+    # Her çağıran kendinden önceki değeri görür: farklar toplamı son değere eşit
+    previous = mongo.db[APPLIED_COLLECTION].find_one_and_update(
+        {"_id": video_id},
+        {"$set": {"user_id": video["user_id"], "values": values, "applied_at": now}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    previous_values = previous["values"] if previous else _legacy_applied(mongo, video_id, now)
+
+    increments = {
+        field: value - (previous_values or {}).get(field, 0) for field, value in values.items()
+    }
+    if previous_values is None:
+        increments["videos_with_metrics"] = 1
+    _inc_summary(mongo, video["user_id"], increments)
+
+
+def apply_video_added(user_id: str) -> None:
+    """Yeni video: total_videos +1"""
+    _inc_summary(MongoDBConnection(), user_id, {"total_videos": 1})
+
+
+def apply_video_deleted(video_id: str, user_id: str) -> None:
+    """Silinen video: özete katkısını (applied değerleri) geri al"""
+    mongo = MongoDBConnection()
+    applied = mongo.db[APPLIED_COLLECTION].find_one_and_delete({"_id": video_id})
+    values = applied["values"] if applied else _legacy_applied(mongo, video_id, datetime.utcnow())
+
+    increments = {"total_videos": -1}
+    if values is not None:
+        increments["videos_with_metrics"] = -1
+        for field, value in values.items():
+            increments[field] = -value
+    _inc_summary(mongo, user_id, increments)
+
+
+def get_user_summary(user_id: str) -> Dict:
+    """Dashboard okuması: _id üzerinden tek point lookup, yoksa rebuild"""
+    mongo = MongoDBConnection()
+    summary = mongo.find_one(SUMMARY_COLLECTION, {"_id": user_id})
+    if summary is None:
+        summary = rebuild_user_summary(user_id)
+    return summary
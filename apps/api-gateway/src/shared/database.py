@@ -5,19 +5,189 @@ Database bağlantısı ve yönetimi
 MongoDB singleton pattern
 """
 
+import bisect
 import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
 
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+
+from .index_manager import ensure_indexes, idx
+from .metrics import db_connection_pool, db_pool_max, record_db_operation
+from .read_routing import (
+    PRIMARY,
+    READ_PREFERENCES,
+    current_session,
+    effective_profile,
+    mark_write,
+    server_usage,
+)
+from .tracing import command_tracer
 
 # Global database instance
 db = None
 client = None
 
+# Fork sonrası yeniden bağlanmak için (uri, database_name, pool_options)
+_connect_args = None
+
+# Connection pool varsayılanları (config.database.pool veya env ile override)
+POOL_DEFAULTS = {
+    "max_pool_size": int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+    "min_pool_size": int(os.getenv("MONGO_MIN_POOL_SIZE", 5)),
+    "wait_queue_timeout_ms": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)),
+    "server_selection_timeout_ms": int(
+        os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+    ),
+}
+
+# Her okuma sorgusuna uygulanan varsayılan maxTimeMS
+DEFAULT_MAX_TIME_MS = int(os.getenv("MONGO_MAX_TIME_MS", 5000))
+
+# Ham video_events saklama süresi (geçmiş rollup bucket'larında kalır)
+EVENT_RAW_TTL_SECONDS = int(os.getenv("EVENT_RAW_TTL_DAYS", 7)) * 86400
+
+# Latency histogram bucket'ları (ms)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Thread-safe, sabit bucket'lı latency histogram"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son bucket: +Inf
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms: float):
+        index = bisect.bisect_left(self.buckets, elapsed_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Bucket üst sınırı olarak yaklaşık percentile"""
+        if not self.total:
+            return None
+        target = q * self.total
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return (
+                    self.buckets[index] if index < len(self.buckets) else self.max_ms
+                )
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self.counts)
+            total, sum_ms, max_ms = self.total, self.sum_ms, self.max_ms
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": total,
+            "avg_ms": round(sum_ms / total, 3) if total else 0,
+            "max_ms": round(max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, counts)),
+        }
+
+
+# {collection: {operation: LatencyHistogram}}
+_query_stats: Dict[str, Dict[str, LatencyHistogram]] = {}
+_query_stats_lock = threading.Lock()
+
+
+def _histogram(collection: str, operation: str) -> LatencyHistogram:
+    per_collection = _query_stats.get(collection)
+    if per_collection is None or operation not in per_collection:
+        with _query_stats_lock:
+            per_collection = _query_stats.setdefault(collection, {})
+            per_collection.setdefault(operation, LatencyHistogram())
+    return per_collection[operation]
+
+
+def get_query_stats() -> Dict:
+    """Collection/operation bazlı latency istatistikleri"""
+    return {
+        collection: {op: hist.snapshot() for op, hist in ops.items()}
+        for collection, ops in list(_query_stats.items())
+    }
+
+
+def reset_query_stats():
+    """Latency istatistiklerini sıfırla"""
+    with _query_stats_lock:
+        _query_stats.clear()
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Pool doluluğu: checked-out bağlantı ve maxPoolSize gauge'ları"""
+
+    def pool_created(self, event):
+        db_pool_max.set(event.options.get("maxPoolSize", 100))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        db_connection_pool.inc()
+
+    def connection_checked_in(self, event):
+        db_connection_pool.dec()
+
+
+pool_metrics = PoolMetricsListener()
+
+
+def _pool_options(config) -> Dict:
+    """config.database.pool + env -> MongoClient pool argümanları"""
+    pool = dict(POOL_DEFAULTS)
+    pool.update((config.get("database", {}) or {}).get("pool", {}) or {})
+    return {
+        "maxPoolSize": int(pool["max_pool_size"]),
+        "minPoolSize": int(pool["min_pool_size"]),
+        "waitQueueTimeoutMS": int(pool["wait_queue_timeout_ms"]),
+        "serverSelectionTimeoutMS": int(pool["server_selection_timeout_ms"]),
+    }
+
 
 def init_database(config):
     """Database bağlantısını başlat"""
-    global db, client
+    global db, client, _connect_args
 
     mongodb_uri = os.getenv(
         "MONGODB_URI", config.get("database", {}).get("connection_string")
@@ -25,12 +195,22 @@ def init_database(config):
     database_name = config.get("database", {}).get("database_name", "ultrarslanoglu")
 
     try:
-        client = MongoClient(mongodb_uri)
+        pool_options = _pool_options(config)
+        client = MongoClient(
+            mongodb_uri,
+            event_listeners=[server_usage, command_tracer, pool_metrics],
+            **pool_options,
+        )
         db = client[database_name]
+        MongoDBConnection.reset()
+        _connect_args = (mongodb_uri, database_name, pool_options)
 
         # Test connection
         client.admin.command("ping")
-        logger.info(f"✅ MongoDB bağlantısı başarılı: {database_name}")
+        logger.info(
+            f"✅ MongoDB bağlantısı başarılı: {database_name} "
+            f"(pool {pool_options['minPoolSize']}-{pool_options['maxPoolSize']})"
+        )
 
         # Create indexes
         _create_indexes()
@@ -40,79 +220,134 @@ def init_database(config):
         raise
 
 
+# ========== INDEX MANIFEST ==========
+# Değişiklikler hash'e yansır; startup'ta sadece eksik index'ler oluşturulur
+INDEX_MANIFEST = {
+    "users": [
+        idx("email", unique=True),
+        idx("username", unique=True, sparse=True),
+        idx("created_at"),
+        idx("updated_at"),
+        idx("status"),
+    ],
+    "videos": [
+        idx([("user_id", 1), ("created_at", -1)]),
+        idx("status"),
+        idx([("platform", 1), ("published_at", -1)]),
+        idx("created_at", expireAfterSeconds=2592000),  # 30 days TTL
+        # Collection başına tek text index: title + description birlikte
+        idx([("title", "text"), ("description", "text")]),
+    ],
+    "metrics": [
+        idx([("platform", 1), ("metric_type", 1), ("timestamp", -1)]),
+        idx([("video_id", 1), ("timestamp", -1)]),
+        idx("timestamp", expireAfterSeconds=7776000),  # 90 days TTL
+    ],
+    "video_metrics": [
+        # Dashboard $lookup: video başına en güncel metrik
+        idx([("video_id", 1), ("calculated_at", -1)]),
+    ],
+    "video_events": [
+        idx([("video_id", 1), ("timestamp", 1)]),
+        # Ham event TTL'i EVENT_TTL_MANIFEST'te: rollup backfill'inden sonra
+    ],
+    "video_event_rollups": [
+        idx([("video_id", 1), ("granularity", 1), ("bucket", 1)]),
+        idx("expire_at", expireAfterSeconds=0),  # minute/hour bucket retention
+    ],
+    "scheduled_content": [
+        idx([("scheduled_time", 1), ("status", 1)]),
+        idx([("user_id", 1), ("status", 1)]),
+        idx("created_at"),
+        idx([("status", 1), ("scheduled_time", 1), ("_id", 1)]),
+    ],
+    "automation_tasks": [
+        idx([("workflow_id", 1), ("status", 1)]),
+        idx([("status", 1), ("created_at", -1)]),
+        idx([("user_id", 1), ("created_at", -1)]),
+        idx("created_at", expireAfterSeconds=5184000),  # 60 days
+    ],
+    "analytics_reports": [
+        idx([("user_id", 1), ("created_at", -1)]),
+    ],
+    "ai_analyses": [
+        idx([("video_id", 1), ("analysis_type", 1)]),
+        idx("created_at", expireAfterSeconds=7776000),  # 90 days
+        idx([("status", 1), ("created_at", -1)]),
+    ],
+    "audit_logs": [
+        idx([("user_id", 1), ("timestamp", -1)]),
+        idx([("action", 1), ("timestamp", -1)]),
+        idx("timestamp", expireAfterSeconds=31536000),  # 1 year
+    ],
+    "api_tokens": [
+        idx([("user_id", 1), ("token", 1)], unique=True),
+        idx("expires_at", expireAfterSeconds=0),  # Auto-delete expired
+    ],
+    "sessions": [
+        idx("user_id"),
+        idx("expires_at", expireAfterSeconds=0),  # Auto-delete expired
+    ],
+    "notifications": [
+        idx([("user_id", 1), ("read", 1), ("created_at", -1)]),
+        idx("created_at", expireAfterSeconds=2592000),  # 30 days
+    ],
+    "webhooks": [
+        idx([("user_id", 1), ("event_type", 1)]),
+        idx([("status", 1), ("created_at", -1)]),
+    ],
+}
+
+
+# Rollup'ı olmayan geçmiş event'ler TTL ile geri dönülmez şekilde silinmesin:
+# bu manifest ancak rollup backfill'i tamamlandıktan sonra uygulanır
+EVENT_TTL_MANIFEST = {
+    "video_events": [idx("timestamp", expireAfterSeconds=EVENT_RAW_TTL_SECONDS)],
+}
+
+MIGRATIONS_COLLECTION = "_migrations"
+ROLLUP_BACKFILL_MIGRATION = "video_event_rollups_backfill"
+
+
+def rollup_backfill_done(database=None) -> bool:
+    """Rollup backfill'i tamamlandı mı (boş video_events: backfill gerekmez)"""
+    database = db if database is None else database
+    migrations = database[MIGRATIONS_COLLECTION]
+    if migrations.find_one({"_id": ROLLUP_BACKFILL_MIGRATION, "status": "completed"}):
+        return True
+    if database.video_events.estimated_document_count() == 0:
+        mark_migration(ROLLUP_BACKFILL_MIGRATION, {"videos": 0}, database)
+        return True
+    return False
+
+
+def mark_migration(name: str, details: Optional[Dict] = None, database=None) -> None:
+    """Migration'ı tamamlandı olarak kaydet"""
+    database = db if database is None else database
+    database[MIGRATIONS_COLLECTION].update_one(
+        {"_id": name},
+        {"$set": {"status": "completed", "completed_at": datetime.utcnow(), **(details or {})}},
+        upsert=True,
+    )
+
+
+def apply_event_ttl(database=None, mode: Optional[str] = None) -> Dict:
+    """video_events TTL index'i (backfill bekleniyorsa uygulanmaz)"""
+    database = db if database is None else database
+    if not rollup_backfill_done(database):
+        logger.warning(
+            "⚠️ video_events TTL bekletiliyor: önce rollup backfill "
+            "(python -m src.shared.event_rollups --backfill)"
+        )
+        return {"name": "gateway_event_ttl", "status": "pending_backfill"}
+    return ensure_indexes(database, EVENT_TTL_MANIFEST, name="gateway_event_ttl", mode=mode)
+
+
 def _create_indexes():
-    """Gerekli indexleri oluştur"""
+    """Index manifest'ini uygula (hash aynıysa no-op, leader dışında no-op)"""
     try:
-        # ========== USERS COLLECTION ==========
-        db.users.create_index("email", unique=True)
-        db.users.create_index("username", unique=True, sparse=True)
-        db.users.create_index("created_at")
-        db.users.create_index("updated_at")
-        db.users.create_index("status")
-
-        # ========== VIDEOS COLLECTION ==========
-        db.videos.create_index([("user_id", 1), ("created_at", -1)])
-        db.videos.create_index("status")
-        db.videos.create_index([("platform", 1), ("published_at", -1)])
-        db.videos.create_index("created_at", expireAfterSeconds=2592000)  # 30 days TTL
-        db.videos.create_index("title", text=True)
-        db.videos.create_index("description", text=True)
-
-        # ========== METRICS COLLECTION ==========
-        db.metrics.create_index(
-            [("platform", 1), ("metric_type", 1), ("timestamp", -1)]
-        )
-        db.metrics.create_index([("video_id", 1), ("timestamp", -1)])
-        db.metrics.create_index("timestamp", expireAfterSeconds=7776000)  # 90 days TTL
-
-        # ========== SCHEDULED CONTENT ==========
-        db.scheduled_content.create_index([("scheduled_time", 1), ("status", 1)])
-        db.scheduled_content.create_index([("user_id", 1), ("status", 1)])
-        db.scheduled_content.create_index("created_at")
-
-        # ========== AUTOMATION TASKS ==========
-        db.automation_tasks.create_index([("workflow_id", 1), ("status", 1)])
-        db.automation_tasks.create_index([("status", 1), ("created_at", -1)])
-        db.automation_tasks.create_index(
-            "created_at", expireAfterSeconds=5184000
-        )  # 60 days
-
-        # ========== AI ANALYSES ==========
-        db.ai_analyses.create_index([("video_id", 1), ("analysis_type", 1)])
-        db.ai_analyses.create_index("created_at", expireAfterSeconds=7776000)  # 90 days
-        db.ai_analyses.create_index([("status", 1), ("created_at", -1)])
-
-        # ========== AUDIT LOGS ==========
-        db.audit_logs.create_index([("user_id", 1), ("timestamp", -1)])
-        db.audit_logs.create_index([("action", 1), ("timestamp", -1)])
-        db.audit_logs.create_index("timestamp", expireAfterSeconds=31536000)  # 1 year
-
-        # ========== API TOKENS ==========
-        db.api_tokens.create_index([("user_id", 1), ("token", 1)], unique=True)
-        db.api_tokens.create_index(
-            "expires_at", expireAfterSeconds=0
-        )  # Auto-delete expired
-
-        # ========== SESSIONS ==========
-        db.sessions.create_index("user_id")
-        db.sessions.create_index(
-            "expires_at", expireAfterSeconds=0
-        )  # Auto-delete expired
-
-        # ========== NOTIFICATIONS ==========
-        db.notifications.create_index([("user_id", 1), ("read", 1), ("created_at", -1)])
-        db.notifications.create_index(
-            "created_at", expireAfterSeconds=2592000
-        )  # 30 days
-
-        # ========== WEBHOOKS ==========
-        db.webhooks.create_index([("user_id", 1), ("event_type", 1)])
-        db.webhooks.create_index([("status", 1), ("created_at", -1)])
-
-        logger.info("✅ Database indexleri başarıyla oluşturuldu (13 collection)")
-        logger.info("   - TTL policies aktif")
-        logger.info("   - Compound indexes optimize edilmiş")
-        logger.info("   - Auto-cleanup scheduled")
+        ensure_indexes(db, INDEX_MANIFEST, name="gateway")
+        apply_event_ttl()
     except Exception as e:
         logger.warning(f"⚠️ Index oluşturma uyarısı: {e}")
 
@@ -124,63 +359,221 @@ def get_db():
     return db
 
 
+def reconnect_after_fork():
+    """
+    Prefork worker'da yeni MongoClient oluştur
+    MongoClient fork-safe değil; master'dan kalan soket/monitor thread'leri
+    child'da kullanılmaz. Eski client kapatılmaz (soketler master'a ait).
+    """
+    global db, client
+    if _connect_args is None:
+        return
+    mongodb_uri, database_name, pool_options = _connect_args
+    client = MongoClient(
+        mongodb_uri,
+        event_listeners=[server_usage, command_tracer, pool_metrics],
+        **pool_options,
+    )
+    db = client[database_name]
+    MongoDBConnection.reset()
+    logger.info(f"🔁 MongoDB client yeniden oluşturuldu (pid {os.getpid()})")
+
+
 def close_database():
     """Database bağlantısını kapat"""
     global client
     if client:
         client.close()
+        MongoDBConnection.reset()
         logger.info("🔌 MongoDB bağlantısı kapatıldı")
 
 
+def get_pool_stats() -> Dict:
+    """Connection pool ayarları"""
+    if client is None:
+        return {}
+    options = client.options.pool_options
+    return {
+        "max_pool_size": options.max_pool_size,
+        "min_pool_size": options.min_pool_size,
+        "wait_queue_timeout": options.wait_queue_timeout,
+    }
+
+
+def _as_update(update_data: Dict) -> Dict:
+    """Düz alanlar -> $set, operator içeren dokümanlar olduğu gibi"""
+    if update_data and all(key.startswith("$") for key in update_data):
+        return update_data
+    return {"$set": update_data}
+
+
 class MongoDBConnection:
-    """MongoDB bağlantı wrapper sınıfı - Extended modülleri için"""
-    
-    def __init__(self):
-        """Database instance'ını al"""
-        global db
-        if db is None:
-            raise Exception("Database başlatılmamış! init_database() çağrılmalı.")
-        self.db = db
-    
+    """
+    Paylaşılan MongoClient üzerinde repository katmanı
+    Process başına tek instance (singleton), her sorgu maxTimeMS ile
+    sınırlanır ve collection bazlı latency histogram'a yazılır.
+    Okumalar aktif read profile'a göre yönlendirilir (bkz. read_routing)
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        instance = cls._instance
+        if instance is None or instance.db is not db:
+            with cls._instance_lock:
+                instance = cls._instance
+                if instance is None or instance.db is not db:
+                    if db is None:
+                        raise Exception(
+                            "Database başlatılmamış! init_database() çağrılmalı."
+                        )
+                    instance = super().__new__(cls)
+                    instance.db = db
+                    instance.max_time_ms = DEFAULT_MAX_TIME_MS
+                    instance._readers = {}
+                    cls._instance = instance
+        return instance
+
+    @classmethod
+    def reset(cls):
+        """Singleton'ı bırak (init/close sonrası yeniden oluşturulur)"""
+        with cls._instance_lock:
+            cls._instance = None
+
+    @contextmanager
+    def _timed(self, collection: str, operation: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _histogram(collection, operation).observe(elapsed * 1000)
+            record_db_operation(collection, operation, elapsed)
+
+    def _max_time(self, max_time_ms: Optional[int]) -> int:
+        return self.max_time_ms if max_time_ms is None else max_time_ms
+
+    def _reader(self, collection: str):
+        """Aktif read profile'a göre (cache'li) collection nesnesi"""
+        profile = effective_profile()
+        if profile == PRIMARY:
+            return self.db[collection]
+        key = (collection, profile)
+        reader = self._readers.get(key)
+        if reader is None:
+            reader = self.db[collection].with_options(
+                read_preference=READ_PREFERENCES[profile]
+            )
+            self._readers[key] = reader
+        return reader
+
+    def _writer(self, collection: str):
+        mark_write()
+        return self.db[collection]
+
     def insert_one(self, collection, data):
         """Tek dokuman ekle"""
-        return self.db[collection].insert_one(data)
-    
-    def insert_many(self, collection, data_list):
+        with self._timed(collection, "insert_one"):
+            return self._writer(collection).insert_one(
+                data, session=current_session()
+            )
+
+    def insert_many(self, collection, data_list, ordered=True):
         """Çoklu dokuman ekle"""
-        return self.db[collection].insert_many(data_list)
-    
-    def find_one(self, collection, query):
+        with self._timed(collection, "insert_many"):
+            return self._writer(collection).insert_many(
+                data_list, ordered=ordered, session=current_session()
+            )
+
+    def find_one(self, collection, query, projection=None, max_time_ms=None):
         """Tek dokuman bul"""
-        return self.db[collection].find_one(query)
-    
-    def find(self, collection, query=None, skip=0, limit=0, sort=None):
+        with self._timed(collection, "find_one"):
+            return self._reader(collection).find_one(
+                query,
+                projection,
+                max_time_ms=self._max_time(max_time_ms),
+                session=current_session(),
+            )
+
+    def find(
+        self,
+        collection,
+        query=None,
+        skip=0,
+        limit=0,
+        sort=None,
+        projection=None,
+        max_time_ms=None,
+    ) -> List[Dict]:
         """Birden fazla dokuman bul"""
-        cursor = self.db[collection].find(query or {})
-        if sort:
-            cursor = cursor.sort(sort)
-        if skip:
-            cursor = cursor.skip(skip)
-        if limit:
-            cursor = cursor.limit(limit)
-        return list(cursor)
-    
-    def update_one(self, collection, query, update_data):
+        with self._timed(collection, "find"):
+            cursor = self._reader(collection).find(
+                query or {},
+                projection,
+                max_time_ms=self._max_time(max_time_ms),
+                session=current_session(),
+            )
+            if sort:
+                cursor = cursor.sort(sort)
+            if skip:
+                cursor = cursor.skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+
+    def aggregate(self, collection, pipeline, max_time_ms=None) -> List[Dict]:
+        """Aggregation pipeline çalıştır"""
+        with self._timed(collection, "aggregate"):
+            return list(
+                self._reader(collection).aggregate(
+                    pipeline,
+                    maxTimeMS=self._max_time(max_time_ms),
+                    session=current_session(),
+                )
+            )
+
+    def bulk_write(self, collection, requests, ordered=True):
+        """Toplu yazma (UpdateOne/InsertOne/...)"""
+        with self._timed(collection, "bulk_write"):
+            return self._writer(collection).bulk_write(
+                requests, ordered=ordered, session=current_session()
+            )
+
+    def update_one(self, collection, query, update_data, upsert=False):
         """Tek dokuman güncelle"""
-        return self.db[collection].update_one(query, {"$set": update_data})
-    
+        with self._timed(collection, "update_one"):
+            return self._writer(collection).update_one(
+                query, _as_update(update_data), upsert=upsert,
+                session=current_session(),
+            )
+
     def update_many(self, collection, query, update_data):
         """Çoklu dokuman güncelle"""
-        return self.db[collection].update_many(query, {"$set": update_data})
-    
+        with self._timed(collection, "update_many"):
+            return self._writer(collection).update_many(
+                query, _as_update(update_data), session=current_session()
+            )
+
     def delete_one(self, collection, query):
         """Tek dokuman sil"""
-        return self.db[collection].delete_one(query)
-    
+        with self._timed(collection, "delete_one"):
+            return self._writer(collection).delete_one(
+                query, session=current_session()
+            )
+
     def delete_many(self, collection, query):
         """Çoklu dokuman sil"""
-        return self.db[collection].delete_many(query)
-    
-    def count(self, collection, query=None):
+        with self._timed(collection, "delete_many"):
+            return self._writer(collection).delete_many(
+                query, session=current_session()
+            )
+
+    def count(self, collection, query=None, max_time_ms=None):
         """Dokuman sayısı"""
-        return self.db[collection].count_documents(query or {})
+        with self._timed(collection, "count"):
+            return self._reader(collection).count_documents(
+                query or {},
+                maxTimeMS=self._max_time(max_time_ms),
+                session=current_session(),
+            )
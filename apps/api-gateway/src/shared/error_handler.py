@@ -135,7 +135,7 @@ def create_error_response(
         "error": {
             "code": error_code,
             "message": msg,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
     }
     
@@ -148,7 +148,7 @@ def create_success_response(data: Any = None, message: str = None) -> Dict:
     """Create standardized success response"""
     response = {
         "success": True,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     }
     
     if data is not None:
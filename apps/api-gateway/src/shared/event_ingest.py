@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Buffered video event ingestion
+Request başına insert_one yerine event'ler Redis Stream'e (XADD) yazılır,
+arka plan flusher'ı boyut/süre eşiğinde insert_many(ordered=False) ile
+MongoDB'ye aktarır ve sonra XACK eder (at-least-once).
+
+- Stream entry id'si doküman _id'si olur: tekrar flush duplicate key ile
+  sessizce atlanır (idempotent)
+- Dokümanlar applied=False ile yazılır, rollup/trending uygulanınca True
+  olur: kısmi insert'ten sonra tekrar flush'ta duplicate olan ama henüz
+  uygulanmamış event'ler yine uygulanır
+- Ack edilmemiş (crash olan worker'ın) entry'leri XAUTOCLAIM ile devralınır;
+  EVENT_MAX_DELIVERIES kez başarısız olan batch tek tek yazılır, yine de
+  yazılamayan (kalıcı hatalı) entry'ler dead-letter stream'ine taşınır
+- Redis yoksa/erişilemiyorsa event'ler diskteki spill dosyasına yazılır,
+  flusher bu segment'leri de aktarır
+- Kuyruk limiti aşılınca yeni event'ler reddedilir (backpressure)
+"""
+
+import glob
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from .cache_codec import JsonSerializer
+from .database import LatencyHistogram, MongoDBConnection
+from .error_handler import APIError
+from .event_rollups import pending_repairs, rollup_events
+from .trending import record_events
+
+EVENT_COLLECTION = "video_events"
+EVENT_STREAM = os.getenv("EVENT_INGEST_STREAM", "events:video")
+EVENT_GROUP = "ingest"
+
+FLUSH_BATCH_SIZE = int(os.getenv("EVENT_FLUSH_BATCH_SIZE", 500))
+FLUSH_INTERVAL_MS = int(os.getenv("EVENT_FLUSH_INTERVAL_MS", 1000))
+# Bu süredir ack edilmemiş entry'ler başka bir consumer tarafından devralınır
+CLAIM_IDLE_MS = int(os.getenv("EVENT_CLAIM_IDLE_MS", 30000))
+MAX_PENDING = int(os.getenv("EVENT_MAX_PENDING", 200000))
+MAX_BATCH_EVENTS = int(os.getenv("EVENT_BATCH_MAX", 500))
+SPILL_DIR = os.getenv("EVENT_SPILL_DIR", "/tmp/ultrarslanoglu-events")
+SPILL_MAX_BYTES = int(os.getenv("EVENT_SPILL_MAX_BYTES", 256 * 1024 * 1024))
+# Bu kadar teslimattan sonra batch ayrıştırılır, kalıcı hatalılar dead-letter'a
+MAX_DELIVERIES = int(os.getenv("EVENT_MAX_DELIVERIES", 5))
+DEAD_LETTER_STREAM = os.getenv("EVENT_DEAD_LETTER_STREAM", f"{EVENT_STREAM}:dead")
+DEAD_LETTER_MAXLEN = int(os.getenv("EVENT_DEAD_LETTER_MAXLEN", 100000))
+FLUSHER_ENABLED = os.getenv("EVENT_INGEST_FLUSHER", "true").lower() == "true"
+# Rollup'ı başarısız batch'ler bu task ile ham event'lerden yeniden kurulur
+ROLLUP_REPAIR_TASK = "src.modules.analytics.repair_event_rollups"
+ROLLUP_REPAIR_DELAY = int(os.getenv("EVENT_ROLLUP_REPAIR_DELAY", 60))
+
+# XLEN her istekte değil, bu aralıkla örneklenir
+_BACKPRESSURE_SAMPLE_S = 0.25
+DUPLICATE_KEY = 11000
+
+_serializer = JsonSerializer()
+
+
+class IngestBackpressureError(APIError):
+    """Ingestion kuyruğu dolu"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            "SERVER_002", "Event kuyruğu dolu, tekrar deneyin",
+            {"retry_after": retry_after},
+        )
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class EventIngestor:
+    """Redis Stream (veya disk spill) üzerinden batch'li event yazımı"""
+
+    def __init__(
+        self,
+        redis_client=None,
+        stream: str = EVENT_STREAM,
+        batch_size: int = FLUSH_BATCH_SIZE,
+        flush_interval_ms: int = FLUSH_INTERVAL_MS,
+        max_pending: int = MAX_PENDING,
+        spill_dir: str = SPILL_DIR,
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_pending = max_pending
+        self.spill_dir = spill_dir
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._stop = threading.Event()
+        self._queue_len = 0
+        self._queue_len_at = 0.0
+        self._spill_size = 0
+        self._spill_size_at = 0.0
+        self._last_claim = 0.0
+
+        self.stats = {
+            "accepted": 0,
+            "rejected": 0,
+            "spilled": 0,
+            "flushed": 0,
+            "duplicates": 0,
+            "flush_errors": 0,
+            "rollup_errors": 0,
+            "rollup_repairs": 0,
+            "trending_errors": 0,
+            "dead_lettered": 0,
+        }
+        self.flush_latency = LatencyHistogram()
+        # Event'in kabulünden MongoDB'ye yazılmasına kadar geçen süre
+        self.event_lag = LatencyHistogram(
+            (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+        )
+
+    # ------------------------------------------------------------------
+    # SUBMIT (request path)
+    # ------------------------------------------------------------------
+
+    def submit(self, events: List[Dict]) -> int:
+        """
+        Event'leri kuyruğa ekle (tek round trip)
+
+        Raises:
+            IngestBackpressureError: Kuyruk limiti aşıldıysa
+        """
+        if not events:
+            return 0
+        self._ensure_flusher()
+        self._check_backpressure(len(events))
+
+        received_at = datetime.utcnow()
+        payloads = []
+        for event in events:
+            event.setdefault("timestamp", received_at)
+            payloads.append(_serializer.dumps(event).decode("utf-8"))
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for payload in payloads:
+                    pipe.xadd(self.stream, {"d": payload})
+                pipe.execute()
+                self.stats["accepted"] += len(payloads)
+                return len(payloads)
+            except Exception as e:
+                logger.warning(f"⚠️ Event stream yazılamadı, diske spill: {e}")
+
+        self._spill(payloads)
+        self.stats["accepted"] += len(payloads)
+        return len(payloads)
+
+    def _check_backpressure(self, incoming: int) -> None:
+        now = time.monotonic()
+        if now - self._queue_len_at > _BACKPRESSURE_SAMPLE_S:
+            self._queue_len_at = now
+            try:
+                if self.redis is not None:
+                    self._queue_len = self.redis.xlen(self.stream)
+            except Exception:
+                self._queue_len = 0
+        # Spill boyutu (glob + stat) flush aralığında bir yenilenir; arada
+        # bu process'in yazdıkları _spill'de eklenir
+        if now - self._spill_size_at > self.flush_interval:
+            self._spill_size_at = now
+            self._spill_size = self._spill_bytes()
+        if self._queue_len + incoming > self.max_pending or self._spill_size > SPILL_MAX_BYTES:
+            self.stats["rejected"] += incoming
+            raise IngestBackpressureError(retry_after=max(1, int(self.flush_interval * 2)))
+
+    # ------------------------------------------------------------------
+    # SPILL (crash-safe disk fallback)
+    # ------------------------------------------------------------------
+
+    def _spill_path(self) -> str:
+        return os.path.join(self.spill_dir, f"events-{os.getpid()}.jsonl")
+
+    def _spill(self, payloads: Iterable[str]) -> None:
+        """Append + fsync; flusher segment'i rename edip aktarır"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        lines = []
+        for payload in payloads:
+            lines.append(json.dumps({"id": f"s-{uuid.uuid4().hex}", "d": payload}))
+        data = "\n".join(lines) + "\n"
+        with self._lock:
+            with open(self._spill_path(), "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._spill_size += len(data.encode("utf-8"))
+        self.stats["spilled"] += len(lines)
+
+    def _spill_bytes(self) -> int:
+        try:
+            return sum(
+                os.path.getsize(p)
+                for p in glob.glob(os.path.join(self.spill_dir, "events-*"))
+            )
+        except OSError:
+            return 0
+
+    def _claim_spill_segments(self) -> List[str]:
+        """Bu process'in aktif dosyası + ölü process'lerin segment'leri"""
+        if not os.path.isdir(self.spill_dir):
+            return []
+        claimed = []
+        own = self._spill_path()
+        for path in glob.glob(os.path.join(self.spill_dir, "events-*")):
+            name = os.path.basename(path)
+            try:
+                if path == own:
+                    with self._lock:
+                        target = f"{path}.processing.{os.getpid()}.{uuid.uuid4().hex[:6]}"
+                        os.rename(path, target)
+                elif ".processing." in name:
+                    owner = int(name.split(".processing.")[1].split(".")[0])
+                    if owner == os.getpid():
+                        claimed.append(path)  # önceki turda aktarılamamış
+                        continue
+                    if _pid_alive(owner):
+                        continue
+                    target = f"{path.split('.processing.')[0]}.processing.{os.getpid()}.{uuid.uuid4().hex[:6]}"
+                    os.rename(path, target)
+                else:
+                    owner = int(name[len("events-"):].split(".")[0])
+                    if _pid_alive(owner):
+                        continue
+                    target = f"{path}.processing.{os.getpid()}.{uuid.uuid4().hex[:6]}"
+                    os.rename(path, target)
+            except (OSError, ValueError, IndexError):
+                continue  # başka bir process aldı
+            claimed.append(target)
+        return claimed
+
+    def _flush_spill(self) -> None:
+        for path in self._claim_spill_segments():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+                for start in range(0, len(entries), self.batch_size):
+                    chunk = [(e["id"], e["d"]) for e in entries[start:start + self.batch_size]]
+                    try:
+                        self._write(chunk)
+                    except Exception as e:
+                        if _is_transient(e):
+                            raise
+                        # Kalıcı hata: segment'i tıkamasın, tek tek yaz
+                        self._write_isolated(chunk)
+                os.remove(path)
+            except Exception as e:
+                # Segment yerinde kalır, sonraki turda (veya başka process) tekrar denenir
+                self.stats["flush_errors"] += 1
+                logger.warning(f"⚠️ Spill segment aktarılamadı ({path}): {e}")
+
+    # ------------------------------------------------------------------
+    # FLUSH
+    # ------------------------------------------------------------------
+
+    def _write(self, entries: List[Tuple[str, str]]) -> None:
+        """
+        insert_many(ordered=False) + rollup/trending
+        Duplicate _id'ler (tekrar flush) sadece applied=True ise atlanır;
+        önceki denemede yazılıp uygulanamamış olanlar bu turda uygulanır.
+        """
+        from pymongo.errors import BulkWriteError
+
+        now_ms = time.time() * 1000
+        docs = []
+        for entry_id, payload in entries:
+            doc = _serializer.loads(payload.encode("utf-8"))
+            doc["_id"] = entry_id
+            doc["applied"] = False
+            docs.append(doc)
+            if not entry_id.startswith("s-"):
+                self.event_lag.observe(now_ms - int(entry_id.split("-")[0]))
+
+        mongo = MongoDBConnection()
+        started = time.perf_counter()
+        new_docs = docs
+        try:
+            mongo.insert_many(EVENT_COLLECTION, docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            duplicates = {docs[err["index"]]["_id"] for err in errors}
+            # Primary'den: secondary henüz görmemiş olabilir
+            unapplied = {
+                d["_id"]
+                for d in mongo.db[EVENT_COLLECTION].find(
+                    {"_id": {"$in": list(duplicates)}, "applied": False}, {"_id": 1}
+                )
+            }
+            new_docs = [d for d in docs if d["_id"] not in duplicates or d["_id"] in unapplied]
+            self.stats["duplicates"] += len(duplicates) - len(unapplied)
+        finally:
+            self.flush_latency.observe((time.perf_counter() - started) * 1000)
+        self.stats["flushed"] += len(new_docs)
+        if not new_docs:
+            return
+
+        try:
+            rollup_events(new_docs)
+        except Exception as e:
+            # Event'ler yazıldı; etkilenen videoların bucket'ları worker'da yeniden kurulur
+            self.stats["rollup_errors"] += 1
+            logger.warning(f"⚠️ Event rollup hatası ({len(new_docs)}): {e}")
+            self._schedule_rollup_repair(new_docs)
+
+        try:
+            record_events(new_docs)
+        except Exception as e:
+            self.stats["trending_errors"] += 1
+            logger.warning(f"⚠️ Trending güncelleme hatası ({len(new_docs)}): {e}")
+
+        # Buradan önce crash olursa batch tekrar uygulanır (en fazla bir kez fazla sayım)
+        mongo.update_many(
+            EVENT_COLLECTION,
+            {"_id": {"$in": [d["_id"] for d in new_docs]}},
+            {"$set": {"applied": True}},
+        )
+
+    def _write_isolated(self, entries: List[Tuple[str, str]]) -> List[str]:
+        """
+        Entry'leri tek tek yaz; kalıcı hata verenleri dead-letter'a taşı
+
+        Returns:
+            Yazılan veya dead-letter'a taşınan (ack edilebilir) entry id'leri
+        """
+        done = []
+        for entry_id, payload in entries:
+            try:
+                self._write([(entry_id, payload)])
+            except Exception as e:
+                if _is_transient(e):
+                    continue  # bağlantı sorunu: pending kalır
+                self._dead_letter(entry_id, payload, e)
+            done.append(entry_id)
+        return done
+
+    def _dead_letter(self, entry_id: str, payload: str, error: Exception) -> None:
+        self.stats["dead_lettered"] += 1
+        logger.error(f"❌ Event dead-letter'a taşındı ({entry_id}): {error}")
+        record = {"id": entry_id, "d": payload, "error": str(error)[:500]}
+        if self.redis is not None:
+            self.redis.xadd(
+                DEAD_LETTER_STREAM, record, maxlen=DEAD_LETTER_MAXLEN, approximate=True
+            )
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        with open(os.path.join(self.spill_dir, "dead-letter.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _delivery_counts(self, ids: List[str]) -> Dict[str, int]:
+        """XPENDING: entry başına teslimat sayısı"""
+        pending = self.redis.xpending_range(
+            self.stream, EVENT_GROUP, min=min(ids, key=_stream_id), max=max(ids, key=_stream_id),
+            count=len(ids) * 2,
+        )
+        return {p["message_id"]: p["times_delivered"] for p in pending}
+
+    def _schedule_rollup_repair(self, docs: List[Dict]) -> None:
+        """repair_event_rollups task'ını kuyruğa at (modül import'u olmadan, isimle)"""
+        videos = pending_repairs(docs)
+        if not videos:
+            return
+        try:
+            from .celery_app import celery
+
+            celery.send_task(ROLLUP_REPAIR_TASK, args=[videos], countdown=ROLLUP_REPAIR_DELAY)
+            self.stats["rollup_repairs"] += 1
+        except Exception as e:
+            logger.error(f"❌ Rollup repair planlanamadı ({len(videos)} video): {e}")
+
+    def _read_stream_batch(self) -> List[Tuple[str, str]]:
+        """Batch dolana veya flush süresi dolana kadar oku"""
+        entries: List[Tuple[str, str]] = []
+        now = time.monotonic()
+
+        # Crash olan / flush edemeyen consumer'ların entry'lerini devral
+        if now - self._last_claim > CLAIM_IDLE_MS / 1000.0:
+            self._last_claim = now
+            claimed = self.redis.xautoclaim(
+                self.stream, EVENT_GROUP, self.consumer,
+                min_idle_time=CLAIM_IDLE_MS, start_id="0-0", count=self.batch_size,
+            )
+            entries.extend((eid, fields["d"]) for eid, fields in claimed[1] if fields)
+
+        deadline = now + self.flush_interval
+        while len(entries) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            response = self.redis.xreadgroup(
+                EVENT_GROUP, self.consumer, {self.stream: ">"},
+                count=self.batch_size - len(entries),
+                block=max(1, int(remaining * 1000)),
+            )
+            if not response:
+                break
+            entries.extend((eid, fields["d"]) for eid, fields in response[0][1])
+        return entries
+
+    def flush_once(self) -> int:
+        """Bir batch'i aktar (stream + spill); aktarılan entry sayısı"""
+        flushed = 0
+        if self.redis is not None:
+            entries = self._read_stream_batch()
+            if entries:
+                ids = [eid for eid, _ in entries]
+                try:
+                    self._write(entries)
+                except Exception as e:
+                    # Ack yok: entry'ler pending kalır, XAUTOCLAIM ile tekrar denenir
+                    self.stats["flush_errors"] += 1
+                    logger.warning(f"⚠️ Event flush hatası ({len(entries)}): {e}")
+                    ids = self._retire_poisoned(entries)
+                if ids:
+                    pipe = self.redis.pipeline(transaction=False)
+                    pipe.xack(self.stream, EVENT_GROUP, *ids)
+                    pipe.xdel(self.stream, *ids)
+                    pipe.execute()
+                    flushed += len(ids)
+        else:
+            self._stop.wait(self.flush_interval)
+        self._flush_spill()
+        return flushed
+
+    def _retire_poisoned(self, entries: List[Tuple[str, str]]) -> List[str]:
+        """
+        MAX_DELIVERIES'e ulaşmış entry'ler tek tek yazılır (kalıcı hatalılar
+        dead-letter'a); ack edilebilecek id'ler döner
+        """
+        try:
+            deliveries = self._delivery_counts([eid for eid, _ in entries])
+        except Exception as e:
+            logger.warning(f"⚠️ XPENDING okunamadı: {e}")
+            return []
+        exhausted = [(eid, d) for eid, d in entries if deliveries.get(eid, 0) >= MAX_DELIVERIES]
+        if not exhausted:
+            return []
+        return self._write_isolated(exhausted)
+
+    def _ensure_group(self) -> None:
+        try:
+            self.redis.xgroup_create(self.stream, EVENT_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.redis is not None:
+                    self._ensure_group()
+                while not self._stop.is_set():
+                    self.flush_once()
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                logger.warning(f"⚠️ Event flusher hatası: {e}")
+                self._stop.wait(1.0)
+
+    def _ensure_flusher(self) -> None:
+        """Flusher thread'ini process başına bir kez başlat (fork-safe)"""
+        if not FLUSHER_ENABLED or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+            self._stop = threading.Event()
+            threading.Thread(
+                target=self._run, name="event-flusher", daemon=True
+            ).start()
+            self._flusher_pid = os.getpid()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "queue_length": self._queue_len,
+            "spill_bytes": self._spill_bytes(),
+            "flush_latency": self.flush_latency.snapshot(),
+            "event_lag": self.event_lag.snapshot(),
+        }
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Bağlantı/failover hataları: entry'ye değil ortama bağlı, tekrar denenir"""
+    from pymongo.errors import ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+    return isinstance(error, (ConnectionFailure, ExecutionTimeout, WTimeoutError))
+
+
+_ingestor: Optional[EventIngestor] = None
+_ingestor_lock = threading.Lock()
+
+
+def get_ingestor() -> EventIngestor:
+    """Paylaşılan ingestor (cache'in Redis bağlantısını kullanır)"""
+    global _ingestor
+    if _ingestor is None:
+        with _ingestor_lock:
+            if _ingestor is None:
+                from .cache import _get_cache_or_none
+
+                cache = _get_cache_or_none()
+                _ingestor = EventIngestor(cache.client if cache is not None else None)
+    return _ingestor
+
+
+def get_ingest_stats() -> Dict:
+    return _ingestor.get_stats() if _ingestor is not None else {}
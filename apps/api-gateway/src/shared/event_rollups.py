@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Video event rollups
+Ham video_events yerine video başına dakika/saat/gün bucket'larında sayaçlar
+($inc upsert). Metrik okumaları bucket sayısı kadar doküman okur; ham
+event'ler kısa TTL ile silinebilir, geçmiş bucket'larda kalır.
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from pymongo import UpdateOne
+
+from . import database
+from .database import MongoDBConnection
+
+ROLLUP_COLLECTION = "video_event_rollups"
+
+# granularity -> saklama süresi (None: süresiz)
+GRANULARITIES = {
+    "minute": timedelta(days=2),
+    "hour": timedelta(days=90),
+    "day": None,
+}
+
+# event_type -> sayaç alanı (watch_time ayrıca sum/count tutar)
+EVENT_COUNTERS = {
+    "view": "views",
+    "like": "likes",
+    "comment": "comments",
+    "share": "shares",
+}
+COUNTER_FIELDS = tuple(EVENT_COUNTERS.values()) + ("watch_time_sum", "watch_time_count")
+
+# Stream/retry gecikmesi payı: bitişi bundan daha eski bucket'lara canlı flusher
+# artık $inc yapmaz ("kapanmış"), rebuild sadece onlara dokunur
+CLOSE_DELAY = timedelta(seconds=int(os.getenv("EVENT_ROLLUP_CLOSE_DELAY", 900)))
+
+
+def truncate(timestamp: datetime, granularity: str) -> datetime:
+    """Zamanı bucket başlangıcına indir"""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _counters(event: Dict) -> Dict[str, float]:
+    event_type = event.get("event_type")
+    if event_type == "watch_time":
+        try:
+            seconds = float(event.get("value") or 0)
+        except (TypeError, ValueError):
+            seconds = 0
+        return {"watch_time_sum": seconds, "watch_time_count": 1}
+    field = EVENT_COUNTERS.get(event_type)
+    return {field: 1} if field else {}
+
+
+def closed_before(now: Optional[datetime] = None) -> Dict[str, datetime]:
+    """granularity -> bu başlangıçtan önceki bucket'lar kapanmış"""
+    watermark = (now or datetime.utcnow()) - CLOSE_DELAY
+    return {granularity: truncate(watermark, granularity) for granularity in GRANULARITIES}
+
+
+def rollup_events(
+    events: Iterable[Dict], before: Optional[Dict[str, datetime]] = None
+) -> int:
+    """
+    Event batch'ini bucket'lara uygula (tek bulk_write)
+
+    Args:
+        before: Verilirse sadece bu başlangıçlardan önceki bucket'lar (rebuild)
+
+    Returns:
+        Güncellenen bucket sayısı
+    """
+    buckets: Dict[tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    for event in events:
+        counters = _counters(event)
+        timestamp = event.get("timestamp")
+        if not counters or not event.get("video_id") or not isinstance(timestamp, datetime):
+            continue
+        for granularity in GRANULARITIES:
+            start = truncate(timestamp, granularity)
+            if before is not None and start >= before[granularity]:
+                continue
+            bucket = buckets[(event["video_id"], granularity, start)]
+            for field, amount in counters.items():
+                bucket[field] += amount
+
+    if not buckets:
+        return 0
+
+    requests = []
+    for (video_id, granularity, start), counters in buckets.items():
+        retention = GRANULARITIES[granularity]
+        on_insert = {"video_id": video_id, "granularity": granularity, "bucket": start}
+        if retention is not None:
+            on_insert["expire_at"] = start + retention
+        requests.append(
+            UpdateOne(
+                {"_id": f"{video_id}:{granularity}:{start.isoformat()}"},
+                {"$inc": dict(counters), "$setOnInsert": on_insert},
+                upsert=True,
+            )
+        )
+    MongoDBConnection().bulk_write(ROLLUP_COLLECTION, requests, ordered=False)
+    return len(requests)
+
+
+def metrics_from_counters(counters: Dict) -> Dict:
+    """Ham sayaçlar -> API metrikleri"""
+    views = counters.get("views", 0)
+    interactions = sum(counters.get(f, 0) for f in ("likes", "comments", "shares"))
+    watch_count = counters.get("watch_time_count", 0)
+    return {
+        "views": views,
+        "likes": counters.get("likes", 0),
+        "comments": counters.get("comments", 0),
+        "shares": counters.get("shares", 0),
+        "engagement_rate": round(interactions / views, 4) if views else 0,
+        "average_watch_time": (
+            round(counters.get("watch_time_sum", 0) / watch_count, 2) if watch_count else 0
+        ),
+    }
+
+
+def video_totals(video_id: str) -> Dict:
+    """Tüm zamanlar: gün bucket'larının toplamı"""
+    rows = MongoDBConnection().aggregate(
+        ROLLUP_COLLECTION,
+        [
+            {"$match": {"video_id": video_id, "granularity": "day"}},
+            {
+                "$group": {
+                    "_id": None,
+                    **{field: {"$sum": f"${field}"} for field in COUNTER_FIELDS},
+                }
+            },
+        ],
+    )
+    return metrics_from_counters(rows[0] if rows else {})
+
+
+def video_series(
+    video_id: str, granularity: str = "hour", since: Optional[datetime] = None
+) -> List[Dict]:
+    """Zaman serisi (bucket başına metrikler)"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Geçersiz granularity: {granularity}")
+    query = {"video_id": video_id, "granularity": granularity}
+    if since is not None:
+        query["bucket"] = {"$gte": truncate(since, granularity)}
+    rows = MongoDBConnection().find(
+        ROLLUP_COLLECTION,
+        query,
+        sort=[("bucket", 1)],
+        projection={"_id": 0, "bucket": 1, **{f: 1 for f in COUNTER_FIELDS}},
+    )
+    return [{"bucket": row["bucket"], **metrics_from_counters(row)} for row in rows]
+
+
+def rebuild_rollups(
+    video_id: str, since: datetime, now: Optional[datetime] = None
+) -> int:
+    """
+    Ham event'lerden kapanmış bucket'ları yeniden oluştur (since gün başına
+    indirilir; ham event TTL'inden eski aralıklar için kullanılmamalı)
+    Açık bucket'lara flusher hâlâ $inc yapıyor: silip kurmak aradaki event'leri
+    iki kez sayar, onlar kapandıktan sonraki bir çalıştırmaya kalır.
+    """
+    mongo = MongoDBConnection()
+    since = truncate(since, "day")
+    before = closed_before(now)
+    mongo.delete_many(
+        ROLLUP_COLLECTION,
+        {
+            "video_id": video_id,
+            "$or": [
+                {"granularity": granularity, "bucket": {"$gte": since, "$lt": end}}
+                for granularity, end in before.items()
+            ],
+        },
+    )
+
+    rebuilt, batch = 0, []
+    cursor = mongo.db.video_events.find(
+        {"video_id": video_id, "timestamp": {"$gte": since, "$lt": before["minute"]}},
+        {"_id": 0, "video_id": 1, "event_type": 1, "value": 1, "timestamp": 1},
+    ).batch_size(5000)
+    for event in cursor:
+        batch.append(event)
+        if len(batch) >= 5000:
+            rebuilt += rollup_events(batch, before)
+            batch = []
+    if batch:
+        rebuilt += rollup_events(batch, before)
+    logger.info(f"✅ Rollup'lar yeniden oluşturuldu: {video_id} ({rebuilt} bucket)")
+    return rebuilt
+
+
+def pending_repairs(events: Iterable[Dict]) -> Dict[str, str]:
+    """Rollup'ı başarısız batch -> {video_id: en eski timestamp (ISO)}"""
+    since: Dict[str, datetime] = {}
+    for event in events:
+        video_id, timestamp = event.get("video_id"), event.get("timestamp")
+        if video_id and isinstance(timestamp, datetime):
+            if video_id not in since or timestamp < since[video_id]:
+                since[video_id] = timestamp
+    return {video_id: ts.isoformat() for video_id, ts in since.items()}
+
+
+def repairs_closed_at(now: Optional[datetime] = None) -> datetime:
+    """Şu ana kadarki event'lerin tüm bucket'larının (gün dahil) kapanacağı an"""
+    return truncate(now or datetime.utcnow(), "day") + timedelta(days=1) + CLOSE_DELAY
+
+
+def repair_rollups(videos: Dict[str, str]) -> int:
+    """
+    pending_repairs() çıktısındaki videoların kapanmış bucket'larını yeniden
+    oluştur (açık kalanlar için repairs_closed_at()'te tekrar çalıştırılmalı)
+    """
+    rebuilt = 0
+    for video_id, since in videos.items():
+        rebuilt += rebuild_rollups(video_id, datetime.fromisoformat(since))
+    return rebuilt
+
+
+def backfill_rollups(force: bool = False) -> Dict:
+    """
+    Rollup'lardan önceki ham event'leri bucket'lara aktar (tek seferlik)
+    video_events TTL index'i bu tamamlanana kadar uygulanmaz; bitince
+    migration işaretlenir ve TTL uygulanır.
+    """
+    mongo = MongoDBConnection()
+    if not force and database.rollup_backfill_done(mongo.db):
+        logger.info("ℹ️ Rollup backfill zaten tamamlanmış")
+        return {"status": "already_completed"}
+
+    videos = rebuilt = 0
+    cursor = mongo.db.video_events.aggregate(
+        [{"$group": {"_id": "$video_id", "since": {"$min": "$timestamp"}}}],
+        allowDiskUse=True,
+    )
+    for row in cursor:
+        if not row["_id"] or not isinstance(row.get("since"), datetime):
+            continue
+        rebuilt += rebuild_rollups(row["_id"], row["since"])
+        videos += 1
+
+    database.mark_migration(
+        database.ROLLUP_BACKFILL_MIGRATION, {"videos": videos, "buckets": rebuilt}, mongo.db
+    )
+    logger.info(f"✅ Rollup backfill tamamlandı: {videos} video, {rebuilt} bucket")
+    ttl = database.apply_event_ttl(mongo.db)
+    return {"status": "completed", "videos": videos, "buckets": rebuilt, "ttl": ttl.get("status")}
+
+
+def main():
+    """CLI: python -m src.shared.event_rollups --backfill"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Video event rollups")
+    parser.add_argument("--backfill", action="store_true", help="Ham event'lerden rollup backfill")
+    parser.add_argument("--force", action="store_true", help="Tamamlanmış olsa da tekrar çalıştır")
+    parser.add_argument("--database", default=os.getenv("MONGODB_DATABASE", "ultrarslanoglu"))
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return 1
+
+    database.init_database(
+        {
+            "database": {
+                "connection_string": os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
+                "database_name": args.database,
+            }
+        }
+    )
+    print(json.dumps(backfill_rollups(force=args.force), indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
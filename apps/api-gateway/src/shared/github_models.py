@@ -6,7 +6,6 @@ OpenAI uyumlu API ile AI işlemleri
 """
 
 import os
-from openai import OpenAI
 from loguru import logger
 
 
@@ -31,6 +30,8 @@ class GitHubModelsClient:
             return
         
         try:
+            from openai import OpenAI  # Ağır import, sadece token varsa
+            
             self.client = OpenAI(
                 base_url="https://models.inference.ai.azure.com",
                 api_key=github_token
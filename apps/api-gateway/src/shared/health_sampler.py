@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background system-health sampler
+CPU, bellek, disk, açık FD, thread-pool doluluğu ve bağımlılık ping
+latency'leri arka plan thread'inde periyodik toplanır; health endpoint'leri
+son snapshot'ı bloklamadan döndürür, kısa ring buffer trend için tutulur.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+HEALTH_SAMPLE_INTERVAL = float(os.getenv("HEALTH_SAMPLE_INTERVAL", 5))
+HEALTH_HISTORY_SIZE = int(os.getenv("HEALTH_HISTORY_SIZE", 60))
+HEALTH_PING_TIMEOUT_MS = int(os.getenv("HEALTH_PING_TIMEOUT_MS", 500))
+# gthread worker başına istek thread'i (saturation oranı için)
+WORKER_THREADS = int(os.getenv("GUNICORN_THREADS", 8))
+
+
+class HealthSampler:
+    """Process başına tek sampler thread'i (fork sonrası yeniden başlar)"""
+
+    def __init__(self, interval: float = HEALTH_SAMPLE_INTERVAL, history: int = HEALTH_HISTORY_SIZE):
+        self.interval = interval
+        self.history = deque(maxlen=history)
+        self.latest: Optional[Dict] = None
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._process = None
+
+    # ========== LIFECYCLE ==========
+
+    def ensure_started(self) -> None:
+        """Thread'i process başına bir kez başlat (fork-safe)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.history.clear()
+            self.latest = None
+            self.in_flight = 0
+            if PSUTIL_AVAILABLE:
+                self._process = psutil.Process()
+                # İlk cpu_percent(None) çağrısı referans noktası, 0.0 döner
+                psutil.cpu_percent(interval=None)
+                self._process.cpu_percent(interval=None)
+            threading.Thread(target=self._run, name="health-sampler", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        expected = time.monotonic()
+        while True:
+            # Planlanan uyanma ile gerçek uyanma farkı: GIL/CPU doygunluğu göstergesi
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            try:
+                self._publish(self.sample(lag_ms))
+            except Exception as e:
+                logger.warning(f"⚠️ Health sample hatası: {e}")
+            expected = time.monotonic() + self.interval
+            time.sleep(self.interval)
+
+    def _publish(self, snapshot: Dict) -> None:
+        self.latest = snapshot
+        self.history.append(snapshot)
+
+    # ========== REQUEST TRACKING ==========
+
+    def request_started(self) -> None:
+        self.ensure_started()
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    # ========== SAMPLING ==========
+
+    def sample(self, scheduler_lag_ms: float = 0.0) -> Dict:
+        """Tek snapshot (bloklamayan psutil çağrıları + bağımlılık ping'leri)"""
+        snapshot = {
+            "sampled_at": time.time(),
+            "pid": os.getpid(),
+            "threads": {
+                "active": threading.active_count(),
+                "in_flight_requests": self.in_flight,
+                "worker_threads": WORKER_THREADS,
+                "saturation": round(self.in_flight / WORKER_THREADS, 3) if WORKER_THREADS else 0,
+                "scheduler_lag_ms": round(scheduler_lag_ms, 2),
+            },
+            "dependencies": ping_dependencies(),
+        }
+        if PSUTIL_AVAILABLE:
+            process = self._process or psutil.Process()
+            memory = process.memory_info()
+            snapshot.update(
+                {
+                    "cpu_percent": psutil.cpu_percent(interval=None),
+                    "memory_percent": psutil.virtual_memory().percent,
+                    "disk_percent": psutil.disk_usage("/").percent,
+                    "uptime_seconds": int(time.time() - psutil.boot_time()),
+                    "process": {
+                        "cpu_percent": process.cpu_percent(interval=None),
+                        "rss_bytes": memory.rss,
+                        "open_fds": process.num_fds() if hasattr(process, "num_fds") else None,
+                        "num_threads": process.num_threads(),
+                    },
+                }
+            )
+        return snapshot
+
+    # ========== READ ==========
+
+    def get_latest(self) -> Dict:
+        """Son snapshot + yaşı; henüz örnek yoksa boş dict"""
+        self.ensure_started()
+        latest = self.latest
+        if latest is None:
+            return {}
+        return {**latest, "age_seconds": round(time.time() - latest["sampled_at"], 3)}
+
+    def get_history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Trend için kompakt geçmiş (eskiden yeniye)"""
+        samples = list(self.history)
+        if limit:
+            samples = samples[-limit:]
+        return [
+            {
+                "t": datetime.utcfromtimestamp(s["sampled_at"]).isoformat(),
+                "cpu_percent": s.get("cpu_percent"),
+                "memory_percent": s.get("memory_percent"),
+                "open_fds": (s.get("process") or {}).get("open_fds"),
+                "saturation": s["threads"]["saturation"],
+                "scheduler_lag_ms": s["threads"]["scheduler_lag_ms"],
+                "dependencies": {
+                    name: dep.get("latency_ms") for name, dep in s["dependencies"].items()
+                },
+            }
+            for s in samples
+        ]
+
+
+def _timed_ping(ping) -> Dict:
+    start = time.perf_counter()
+    try:
+        ping()
+        return {
+            "status": "healthy",
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+    except Exception as e:
+        return {"status": "unreachable", "latency_ms": None, "error": str(e)[:200]}
+
+
+def ping_dependencies() -> Dict:
+    """MongoDB ve Redis (cache, rate limiter) ping latency'leri"""
+    from . import database, rate_limiter
+    from .cache import _get_cache_or_none
+
+    dependencies = {}
+    if database.client is not None:
+        dependencies["mongodb"] = _timed_ping(
+            lambda: database.client.admin.command(
+                "ping", maxTimeMS=HEALTH_PING_TIMEOUT_MS
+            )
+        )
+    cache = _get_cache_or_none()
+    if cache is not None:
+        dependencies["redis_cache"] = _timed_ping(cache.client.ping)
+    if rate_limiter.redis_client is not None:
+        dependencies["redis_rate_limit"] = _timed_ping(rate_limiter.redis_client.ping)
+    return dependencies
+
+
+health_sampler = HealthSampler()
+
+
+def init_health_sampler(app):
+    """
+    In-flight istek sayacı; thread ilk istekte veya post_fork'ta başlar
+    (preload'lu master'da thread açılmaz, fork'a taşınmaz)
+    """
+    from flask import g
+
+    @app.before_request
+    def _track_request_start():
+        health_sampler.request_started()
+        g.health_tracked = True
+
+    @app.teardown_request
+    def _track_request_end(error=None):
+        if g.pop("health_tracked", False):
+            health_sampler.request_finished()
+
+    logger.info(
+        f"✅ Health sampler: {HEALTH_SAMPLE_INTERVAL}s aralık, {HEALTH_HISTORY_SIZE} örnek geçmiş"
+    )
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP conditional GET + Cache-Control
+@http_cache ile route başına policy: strong ETag (gövde hash'i veya version
+stamp), If-None-Match / If-Modified-Since -> 304, Cache-Control ve
+stale-while-revalidate. Version stamp verilirse eşleşen istekte view hiç
+çalışmaz.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Iterable, Optional, Union
+
+from flask import current_app, make_response, request
+
+Stamp = Union[str, Callable[[], Optional[str]], None]
+Modified = Union[datetime, Callable[[], Optional[datetime]], None]
+
+
+def body_etag(data: bytes) -> str:
+    """Gövdeden strong ETag"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_version(path: str) -> Callable[[], Optional[str]]:
+    """Dosya mtime+size'dan version stamp (dosyayı okumadan)"""
+
+    def stamp() -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    return stamp
+
+
+def file_mtime(path: str) -> Callable[[], Optional[datetime]]:
+    """Dosya mtime -> Last-Modified"""
+
+    def modified() -> Optional[datetime]:
+        try:
+            return datetime.fromtimestamp(int(os.path.getmtime(path)), timezone.utc)
+        except OSError:
+            return None
+
+    return modified
+
+
+def cache_control_value(
+    max_age: int,
+    s_maxage: Optional[int] = None,
+    stale_while_revalidate: Optional[int] = None,
+    stale_if_error: Optional[int] = None,
+    private: bool = False,
+) -> str:
+    """Cache-Control header değeri"""
+    parts = ["private" if private else "public", f"max-age={max_age}"]
+    if s_maxage is not None and not private:
+        parts.append(f"s-maxage={s_maxage}")
+    if stale_while_revalidate:
+        parts.append(f"stale-while-revalidate={stale_while_revalidate}")
+    if stale_if_error:
+        parts.append(f"stale-if-error={stale_if_error}")
+    return ", ".join(parts)
+
+
+def _resolve(value):
+    return value() if callable(value) else value
+
+
+def _finalize(response, etag, modified, cache_control, vary):
+    response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    response.headers["Cache-Control"] = cache_control
+    for header in vary:
+        response.vary.add(header)
+    return response
+
+
+def http_cache(
+    max_age: int = 60,
+    s_maxage: Optional[int] = None,
+    stale_while_revalidate: Optional[int] = None,
+    stale_if_error: Optional[int] = None,
+    private: bool = False,
+    version: Stamp = None,
+    last_modified: Modified = None,
+    vary: Iterable[str] = (),
+):
+    """
+    Route decorator
+    Usage:
+        @bp.route('/colors')
+        @http_cache(max_age=3600, stale_while_revalidate=86400, version="1")
+        def get_colors(): ...
+
+    version: sabit string veya callable; değişmediği sürece ETag aynı kalır
+        ve If-None-Match eşleşirse view çalıştırılmadan 304 döner. Verilmezse
+        ETag yanıt gövdesinin hash'idir (view çalışır, gövde gönderilmez).
+    """
+    cache_control = cache_control_value(
+        max_age, s_maxage, stale_while_revalidate, stale_if_error, private
+    )
+    vary = tuple(vary) + (("Authorization",) if private else ())
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return func(*args, **kwargs)
+
+            stamp = _resolve(version)
+            modified = _resolve(last_modified)
+            etag = None
+            if stamp is not None:
+                etag = body_etag(f"{request.full_path}|{stamp}".encode("utf-8"))
+                # If-None-Match weak karşılaştırılır (compression ETag'i weak yapar)
+                if request.if_none_match.contains_weak(etag) or (
+                    not request.if_none_match
+                    and modified is not None
+                    and request.if_modified_since is not None
+                    and modified <= request.if_modified_since
+                ):
+                    response = current_app.response_class(status=304)
+                    return _finalize(response, etag, modified, cache_control, vary)
+
+            response = make_response(func(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if etag is None:
+                if response.is_streamed or response.direct_passthrough:
+                    return response
+                etag = body_etag(response.get_data())
+            _finalize(response, etag, modified, cache_control, vary)
+            return response.make_conditional(request)
+
+        wrapper._http_cache = {
+            "cache_control": cache_control,
+            "versioned": version is not None,
+        }
+        return wrapper
+
+    return decorator
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versioned MongoDB index manager
+Declarative index manifest + saklanan manifest hash. Hash değişmediyse
+startup tek bir find_one ile biter; değiştiyse tek bir leader
+list_indexes() ile fark alır ve sadece eksik index'leri oluşturur.
+
+Kullanım (deploy/migration adımı):
+    python -m src.shared.index_manager            # eksikleri oluştur
+    python -m src.shared.index_manager --check    # sadece rapor
+"""
+
+import hashlib
+import json
+import os
+import socket
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+# Manifest hash/versiyon kayıtları
+META_COLLECTION = "_index_manifests"
+
+# auto: hash farklıysa leader oluşturur | check: sadece rapor | off: CLI'a bırak
+INDEX_MODE = os.getenv("MONGO_INDEX_MODE", "auto").lower()
+LOCK_TTL_SECONDS = int(os.getenv("MONGO_INDEX_LOCK_TTL", 600))
+
+# Karşılaştırılan index seçenekleri
+COMPARED_OPTIONS = (
+    "unique",
+    "sparse",
+    "expireAfterSeconds",
+    "partialFilterExpression",
+)
+
+IndexSpec = namedtuple("IndexSpec", ["keys", "options"])
+
+
+def idx(keys, **options) -> IndexSpec:
+    """"field" veya [("a", 1), ("b", -1)] -> IndexSpec"""
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    return IndexSpec(tuple((field, direction) for field, direction in keys), options)
+
+
+def _signature(keys) -> tuple:
+    """
+    Key pattern karşılaştırma anahtarı; text alanları sırasız tek bir
+    ("$text", (...)) girdisine indirgenir (list_indexes _fts/_ftsx döner)
+    """
+    plain = tuple((f, d) for f, d in keys if d != "text")
+    text = tuple(sorted(f for f, d in keys if d == "text"))
+    return plain + ((("$text", text),) if text else ())
+
+
+def _existing_signature(info: Dict) -> tuple:
+    key = list(info["key"].items())
+    if "_fts" in info["key"]:
+        plain = tuple((f, d) for f, d in key if f not in ("_fts", "_ftsx"))
+        return plain + (("$text", tuple(sorted(info.get("weights", {})))),)
+    return tuple(key)
+
+
+def _options(options: Dict) -> Dict:
+    return {k: options[k] for k in COMPARED_OPTIONS if k in options}
+
+
+def _is_text(signature: tuple) -> bool:
+    return any(field == "$text" for field, _ in signature)
+
+
+def manifest_hash(manifest: Dict[str, List[IndexSpec]]) -> str:
+    """Manifest'in kanonik hash'i"""
+    canonical = {
+        collection: sorted(
+            json.dumps([spec.keys, spec.options], sort_keys=True, default=str)
+            for spec in specs
+        )
+        for collection, specs in manifest.items()
+    }
+    raw = json.dumps(canonical, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def validate_manifest(manifest: Dict[str, List[IndexSpec]]) -> List[str]:
+    """Manifest içi çakışmalar (MongoDB'nin reddedeceği tanımlar)"""
+    conflicts = []
+    for collection, specs in manifest.items():
+        text_specs = [s for s in specs if _is_text(_signature(s.keys))]
+        if len(text_specs) > 1:
+            conflicts.append(
+                f"{collection}: {len(text_specs)} ayrı text index tanımlı, "
+                "collection başına tek text index olabilir (alanları birleştirin)"
+            )
+        seen: Dict[tuple, Dict] = {}
+        for spec in specs:
+            if "text" in spec.options:
+                conflicts.append(
+                    f"{collection}: {list(spec.keys)} text=True ile tanımlı; "
+                    "text index için (alan, \"text\") kullanın"
+                )
+            signature = _signature(spec.keys)
+            if signature in seen and seen[signature] != _options(spec.options):
+                conflicts.append(
+                    f"{collection}: {list(spec.keys)} farklı seçeneklerle iki kez tanımlı"
+                )
+            seen.setdefault(signature, _options(spec.options))
+    return conflicts
+
+
+def diff_indexes(db, manifest: Dict[str, List[IndexSpec]]) -> Dict:
+    """
+    Manifest <-> list_indexes() farkı
+
+    Returns:
+        {"missing": {collection: [IndexSpec]}, "conflicts": [...],
+         "unmanaged": [...]}
+    """
+    missing: Dict[str, List[IndexSpec]] = {}
+    conflicts = validate_manifest(manifest)
+    unmanaged = []
+
+    for collection, specs in manifest.items():
+        existing = {
+            _existing_signature(info): info
+            for info in db[collection].list_indexes()
+        }
+        existing_text = [s for s in existing if _is_text(s)]
+        declared = set()
+
+        for spec in specs:
+            signature = _signature(spec.keys)
+            declared.add(signature)
+            info = existing.get(signature)
+            if info is None:
+                if _is_text(signature) and existing_text:
+                    conflicts.append(
+                        f"{collection}: mevcut text index '{existing[existing_text[0]]['name']}' "
+                        f"manifest ile farklı ({list(spec.keys)}), önce drop edilmeli"
+                    )
+                    continue
+                missing.setdefault(collection, []).append(spec)
+            elif _options(info) != _options(spec.options):
+                conflicts.append(
+                    f"{collection}: '{info['name']}' seçenekleri farklı "
+                    f"(mevcut {_options(info)}, manifest {_options(spec.options)})"
+                )
+
+        unmanaged.extend(
+            f"{collection}.{info['name']}"
+            for signature, info in existing.items()
+            if signature not in declared and info["name"] != "_id_"
+        )
+
+    return {"missing": missing, "conflicts": conflicts, "unmanaged": unmanaged}
+
+
+def _acquire_leader(db, name: str) -> Optional[str]:
+    """Manifest başına tek builder (lock dokümanı, TTL'li)"""
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    try:
+        db[META_COLLECTION].update_one(
+            {"_id": f"{name}:lock", "lock_until": {"$lt": now}},
+            {
+                "$set": {
+                    "owner": owner,
+                    "lock_until": now + timedelta(seconds=LOCK_TTL_SECONDS),
+                }
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return None  # başka bir process build ediyor
+    return owner
+
+
+def _release_leader(db, name: str, owner: str) -> None:
+    db[META_COLLECTION].delete_one({"_id": f"{name}:lock", "owner": owner})
+
+
+def _build(db, missing: Dict[str, List[IndexSpec]]) -> Tuple[List[str], List[str]]:
+    """
+    Eksik index'leri collection başına tek createIndexes komutuyla oluştur
+
+    Returns:
+        (created, failed) - failed: "collection: hata" listesi
+    """
+    created, failed = [], []
+    for collection, specs in missing.items():
+        models = [IndexModel(list(spec.keys), **spec.options) for spec in specs]
+        try:
+            created.extend(
+                f"{collection}.{name}" for name in db[collection].create_indexes(models)
+            )
+        except OperationFailure as e:
+            logger.error(f"❌ Index oluşturulamadı ({collection}): {e}")
+            failed.append(f"{collection}: {e}")
+    return created, failed
+
+
+def ensure_indexes(
+    db,
+    manifest: Dict[str, List[IndexSpec]],
+    name: str,
+    mode: Optional[str] = None,
+    force: bool = False,
+) -> Dict:
+    """
+    Manifest'i uygula
+
+    Args:
+        name: Manifest adı (meta kaydı ve lock için)
+        mode: auto | check | off (varsayılan MONGO_INDEX_MODE)
+        force: Saklanan hash aynı olsa da list_indexes ile kontrol et
+
+    Returns:
+        Rapor: status, hash, created, failed, missing, conflicts, unmanaged
+        (status "failed" veya "conflict" ise hash saklanmaz, sonraki
+        startup tekrar dener ve çakışmayı yeniden loglar)
+    """
+    mode = (mode or INDEX_MODE).lower()
+    current = manifest_hash(manifest)
+    report = {"name": name, "hash": current, "status": "skipped"}
+    if mode == "off":
+        return report
+
+    meta = db[META_COLLECTION]
+    stored = meta.find_one({"_id": name}, {"hash": 1})
+    if not force and mode == "auto" and stored and stored.get("hash") == current:
+        report["status"] = "up_to_date"
+        return report
+
+    owner = None
+    if mode == "auto":
+        owner = _acquire_leader(db, name)
+        if owner is None:
+            report["status"] = "locked"
+            logger.info(f"⏳ Index manifest '{name}' başka bir process tarafından uygulanıyor")
+            return report
+
+    try:
+        diff = diff_indexes(db, manifest)
+        report.update(
+            missing={c: [list(s.keys) for s in specs] for c, specs in diff["missing"].items()},
+            conflicts=diff["conflicts"],
+            unmanaged=diff["unmanaged"],
+            created=[],
+            failed=[],
+        )
+        for conflict in diff["conflicts"]:
+            logger.warning(f"⚠️ Index çakışması: {conflict}")
+
+        if mode == "check":
+            report["status"] = "checked"
+            return report
+
+        report["created"], report["failed"] = _build(db, diff["missing"])
+        if report["failed"] or diff["conflicts"]:
+            # Hash'i yazma: eksik index'ler tekrar denenir, çakışmalar
+            # çözülene kadar her çalıştırmada yeniden raporlanır
+            report["status"] = "failed" if report["failed"] else "conflict"
+            meta.update_one(
+                {"_id": name},
+                {
+                    "$set": {
+                        "status": report["status"],
+                        "failed_hash": current,
+                        "failed_at": datetime.utcnow(),
+                        "failed": report["failed"],
+                        "conflicts": diff["conflicts"],
+                    }
+                },
+                upsert=True,
+            )
+            logger.error(
+                f"❌ Index manifest '{name}' uygulanamadı ({current}): "
+                f"{len(report['failed'])} collection başarısız, "
+                f"{len(diff['conflicts'])} çakışma"
+            )
+            return report
+
+        report["status"] = "applied"
+        meta.update_one(
+            {"_id": name},
+            {
+                "$set": {
+                    "hash": current,
+                    "status": "applied",
+                    "applied_at": datetime.utcnow(),
+                    "created": report["created"],
+                },
+                "$unset": {"failed": "", "failed_hash": "", "failed_at": "", "conflicts": ""},
+                "$inc": {"version": 1},
+            },
+            upsert=True,
+        )
+        logger.info(
+            f"✅ Index manifest '{name}' uygulandı ({current}): "
+            f"{len(report['created'])} yeni"
+        )
+        return report
+    finally:
+        if owner:
+            _release_leader(db, name, owner)
+
+
+def main():
+    """CLI: tüm manifest'leri uygula veya raporla"""
+    import argparse
+
+    from pymongo import MongoClient
+
+    from .database import EVENT_TTL_MANIFEST, INDEX_MANIFEST, rollup_backfill_done
+
+    parser = argparse.ArgumentParser(description="MongoDB index manifest")
+    parser.add_argument("--check", action="store_true", help="Sadece fark raporu")
+    parser.add_argument("--force", action="store_true", help="Hash aynı olsa da kontrol et")
+    parser.add_argument("--database", default=os.getenv("MONGODB_DATABASE", "ultrarslanoglu"))
+    args = parser.parse_args()
+
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    db = client[args.database]
+    manifests = {"gateway": INDEX_MANIFEST}
+    if args.check or rollup_backfill_done(db):
+        manifests["gateway_event_ttl"] = EVENT_TTL_MANIFEST
+    else:
+        print("⚠️ gateway_event_ttl atlandı: önce python -m src.shared.event_rollups --backfill")
+    try:
+        from src.galatasaray_research_db import RESEARCH_INDEX_MANIFEST
+
+        manifests["galatasaray_research"] = RESEARCH_INDEX_MANIFEST
+    except ImportError:
+        pass
+
+    exit_code = 0
+    for name, manifest in manifests.items():
+        report = ensure_indexes(
+            db, manifest, name, mode="check" if args.check else "auto", force=True
+        )
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+        if report.get("conflicts") or report["status"] in ("failed", "conflict"):
+            exit_code = 1
+    client.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
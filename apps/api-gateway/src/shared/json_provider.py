@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON response layer
+orjson tabanlı Flask JSON provider: UUID/dataclass native,
+ObjectId/Decimal/set default hook ile serialize edilir. Önceden serialize
+edilmiş JSON (bytes veya raw_json(...)) yeniden encode edilmeden yazılır.
+Çıktı Flask'ın varsayılanıyla aynı: Decimal -> string (hassasiyet korunur),
+datetime/date -> HTTP-date; JSON_DATETIME_FORMAT=iso ile ISO 8601.
+"""
+
+import dataclasses
+import json
+import os
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+from loguru import logger
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - pymongo ile gelir
+    ObjectId = None
+
+# http: "Wed, 21 Oct 2015 07:28:00 GMT" (Flask varsayılanı), iso: ISO 8601
+DATETIME_FORMAT = os.getenv("JSON_DATETIME_FORMAT", "http").lower()
+
+
+class RawJSON:
+    """Önceden serialize edilmiş JSON parçası (ör. Redis'ten gelen payload)"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Union[bytes, str]):
+        self.data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+
+def raw_json(data: Union[bytes, str]) -> RawJSON:
+    """Payload'a olduğu gibi gömülecek JSON"""
+    return RawJSON(data)
+
+
+def _format_datetime(obj: Union[datetime, date, time]) -> str:
+    if DATETIME_FORMAT == "http" and isinstance(obj, date):
+        return http_date(obj)
+    return obj.isoformat()
+
+
+def _default(obj: Any) -> Any:
+    """orjson'un native desteklemediği (veya passthrough edilen) tipler"""
+    if ObjectId is not None and isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return _format_datetime(obj)
+    if isinstance(obj, RawJSON):
+        # orjson < 3.9: Fragment yok, parse edip gömülür
+        if _Fragment is None:
+            return orjson.loads(obj.data)
+        return _Fragment(obj.data)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    """orjson yoksa: native tipler de hook'tan geçer"""
+    if isinstance(obj, RawJSON):
+        return json.loads(obj.data)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _default(obj)
+
+
+_OPTIONS = 0
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    if DATETIME_FORMAT == "http":
+        # orjson datetime'ı her zaman ISO yazar; HTTP-date için hook'a bırak
+        _OPTIONS |= orjson.OPT_PASSTHROUGH_DATETIME
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Python objesi -> JSON bytes"""
+    if orjson is not None:
+        option = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(
+        obj,
+        default=_stdlib_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSON bytes/str -> Python objesi"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    app.json provider
+    jsonify(...) ve view'lardan dönen dict/list'ler buradan geçer.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            body = bytes(obj)
+        elif isinstance(obj, RawJSON):
+            body = obj.data
+        else:
+            indent = self.compact is False or (
+                self.compact is None and self._app.debug
+            )
+            body = dumps(obj, indent=indent)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Flask app'e hızlı JSON provider'ı bağla"""
+    app.json = FastJSONProvider(app)
+    logger.info(
+        f"✅ JSON provider: {'orjson' if orjson is not None else 'json (stdlib)'}"
+    )
+    return app.json
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prefork worker yaşam döngüsü
+Gunicorn master uygulamayı preload eder (blueprint'ler, config, client'lar),
+her worker fork sonrası kendi Mongo/Redis bağlantılarını açar.
+"""
+
+import os
+
+from loguru import logger
+
+from .cache import reset_cache_connections
+from .database import reconnect_after_fork
+from .health_sampler import health_sampler
+from .rate_limiter import reset_rate_limit_connections
+
+
+def post_fork_reinit():
+    """Worker fork sonrası paylaşılan client'ları yeniden başlat"""
+    reconnect_after_fork()
+    reset_cache_connections()
+    reset_rate_limit_connections()
+    health_sampler.ensure_started()
+    logger.info(f"👷 Worker hazır (pid {os.getpid()})")
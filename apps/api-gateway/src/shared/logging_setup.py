@@ -8,6 +8,7 @@ Loguru entegrasyonu, context-aware logging, performance tracking
 from loguru import logger
 import sys
 import os
+import random
 from datetime import datetime
 import json
 from functools import wraps
@@ -49,6 +50,44 @@ class LogConfig:
         "user_id": "{user_id}",
         "duration_ms": "{duration_ms}"
     }
+    
+    # Sink'ler kuyruklu: dosya I/O request thread'inde değil writer thread'inde
+    ENQUEUE = os.getenv('LOG_ENQUEUE', 'true').lower() == 'true'
+    
+    # Başarılı isteklerin loglanma oranı (hatalar ve yavaş istekler her zaman)
+    ACCESS_SAMPLE_RATE = float(os.getenv('LOG_ACCESS_SAMPLE_RATE', 1.0))
+    # Endpoint bazlı override: "analytics.track_event=0.01,video.get_video_status=0.05"
+    ACCESS_SAMPLE_RATES = {
+        endpoint.strip(): float(rate)
+        for endpoint, _, rate in (
+            item.partition('=')
+            for item in os.getenv('LOG_ACCESS_SAMPLE_RATES', '').split(',')
+            if '=' in item
+        )
+    }
+    SLOW_REQUEST_MS = float(os.getenv('LOG_SLOW_REQUEST_MS', 1000))
+
+
+# ========== CHANNELS ==========
+# Kayıtlar bind edilmiş `channel` alanıyla sink'lere yönlendirilir
+# (mesaj içinde substring araması yok)
+
+access_logger = logger.bind(channel="access")
+perf_logger = logger.bind(channel="perf")
+audit_logger = logger.bind(channel="audit")
+security_logger = logger.bind(channel="security")
+
+
+def _channel_filter(*channels):
+    def filter_record(record):
+        return record["extra"].get("channel") in channels
+    return filter_record
+
+
+def _exclude_channels(*channels):
+    def filter_record(record):
+        return record["extra"].get("channel") not in channels
+    return filter_record
 
 
 def setup_logging(app, config=None):
@@ -65,16 +104,30 @@ def setup_logging(app, config=None):
         sys.stdout,
         format=LogConfig.LOG_FORMAT,
         level=os.getenv('LOG_LEVEL', 'INFO'),
-        colorize=True
+        colorize=True,
+        enqueue=LogConfig.ENQUEUE
     )
     
-    # File handler - general
+    # File handler - general (access satırları kendi dosyasında)
     logger.add(
         os.path.join(LogConfig.LOG_DIR, "api_gateway.log"),
         format=LogConfig.LOG_FORMAT,
         level="INFO",
         rotation="500 MB",
-        retention="30 days"
+        retention="30 days",
+        enqueue=LogConfig.ENQUEUE,
+        filter=_exclude_channels("access")
+    )
+    
+    # File handler - access (örneklenmiş, istek başına tek satır)
+    logger.add(
+        os.path.join(LogConfig.LOG_DIR, "access.log"),
+        format=LogConfig.LOG_FORMAT,
+        level="INFO",
+        rotation="500 MB",
+        retention="30 days",
+        enqueue=LogConfig.ENQUEUE,
+        filter=_channel_filter("access")
     )
     
     # File handler - errors
@@ -83,7 +136,8 @@ def setup_logging(app, config=None):
         format=LogConfig.LOG_FORMAT,
         level="ERROR",
         rotation="500 MB",
-        retention="90 days"
+        retention="90 days",
+        enqueue=LogConfig.ENQUEUE
     )
     
     # File handler - performance
@@ -93,7 +147,8 @@ def setup_logging(app, config=None):
         level="INFO",
         rotation="500 MB",
         retention="30 days",
-        filter=lambda record: "PERF:" in record["message"]
+        enqueue=LogConfig.ENQUEUE,
+        filter=_channel_filter("perf")
     )
     
     # File handler - audit
@@ -103,12 +158,70 @@ def setup_logging(app, config=None):
         level="INFO",
         rotation="500 MB",
         retention="365 days",
-        filter=lambda record: "AUDIT:" in record["message"]
+        enqueue=LogConfig.ENQUEUE,
+        filter=_channel_filter("audit", "security")
     )
     
     logger.info("✅ Logging sistemi kuruldu")
 
 
+# ========== ACCESS LOG (SAMPLED) ==========
+
+_sample_rates = {}
+
+
+def log_sample(rate):
+    """
+    Route decorator: başarılı isteklerin access log oranı
+    Usage:
+        @bp.route('/events')
+        @log_sample(0.01)
+        def track_event(): ...
+    """
+    def decorator(func):
+        func._log_sample_rate = rate
+        return func
+    return decorator
+
+
+def _sample_rate(app, endpoint):
+    rate = _sample_rates.get(endpoint)
+    if rate is None:
+        rate = LogConfig.ACCESS_SAMPLE_RATES.get(endpoint)
+        if rate is None:
+            view = app.view_functions.get(endpoint) if endpoint else None
+            rate = getattr(view, '_log_sample_rate', LogConfig.ACCESS_SAMPLE_RATE)
+        _sample_rates[endpoint] = rate
+    return rate
+
+
+def log_access(app, response, duration_ms):
+    """
+    İstek başına tek access satırı
+    5xx/4xx ve yavaş istekler her zaman, başarılılar endpoint oranında loglanır.
+    """
+    status = response.status_code
+    if status >= 500:
+        level = "ERROR"
+    elif status >= 400 or duration_ms >= LogConfig.SLOW_REQUEST_MS:
+        level = "WARNING"
+    else:
+        rate = _sample_rate(app, request.endpoint)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        level = "INFO"
+    
+    access_logger.log(
+        level,
+        "{} {} {} {:.1f}ms id={}",
+        status,
+        request.method,
+        request.path,
+        duration_ms,
+        getattr(g, 'request_id', '-')
+    )
+
+
 def get_request_context():
     """Request context'i getir"""
     context = {
@@ -166,17 +279,17 @@ def log_performance(threshold_ms=100):
                 elapsed_ms = (time.time() - start) * 1000
                 
                 if elapsed_ms > threshold_ms:
-                    logger.warning(
+                    perf_logger.warning(
                         f"PERF: {func.__name__} took {elapsed_ms:.1f}ms "
                         f"(threshold: {threshold_ms}ms)"
                     )
                 else:
-                    logger.debug(f"PERF: {func.__name__} took {elapsed_ms:.1f}ms")
+                    perf_logger.debug(f"PERF: {func.__name__} took {elapsed_ms:.1f}ms")
                 
                 return result
             except Exception as e:
                 elapsed_ms = (time.time() - start) * 1000
-                logger.error(f"PERF: {func.__name__} failed after {elapsed_ms:.1f}ms")
+                perf_logger.error(f"PERF: {func.__name__} failed after {elapsed_ms:.1f}ms")
                 raise
         
         return wrapper
@@ -195,7 +308,7 @@ def log_audit_event(action, resource, status, details=None):
         "details": details or {}
     }
     
-    logger.info(f"AUDIT: {json.dumps(audit_log)}")
+    audit_logger.bind(**audit_log).info(f"AUDIT: {json.dumps(audit_log)}")
 
 
 def log_database_operation(operation, collection, query, duration_ms):
@@ -241,7 +354,7 @@ def log_security_event(event_type, details):
         "details": details
     }
     
-    logger.warning(f"SECURITY: {json.dumps(security_log)}")
+    security_logger.warning(f"SECURITY: {json.dumps(security_log)}")
 
 
 # Context-aware logging classes
@@ -305,31 +418,26 @@ class StructuredLogger:
 # Performance metrics
 
 class MetricsCollector:
-    """Performans metrikleri topla"""
+    """Performans metrikleri (Prometheus, bkz. metrics.py)"""
     
     @staticmethod
     def record_endpoint_metric(endpoint, method, status_code, duration_ms):
         """Endpoint metrikleri kaydet"""
-        logger.debug(
-            f"METRIC: endpoint={endpoint} method={method} "
-            f"status={status_code} duration_ms={duration_ms:.1f}"
-        )
+        from .metrics import record_request
+        record_request(method, endpoint, status_code, duration_ms / 1000)
     
     @staticmethod
     def record_database_metric(operation, collection, duration_ms):
         """Database metrikleri kaydet"""
-        logger.debug(
-            f"METRIC: db_operation={operation} collection={collection} "
-            f"duration_ms={duration_ms:.1f}"
-        )
+        from .metrics import record_db_operation
+        record_db_operation(collection, operation, duration_ms / 1000)
     
     @staticmethod
     def record_cache_metric(key, operation, hit, duration_ms):
-        """Cache metrikleri kaydet"""
-        logger.debug(
-            f"METRIC: cache_key={key} operation={operation} "
-            f"hit={hit} duration_ms={duration_ms:.1f}"
-        )
+        """Cache metrikleri kaydet (key label olmaz: kardinalite)"""
+        from .metrics import record_cache, record_cache_latency
+        record_cache("redis", hit)
+        record_cache_latency(operation, duration_ms / 1000)
 
 
 logger.info("✅ Logging modülü yüklendi")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus metrics
+İstek, Mongo, cache, rate limiter ve pool metrikleri tek registry'de.
+Gunicorn prefork altında PROMETHEUS_MULTIPROC_DIR ile multiprocess mod:
+her worker kendi mmap dosyasına yazar, /metrics hepsini toplar.
+prometheus_client yoksa tüm kayıt fonksiyonları no-op.
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from loguru import logger
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Çoğu endpoint 100ms altında: alt aralık sık, kuyruk seyrek
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CACHE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+# Pool gauge'ları istek yolunda en fazla bu aralıkla örneklenir
+POOL_SAMPLE_INTERVAL = float(os.getenv("METRICS_POOL_SAMPLE_INTERVAL", 1.0))
+
+
+class _NoopMetric:
+    """prometheus_client yokken metric yerine geçer"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+_NOOP = _NoopMetric()
+
+if PROMETHEUS_AVAILABLE and METRICS_ENABLED:
+    request_count = Counter(
+        "api_requests_total", "Total API requests", ["method", "endpoint", "status"]
+    )
+    request_duration = Histogram(
+        "api_request_duration_seconds",
+        "API request duration",
+        ["method", "endpoint"],
+        buckets=REQUEST_BUCKETS,
+    )
+    db_operation_duration = Histogram(
+        "mongodb_operation_duration_seconds",
+        "MongoDB repository operation latency",
+        ["collection", "operation"],
+        buckets=DB_BUCKETS,
+    )
+    db_connection_pool = Gauge(
+        "mongodb_connections_active",
+        "Checked-out MongoDB connections",
+        multiprocess_mode="livesum",
+    )
+    db_pool_max = Gauge(
+        "mongodb_pool_max_size",
+        "MongoDB maxPoolSize per process",
+        multiprocess_mode="livesum",
+    )
+    cache_hits = Counter("cache_hits_total", "Total cache hits", ["cache_type"])
+    cache_misses = Counter("cache_misses_total", "Total cache misses", ["cache_type"])
+    cache_duration = Histogram(
+        "cache_operation_duration_seconds",
+        "Redis cache operation latency",
+        ["operation"],
+        buckets=CACHE_BUCKETS,
+    )
+    rate_limit_decisions = Counter(
+        "rate_limit_decisions_total",
+        "Rate limiter decisions",
+        ["rule", "decision"],
+    )
+    redis_pool_in_use = Gauge(
+        "redis_pool_connections_in_use",
+        "Redis connections in use",
+        ["pool"],
+        multiprocess_mode="livesum",
+    )
+    redis_pool_max = Gauge(
+        "redis_pool_max_connections",
+        "Redis pool max_connections per process",
+        ["pool"],
+        multiprocess_mode="livesum",
+    )
+else:
+    request_count = request_duration = db_operation_duration = _NOOP
+    db_connection_pool = db_pool_max = cache_hits = cache_misses = _NOOP
+    cache_duration = rate_limit_decisions = redis_pool_in_use = redis_pool_max = _NOOP
+
+
+# ========== RECORDERS ==========
+
+
+def record_request(method: str, endpoint: str, status: int, duration_s: float) -> None:
+    request_count.labels(method, endpoint, str(status)).inc()
+    request_duration.labels(method, endpoint).observe(duration_s)
+
+
+def record_db_operation(collection: str, operation: str, duration_s: float) -> None:
+    db_operation_duration.labels(collection, operation).observe(duration_s)
+
+
+def record_cache(cache_type: str, hit: bool) -> None:
+    (cache_hits if hit else cache_misses).labels(cache_type).inc()
+
+
+def record_cache_latency(operation: str, duration_s: float) -> None:
+    cache_duration.labels(operation).observe(duration_s)
+
+
+def record_rate_limit(rule: str, limited: bool) -> None:
+    rate_limit_decisions.labels(rule, "limited" if limited else "allowed").inc()
+
+
+# ========== POOL SATURATION ==========
+
+_last_pool_sample = 0.0
+_pool_sample_lock = threading.Lock()
+
+
+def _redis_pools() -> Dict:
+    pools = {}
+    from .cache import _get_cache_or_none
+    from .rate_limiter import redis_client
+
+    cache = _get_cache_or_none()
+    if cache is not None:
+        pools["cache"] = cache.data_client.connection_pool
+    if redis_client is not None:
+        pools["rate_limit"] = redis_client.connection_pool
+    return pools
+
+
+def sample_pools(force: bool = False) -> None:
+    """Redis pool doluluğunu gauge'lara yaz (throttled)"""
+    global _last_pool_sample
+    now = time.monotonic()
+    if not force and now - _last_pool_sample < POOL_SAMPLE_INTERVAL:
+        return
+    if not _pool_sample_lock.acquire(blocking=False):
+        return
+    try:
+        _last_pool_sample = now
+        for name, pool in _redis_pools().items():
+            redis_pool_in_use.labels(name).set(len(getattr(pool, "_in_use_connections", ())))
+            redis_pool_max.labels(name).set(pool.max_connections)
+    except Exception as e:
+        logger.debug(f"Pool metrics örneklenemedi: {e}")
+    finally:
+        _pool_sample_lock.release()
+
+
+# ========== EXPOSITION ==========
+
+
+def render_metrics():
+    """(body, content_type) - multiprocess modda tüm worker'ları toplar"""
+    if not PROMETHEUS_AVAILABLE:
+        return None, None
+    sample_pools(force=True)
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Gunicorn child_exit: ölen worker'ın live gauge dosyalarını temizle"""
+    if PROMETHEUS_AVAILABLE and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app):
+    """İstek metrikleri (endpoint adı label olarak) ve /metrics endpoint'i"""
+    from flask import Response, request
+
+    if not (PROMETHEUS_AVAILABLE and METRICS_ENABLED):
+        logger.warning("⚠️ prometheus_client yok veya METRICS_ENABLED=false, metrikler kapalı")
+        return
+
+    @app.before_request
+    def _metrics_start():
+        request.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(response):
+        start = getattr(request, "metrics_start", None)
+        if start is not None:
+            # Ham path yerine endpoint adı: label kardinalitesi sınırlı kalır
+            record_request(
+                request.method,
+                request.endpoint or "unmatched",
+                response.status_code,
+                time.perf_counter() - start,
+            )
+        sample_pools()
+        return response
+
+    @app.route("/metrics", methods=["GET"], endpoint="metrics")
+    def _metrics_endpoint():
+        body, content_type = render_metrics()
+        return Response(body, mimetype=None, content_type=content_type)
+
+    mode = f"multiprocess ({MULTIPROC_DIR})" if MULTIPROC_DIR else "single process"
+    logger.info(f"✅ Prometheus metrikleri aktif: {mode}")
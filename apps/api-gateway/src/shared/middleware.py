@@ -10,6 +10,8 @@ from loguru import logger
 from datetime import datetime
 import time
 
+from .logging_setup import log_access
+
 
 def setup_middleware(app, config):
     """Middleware'leri yapılandır"""
@@ -17,15 +19,14 @@ def setup_middleware(app, config):
     @app.before_request
     def before_request():
         """Her request öncesi"""
-        request.start_time = time.time()
-        logger.info(f"📥 {request.method} {request.path}")
+        request.start_time = time.perf_counter()
     
     @app.after_request
     def after_request(response):
-        """Her request sonrası"""
+        """Her request sonrası (tek, örneklenmiş access satırı)"""
         if hasattr(request, 'start_time'):
-            duration = time.time() - request.start_time
-            logger.info(f"📤 {request.method} {request.path} - {response.status_code} ({duration:.3f}s)")
+            duration_ms = (time.perf_counter() - request.start_time) * 1000
+            log_access(app, response, duration_ms)
         
         # CORS headers (if not using flask-cors)
         response.headers['X-API-Version'] = '2.0.0'
@@ -7,6 +7,7 @@ Sentry, Prometheus, ELK integration
 
 import logging
 import os
+import time
 
 # ============================================
 # SENTRY SETUP (Error Tracking)
@@ -52,58 +53,29 @@ def init_sentry():
 
 
 def init_prometheus(app):
-    """Initialize Prometheus metrics"""
-    try:
-        from prometheus_client import (
-            CollectorRegistry,
-            Counter,
-            Gauge,
-            Histogram,
-            generate_latest,
-        )
-        from prometheus_flask_exporter import PrometheusMetrics
-
-        metrics = PrometheusMetrics(app)
-
-        # Custom metrics
-        request_count = Counter(
-            "api_requests_total", "Total API requests", ["method", "endpoint", "status"]
-        )
-
-        request_duration = Histogram(
-            "api_request_duration_seconds",
-            "API request duration",
-            ["method", "endpoint"],
-            buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0),
-        )
+    """Prometheus metrics (tanımlar ve instrumentation: metrics.py)"""
+    from . import metrics
 
-        db_connection_pool = Gauge(
-            "mongodb_connections_active", "Active MongoDB connections"
-        )
-
-        cache_hits = Counter("cache_hits_total", "Total cache hits", ["cache_type"])
-
-        cache_misses = Counter(
-            "cache_misses_total", "Total cache misses", ["cache_type"]
-        )
-
-        logging.info("✅ Prometheus metrics initialized")
-        return {
-            "metrics": metrics,
-            "request_count": request_count,
-            "request_duration": request_duration,
-            "db_connection_pool": db_connection_pool,
-            "cache_hits": cache_hits,
-            "cache_misses": cache_misses,
-        }
-    except ImportError:
+    if not metrics.PROMETHEUS_AVAILABLE:
         logging.warning(
-            "⚠️  prometheus-client not installed. Install with: pip install prometheus-client prometheus-flask-exporter"
+            "⚠️  prometheus-client not installed. Install with: pip install prometheus-client"
         )
         return None
-    except Exception as e:
-        logging.error(f"❌ Prometheus initialization error: {e}")
-        return None
+
+    # create_app() zaten kaydettiyse ikinci kez hook/route ekleme
+    if "metrics" not in app.view_functions:
+        metrics.init_metrics(app)
+
+    logging.info("✅ Prometheus metrics initialized")
+    return {
+        "request_count": metrics.request_count,
+        "request_duration": metrics.request_duration,
+        "db_operation_duration": metrics.db_operation_duration,
+        "db_connection_pool": metrics.db_connection_pool,
+        "cache_hits": metrics.cache_hits,
+        "cache_misses": metrics.cache_misses,
+        "rate_limit_decisions": metrics.rate_limit_decisions,
+    }
 
 
 # ============================================
@@ -296,19 +268,12 @@ class AlertManager:
 
 
 def get_system_health() -> dict:
-    """Get system health metrics"""
-    try:
-        import psutil
+    """Son arka plan snapshot'ı (bloklamaz, bkz. health_sampler)"""
+    from .health_sampler import PSUTIL_AVAILABLE, health_sampler
 
-        return {
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage("/").percent,
-            "uptime_seconds": int(time.time() - psutil.boot_time()),
-        }
-    except ImportError:
+    if not PSUTIL_AVAILABLE:
         logging.warning("⚠️  psutil not installed for system metrics")
-        return {}
+    return health_sampler.get_latest()
 
 
 # ============================================
@@ -360,9 +325,10 @@ def register_monitoring_blueprints(app, monitoring):
     def metrics():
         """Prometheus metrics endpoint"""
         if "prometheus" in monitoring:
-            from prometheus_client import generate_latest
+            from .metrics import render_metrics
 
-            return generate_latest(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+            body, content_type = render_metrics()
+            return body, 200, {"Content-Type": content_type}
         return {"error": "Prometheus not configured"}, 503
 
     @bp.route("/health", methods=["GET"])
@@ -379,8 +345,28 @@ def register_monitoring_blueprints(app, monitoring):
 
     @bp.route("/health/detailed", methods=["GET"])
     def detailed_health():
-        """Detailed health check"""
+        """Detailed health check (?history=N: son N örnek trendi)"""
+        from flask import request
+
+        from .compression import get_compression_stats
+        from .database import get_pool_stats, get_query_stats
+        from .event_ingest import get_ingest_stats
+        from .health_sampler import HEALTH_HISTORY_SIZE, health_sampler
+        from .read_routing import get_routing_stats
+        from .tracing import get_tracing_stats
+
         health_data = get_system_health()
+        health_data["history"] = health_sampler.get_history(
+            request.args.get("history", HEALTH_HISTORY_SIZE, type=int)
+        )
+        health_data["database"] = {
+            "pool": get_pool_stats(),
+            "queries": get_query_stats(),
+            "routing": get_routing_stats(),
+        }
+        health_data["event_ingest"] = get_ingest_stats()
+        health_data["compression"] = get_compression_stats()
+        health_data["tracing"] = get_tracing_stats()
         health_data.update(
             {
                 "status": "healthy",
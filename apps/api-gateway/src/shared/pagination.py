@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyset (cursor) pagination + cached counts
+skip/limit yerine index üzerindeki son görülen değerden devam eder,
+toplamlar cache'ten gelir ve arka planda yenilenir
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import request
+from loguru import logger
+
+from .cache import cached
+from .cache_codec import JsonSerializer
+from .database import MongoDBConnection
+from .error_handler import ValidationError
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", 100))
+
+# Eski (page/skip) istemciler için uyumluluk modu
+LEGACY_SKIP_ENABLED = os.getenv("PAGINATION_LEGACY_SKIP", "true").lower() == "true"
+
+# Count cache: 60s taze, sonra 10 dk boyunca bayat değer + arka plan yenileme
+COUNT_TTL = int(os.getenv("PAGINATION_COUNT_TTL", 60))
+COUNT_STALE_TTL = int(os.getenv("PAGINATION_COUNT_STALE_TTL", 600))
+# Count tag'inin kapsamı: filtrede bu alan eşitlikle varsa tag sahibe özel olur
+COUNT_OWNER_FIELD = "user_id"
+
+_serializer = JsonSerializer()
+
+# Cursor'da sadece sort key olabilecek skaler tipler; dict/list Mongo
+# operatörü olarak filtreye sızabilir ({"$ne": null} gibi)
+CURSOR_VALUE_TYPES = (str, int, float, bool, datetime, ObjectId, type(None))
+
+
+# ============================================================================
+# CURSOR
+# ============================================================================
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Sort key değerlerini opak bir token'a çevir"""
+    raw = _serializer.dumps(list(values))
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Token -> sort key değerleri (datetime/ObjectId korunur)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = _serializer.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError, TypeError, InvalidId):
+        raise ValidationError("Geçersiz cursor", field="cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError("Geçersiz cursor", field="cursor")
+    if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise ValidationError("Geçersiz cursor", field="cursor")
+    return values
+
+
+def _after(sort: Sequence[Tuple[str, int]], values: Sequence[Any]) -> Dict:
+    """
+    Cursor'dan sonraki dokümanlar için filtre
+    [(a, -1), (b, -1)] -> {$or: [{a: {$lt: va}}, {a: va, b: {$lt: vb}}]}
+    """
+    branches = []
+    for index, (field, direction) in enumerate(sort):
+        branch = {f: values[i] for i, (f, _) in enumerate(sort[:index])}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[index]}
+        branches.append(branch)
+    return {"$or": branches}
+
+
+def _projection_with_sort(projection: Optional[Dict], sort) -> Optional[Dict]:
+    """Inclusion projection'da sort alanları da dönmeli (cursor için)"""
+    if not projection or not any(v for k, v in projection.items() if k != "_id"):
+        return projection
+    projection = dict(projection)
+    for field, _ in sort:
+        projection.setdefault(field, 1)
+    return projection
+
+
+# ============================================================================
+# COUNTS
+# ============================================================================
+
+
+def _count_key(collection: str, query: Dict) -> str:
+    digest = hashlib.sha1(_serializer.dumps(query)).hexdigest()[:16]
+    return f"count:{collection}:{digest}"
+
+
+def _count_tag_for(collection: str, owner: Optional[Any] = None) -> str:
+    if owner is None:
+        return f"count:{collection}"
+    return f"count:{collection}:{COUNT_OWNER_FIELD}:{owner}"
+
+
+def _count_tag(collection: str, query: Dict) -> str:
+    """
+    Sahibe göre tag: bir kullanıcının yazması sadece onun count'larını siler
+    (sahipsiz filtreler collection geneli tag'e düşer)
+    """
+    owner = query.get(COUNT_OWNER_FIELD)
+    if not isinstance(owner, (str, int, ObjectId)):
+        owner = None
+    return _count_tag_for(collection, owner)
+
+
+@cached(
+    _count_key,
+    ttl=COUNT_TTL,
+    stale_ttl=COUNT_STALE_TTL,
+    tags=[_count_tag],
+)
+def cached_count(collection: str, query: Dict) -> int:
+    """Collection count (cache'li, süre dolunca arka planda yenilenir)"""
+    return MongoDBConnection().count(collection, query)
+
+
+def invalidate_counts(collection: str, owner: Optional[Any] = None) -> None:
+    """
+    Yazma sonrası cache'li count'ları sil: owner verilirse sadece onun
+    count'ları + sahipsiz (collection geneli) count'lar
+    """
+    from .cache import _get_cache_or_none
+
+    cache = _get_cache_or_none()
+    if cache is None:
+        return
+    tags = [_count_tag_for(collection)]
+    if owner is not None:
+        tags.append(_count_tag_for(collection, owner))
+    cache.invalidate_tags(*tags)
+
+
+# ============================================================================
+# PAGINATION
+# ============================================================================
+
+
+def page_args(default_limit: int = DEFAULT_PAGE_SIZE) -> Dict:
+    """Request'ten limit/cursor/page oku"""
+    limit = request.args.get("limit", default_limit, type=int) or default_limit
+    return {
+        "limit": max(1, min(limit, MAX_PAGE_SIZE)),
+        "cursor": request.args.get("cursor") or None,
+        "page": request.args.get("page", type=int),
+    }
+
+
+def paginate(
+    collection: str,
+    query: Dict,
+    sort: Sequence[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    page: Optional[int] = None,
+    projection: Optional[Dict] = None,
+    with_total: bool = True,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Tek sayfa getir
+
+    Args:
+        sort: Benzersiz olmalı, son alan olarak _id önerilir
+            ([("created_at", -1), ("_id", -1)])
+        cursor: Önceki yanıttaki next_cursor
+        page: Uyumluluk modu; cursor yoksa skip ile sayfalar
+
+    Returns:
+        (items, pagination) - pagination eski alanları (page, limit,
+        total, pages) ve next_cursor/has_more içerir
+    """
+    mongo = MongoDBConnection()
+    sort = list(sort)
+    find_query, skip = query, 0
+
+    if cursor:
+        values = decode_cursor(cursor, len(sort))
+        find_query = {"$and": [query, _after(sort, values)]}
+    elif page and page > 1:
+        if not LEGACY_SKIP_ENABLED:
+            raise ValidationError("page desteklenmiyor, cursor kullanın", field="page")
+        skip = (page - 1) * limit
+
+    # Bir fazlasını çek: sonraki sayfa var mı?
+    items = mongo.find(
+        collection,
+        find_query,
+        skip=skip,
+        limit=limit + 1,
+        sort=sort,
+        projection=_projection_with_sort(projection, sort),
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor([last.get(field) for field, _ in sort])
+
+    pagination = {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "page": page or 1,
+    }
+    if with_total:
+        try:
+            total = cached_count(collection, query)
+        except Exception as e:
+            logger.warning(f"⚠️ Count alınamadı ({collection}): {e}")
+            total = None
+        pagination["total"] = total
+        pagination["total_is_estimate"] = True
+        pagination["pages"] = (total + limit - 1) // limit if total is not None else None
+    return items, pagination
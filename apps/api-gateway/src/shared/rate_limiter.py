@@ -5,36 +5,75 @@ Rate Limiting Middleware
 Redis-based request rate limiting
 """
 
-from flask import request, jsonify
+from flask import request, jsonify, g
 from functools import wraps
 from loguru import logger
 from datetime import datetime, timedelta
-import redis
 import os
+import math
+import threading
+import time
+import uuid
+from collections import namedtuple
 from typing import Tuple, Optional
 
+from .metrics import record_rate_limit
+
 # ========== REDIS SETUP ==========
 
+# Bağlantı import'ta değil init_rate_limiting() -> init_rate_limit_redis() ile kurulur
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-try:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
-    redis_client.ping()
+redis_client = None
+REDIS_AVAILABLE = False
+
+
+def init_rate_limit_redis(url: Optional[str] = None) -> bool:
+    """Rate limiting Redis bağlantısını kur (idempotent)"""
+    global redis_client, REDIS_AVAILABLE
+    if redis_client is not None:
+        return REDIS_AVAILABLE
+    import redis
+    
+    try:
+        client = redis.from_url(url or redis_url, decode_responses=True)
+        client.ping()
+    except Exception as e:
+        logger.warning(f"⚠️  Redis not available for rate limiting: {e}")
+        return False
+    redis_client = client
+    rate_limiter.bind(client)
     REDIS_AVAILABLE = True
     logger.info("✅ Redis connected for rate limiting")
-except Exception as e:
-    REDIS_AVAILABLE = False
-    logger.warning(f"⚠️  Redis not available for rate limiting: {e}")
+    return True
+
+
+def reset_rate_limit_connections():
+    """Fork sonrası: master'dan kopyalanan Redis bağlantılarını bırak"""
+    if REDIS_AVAILABLE:
+        redis_client.connection_pool.reset()
 
 # ========== RATE LIMIT CONFIGURATIONS ==========
 
+# Algoritmalar:
+#   gcra           - token bucket eşdeğeri, key başına tek değer (varsayılan)
+#   sliding_window - sliding window log, tam doğru ama limit kadar bellek
+#   fixed_window   - eski INCR/EXPIRE davranışı (atomik)
+DEFAULT_ALGORITHM = "gcra"
+
+# Modlar:
+#   strict      - her istek Redis'e gider (Lua script, kesin)
+#   approximate - worker'da lokal sayılır, Redis'e toplu senkronlanır
+#                 (RATE_LIMIT_TOLERANCE kadar fazla kabul edilebilir)
+DEFAULT_MODE = os.getenv('RATE_LIMIT_MODE', 'strict')
+
 RATE_LIMITS = {
-    # Global limits
-    "global": {"requests": 1000, "window": 60},  # 1000 per minute
+    # Global limits (yüksek hacim: yaklaşık mod)
+    "global": {"requests": 1000, "window": 60, "mode": "approximate"},  # 1000 per minute
     
-    # Per-endpoint limits
-    "auth.login": {"requests": 10, "window": 60},  # 10 per minute
-    "auth.register": {"requests": 5, "window": 3600},  # 5 per hour
-    "auth.password_reset": {"requests": 3, "window": 3600},  # 3 per hour
+    # Per-endpoint limits (düşük limitli hassas endpoint'ler: birebir doğru log)
+    "auth.login": {"requests": 10, "window": 60, "algorithm": "sliding_window", "mode": "strict"},  # 10 per minute
+    "auth.register": {"requests": 5, "window": 3600, "algorithm": "sliding_window", "mode": "strict"},  # 5 per hour
+    "auth.password_reset": {"requests": 3, "window": 3600, "algorithm": "sliding_window", "mode": "strict"},  # 3 per hour
     
     # API limits
     "api.video.upload": {"requests": 5, "window": 3600},  # 5 per hour
@@ -42,17 +81,288 @@ RATE_LIMITS = {
     "api.ai_editor.analyze": {"requests": 10, "window": 3600},  # 10 per hour
     "api.analytics.metrics": {"requests": 100, "window": 60},  # 100 per minute
     
+    # Per-user limit (Bearer token'daki user_id'ye göre, tüm endpoint'ler)
+    "user": {"requests": 600, "window": 60, "mode": "approximate"},  # 600 per minute
+    
     # Public endpoints (no limit)
     "public": None
 }
 
+# Flask endpoint adı -> RATE_LIMITS anahtarı
+ENDPOINT_ALIASES = {
+    "auth.request_password_reset": "auth.password_reset",
+    "auth.reset_password": "auth.password_reset",
+    "video.upload_video": "api.video.upload",
+    "video.process_video_request": "api.video.process",
+    "ai_editor.analyze_video": "api.ai_editor.analyze",
+    "analytics.get_video_metrics": "api.analytics.metrics",
+}
+
+# Hiç limit uygulanmayan endpoint'ler (health check, metrics, static)
+EXEMPT_ENDPOINTS = {"health", "status", "static", "metrics", "monitoring.metrics"}
+
+# ========== LUA SCRIPTS ==========
+# Hepsi tek round trip'te karar verir ve {allowed, remaining, reset_ms, current}
+# döndürür. Zaman Redis sunucusundan (TIME) alınır; pod saat farkları etkilemez.
+
+_LUA_NOW_MS = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+"""
+
+# KEYS[1]=key  ARGV: limit, window_ms, member
+SLIDING_WINDOW_SCRIPT = _LUA_NOW_MS + """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], window)
+local reset = window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+local current = count
+if allowed == 0 then
+    current = count + 1
+end
+return {allowed, math.max(0, limit - count), reset, current}
+"""
+
+# KEYS[1]=key  ARGV: limit, window_ms
+GCRA_SCRIPT = _LUA_NOW_MS + """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local emission = window / limit
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+if new_tat - now > window then
+    local retry = math.ceil(new_tat - window - now)
+    return {0, 0, math.max(retry, 1), limit + 1}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+local remaining = math.floor((window - (new_tat - now)) / emission)
+return {1, remaining, math.ceil(new_tat - now), limit - remaining}
+"""
+
+# KEYS[1]=key  ARGV: limit, window_ms
+FIXED_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local current = redis.call('INCR', KEYS[1])
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+local allowed = 0
+if current <= limit then
+    allowed = 1
+end
+return {allowed, math.max(0, limit - current), ttl, current}
+"""
+
+ALGORITHMS = ("gcra", "sliding_window", "fixed_window")
+MODES = ("strict", "approximate")
+
+# ========== APPROXIMATE (LOCAL + BATCHED) LIMITER ==========
+
+class _LocalWindow:
+    """Worker-local view of one identifier/endpoint counter"""
+    
+    __slots__ = ("window", "window_start", "synced", "pending", "previous")
+    
+    def __init__(self, window: int, window_start: int, previous: int = 0):
+        self.window = window
+        self.window_start = window_start
+        self.synced = 0      # Redis'ten son okunan (tüm worker'lar) sayaç
+        self.pending = 0     # Bu worker'ın henüz Redis'e yazılmamış istekleri
+        self.previous = previous  # Önceki pencerenin toplamı (sliding tahmin)
+
+
+class ApproximateRateLimiter:
+    """
+    Hybrid local/remote rate limiter
+    Her worker kararı lokal olarak verir; tüketilen sayılar her
+    sync_interval_ms'de veya sync_batch istekte bir tek pipeline ile Redis'e
+    INCRBY edilir ve dönen global toplam lokal görünümü günceller.
+    Redis doğruluk kaynağıdır; fazla kabul kabaca
+    worker_sayısı x sync_batch ile ve tolerance oranıyla sınırlıdır.
+    """
+    
+    def __init__(
+        self,
+        redis_client,
+        sync_interval_ms: int = None,
+        sync_batch: int = None,
+        tolerance: float = None
+    ):
+        self.redis = redis_client
+        self.sync_interval = (
+            sync_interval_ms
+            if sync_interval_ms is not None
+            else int(os.getenv('RATE_LIMIT_SYNC_INTERVAL_MS', 250))
+        ) / 1000
+        self.sync_batch = (
+            sync_batch
+            if sync_batch is not None
+            else int(os.getenv('RATE_LIMIT_SYNC_BATCH', 50))
+        )
+        self.tolerance = (
+            tolerance
+            if tolerance is not None
+            else float(os.getenv('RATE_LIMIT_TOLERANCE', 0.05))
+        )
+        self._windows = {}
+        self._carry = []  # Kapanan pencerelerin senkronlanmamış sayıları
+        self._lock = threading.Lock()
+        self._pending_total = 0
+        self._last_sync = time.monotonic()
+        self._pid = os.getpid()
+    
+    def _key(self, identifier: str, endpoint: str) -> str:
+        return f"rate_limit:approx:{endpoint}:{identifier}"
+    
+    def is_rate_limited(
+        self,
+        identifier: str,
+        endpoint: str,
+        requests: int,
+        window: int
+    ) -> Tuple[bool, dict]:
+        """Local admission decision, Redis is only touched on sync"""
+        now = time.time()
+        window_start = int(now // window) * window
+        elapsed_ratio = (now - window_start) / window
+        key = self._key(identifier, endpoint)
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Fork sonrası parent'ın sayaçları bu process'e ait değil
+                self._windows.clear()
+                self._carry = []
+                self._pending_total = 0
+                self._pid = os.getpid()
+            
+            state = self._windows.get(key)
+            if state is None or state.window_start != window_start:
+                previous = 0
+                if state is not None and state.window_start == window_start - window:
+                    previous = state.synced + state.pending
+                if state is not None and state.pending:
+                    # Önceki pencerenin senkronlanmamış sayıları sync'te yazılır
+                    self._carry.append(
+                        (key, state.window_start, state.window, state.pending)
+                    )
+                state = _LocalWindow(window, window_start, previous)
+                self._windows[key] = state
+            
+            # Sliding window counter tahmini (önceki pencere ağırlıklı)
+            estimated = (
+                state.previous * (1 - elapsed_ratio) + state.synced + state.pending
+            )
+            allowed = estimated < requests * (1 + self.tolerance)
+            if allowed:
+                state.pending += 1
+                self._pending_total += 1
+            
+            need_sync = (
+                self._pending_total >= self.sync_batch
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            )
+        
+        if need_sync:
+            self.sync()
+        
+        current = int(estimated) + (1 if allowed else 0)
+        return not allowed, {
+            "limit": requests,
+            "current": current,
+            "remaining": max(0, requests - current),
+            "reset_in": math.ceil(window_start + window - now),
+            "window": window,
+            "mode": "approximate"
+        }
+    
+    def sync(self):
+        """Flush local counts to Redis in one pipeline and refresh totals"""
+        now = time.time()
+        with self._lock:
+            dirty = self._carry + [
+                (key, state.window_start, state.window, state.pending)
+                for key, state in self._windows.items()
+                if state.pending
+            ]
+            self._carry = []
+            for state in self._windows.values():
+                state.pending = 0
+            self._pending_total = 0
+            self._last_sync = time.monotonic()
+            # Süresi geçmiş pencereleri at (bellek sınırlı kalsın)
+            for key in [
+                k for k, st in self._windows.items()
+                if not st.pending and st.window_start + 2 * st.window < now
+            ]:
+                del self._windows[key]
+        
+        if not dirty:
+            return
+        
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, window_start, window, pending in dirty:
+                redis_key = f"{key}:{window_start}"
+                pipe.incrby(redis_key, pending)
+                pipe.expire(redis_key, window * 2)
+            results = pipe.execute()
+        except Exception as e:
+            logger.error(f"Rate limit sync error: {e}")
+            # Sayılar kaybolmasın, bir sonraki sync'te tekrar denenir
+            with self._lock:
+                for key, window_start, _, pending in dirty:
+                    state = self._windows.get(key)
+                    if state is not None and state.window_start == window_start:
+                        state.pending += pending
+                        self._pending_total += pending
+            return
+        
+        with self._lock:
+            for i, (key, window_start, _, _) in enumerate(dirty):
+                state = self._windows.get(key)
+                if state is not None and state.window_start == window_start:
+                    state.synced = int(results[i * 2])
+
 # ========== RATE LIMITER CLASS ==========
 
 class RateLimiter:
-    """Rate limiter using Redis"""
+    """Rate limiter using Redis (server-side Lua, tek round trip)"""
     
     def __init__(self, redis_client=None):
+        self.redis = None
+        self.scripts = {}
+        self.approximate = None
+        if redis_client is not None:
+            self.bind(redis_client)
+    
+    def bind(self, redis_client):
+        """Redis client'ı bağla (script'ler + approximate mod)"""
         self.redis = redis_client
+        # register_script EVALSHA kullanır, NOSCRIPT'te otomatik yükler
+        # (pipeline'da check_many EVALSHA'yı kendisi kuyruklar)
+        self.scripts = {
+            "gcra": redis_client.register_script(GCRA_SCRIPT),
+            "sliding_window": redis_client.register_script(SLIDING_WINDOW_SCRIPT),
+            "fixed_window": redis_client.register_script(FIXED_WINDOW_SCRIPT),
+        }
+        self.approximate = ApproximateRateLimiter(redis_client)
     
     def get_identifier(self, request_obj) -> str:
         """Get unique identifier for request"""
@@ -62,16 +372,21 @@ class RateLimiter:
         # Fallback to remote address
         return request_obj.remote_addr or "unknown"
     
-    def get_rate_limit_key(self, identifier: str, endpoint: str) -> str:
+    def get_rate_limit_key(
+        self, identifier: str, endpoint: str, algorithm: str = DEFAULT_ALGORITHM
+    ) -> str:
         """Generate rate limit key for Redis"""
-        return f"rate_limit:{endpoint}:{identifier}"
+        # Algoritmalar farklı Redis tipleri kullanır (string / zset), key'ler ayrı
+        return f"rate_limit:{algorithm}:{endpoint}:{identifier}"
     
     def is_rate_limited(
         self,
         identifier: str,
         endpoint: str,
         requests: int = 100,
-        window: int = 60
+        window: int = 60,
+        algorithm: str = None,
+        mode: str = None
     ) -> Tuple[bool, dict]:
         """
         Check if identifier is rate limited
@@ -80,46 +395,137 @@ class RateLimiter:
         if not self.redis or not REDIS_AVAILABLE:
             return False, {"rate_limit_available": False}
         
+        if (mode or DEFAULT_MODE) == "approximate":
+            return self.approximate.is_rate_limited(identifier, endpoint, requests, window)
+        
+        algorithm = algorithm or DEFAULT_ALGORITHM
         try:
-            key = self.get_rate_limit_key(identifier, endpoint)
-            current = self.redis.incr(key)
-            
-            # Set expiry on first request
-            if current == 1:
-                self.redis.expire(key, window)
-            
-            # Get remaining time
-            ttl = self.redis.ttl(key)
+            key = self.get_rate_limit_key(identifier, endpoint, algorithm)
+            args = [requests, window * 1000]
+            if algorithm == "sliding_window":
+                args.append(uuid.uuid4().hex)
+            allowed, remaining, reset_ms, current = self.scripts[algorithm](
+                keys=[key], args=args
+            )
             
             metadata = {
                 "limit": requests,
                 "current": current,
-                "remaining": max(0, requests - current),
-                "reset_in": ttl,
-                "window": window
+                "remaining": remaining,
+                "reset_in": math.ceil(reset_ms / 1000),
+                "window": window,
+                "algorithm": algorithm
             }
             
-            is_limited = current > requests
-            return is_limited, metadata
+            return not allowed, metadata
             
         except Exception as e:
             logger.error(f"Rate limiting error: {e}")
             return False, {"error": str(e)}
     
+    def check_many(self, checks) -> list:
+        """
+        Evaluate several (rule, identifier) checks at once
+        Strict kurallar tek pipeline'da (tek round trip), approximate
+        kurallar lokal olarak değerlendirilir
+        Returns: [(is_limited, metadata), ...] in the same order
+        """
+        if not self.redis or not REDIS_AVAILABLE:
+            return [(False, {"rate_limit_available": False}) for _ in checks]
+        
+        results = [None] * len(checks)
+        strict = []
+        for i, (rule, identifier) in enumerate(checks):
+            if (rule.mode or DEFAULT_MODE) == "approximate":
+                results[i] = self.approximate.is_rate_limited(
+                    identifier, rule.name, rule.requests, rule.window
+                )
+            else:
+                strict.append(i)
+        
+        if strict:
+            try:
+                calls = []
+                for i in strict:
+                    rule, identifier = checks[i]
+                    algorithm = rule.algorithm or DEFAULT_ALGORITHM
+                    args = [rule.requests, rule.window * 1000]
+                    if algorithm == "sliding_window":
+                        args.append(uuid.uuid4().hex)
+                    calls.append((
+                        self.scripts[algorithm],
+                        self.get_rate_limit_key(identifier, rule.name, algorithm),
+                        args
+                    ))
+                replies = self._evalsha_many(calls)
+                for i, (allowed, remaining, reset_ms, current) in zip(strict, replies):
+                    rule = checks[i][0]
+                    results[i] = (not allowed, {
+                        "limit": rule.requests,
+                        "current": current,
+                        "remaining": remaining,
+                        "reset_in": math.ceil(reset_ms / 1000),
+                        "window": rule.window,
+                        "algorithm": rule.algorithm or DEFAULT_ALGORITHM
+                    })
+            except Exception as e:
+                logger.error(f"Rate limiting error: {e}")
+                for i in strict:
+                    results[i] = (False, {"error": str(e)})
+        
+        return results
+    
+    def _evalsha_many(self, calls) -> list:
+        """
+        EVALSHA'ları tek pipeline'da çalıştır
+        Script objesi pipeline'da çağrılırsa execute() her seferinde önce
+        SCRIPT EXISTS gönderir (iki round trip); bunun yerine EVALSHA doğrudan
+        kuyruklanır, NOSCRIPT dönen çağrılar script yüklenip bir kez tekrarlanır
+        """
+        from redis.exceptions import NoScriptError
+        
+        replies = self._queue_evalsha(calls)
+        missing = [n for n, reply in enumerate(replies) if isinstance(reply, NoScriptError)]
+        if missing:
+            # Redis restart/SCRIPT FLUSH: sadece başarısız olanları tekrar çalıştır,
+            # diğerleri zaten sayıldı
+            for script in {id(calls[n][0]): calls[n][0] for n in missing}.values():
+                self.redis.script_load(script.script)
+            for n, reply in zip(missing, self._queue_evalsha([calls[n] for n in missing])):
+                replies[n] = reply
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+    
+    def _queue_evalsha(self, calls) -> list:
+        pipe = self.redis.pipeline(transaction=False)
+        for script, key, args in calls:
+            pipe.evalsha(script.sha, 1, key, *args)
+        return pipe.execute(raise_on_error=False)
+    
     def reset_limit(self, identifier: str, endpoint: str):
         """Reset rate limit for identifier"""
         if not self.redis or not REDIS_AVAILABLE:
             return
         
         try:
-            key = self.get_rate_limit_key(identifier, endpoint)
-            self.redis.delete(key)
+            keys = [
+                self.get_rate_limit_key(identifier, endpoint, algorithm)
+                for algorithm in ALGORITHMS
+            ]
+            if self.approximate is not None:
+                window_key = self.approximate._key(identifier, endpoint)
+                keys.extend(self.redis.scan_iter(match=f"{window_key}:*"))
+                with self.approximate._lock:
+                    self.approximate._windows.pop(window_key, None)
+            self.redis.delete(*keys)
         except Exception as e:
             logger.error(f"Error resetting rate limit: {e}")
 
 # ========== GLOBAL RATE LIMITER INSTANCE ==========
 
-rate_limiter = RateLimiter(redis_client if REDIS_AVAILABLE else None)
+rate_limiter = RateLimiter()
 
 # ========== DECORATORS ==========
 
@@ -131,10 +537,21 @@ def rate_limit(endpoint: str = None, requests: int = None, window: int = None):
         @rate_limit('api.endpoint', requests=100, window=60)
         def my_endpoint():
             pass
+    
+    init_rate_limiting() kuruluysa limit, admission aşamasında diğer
+    limitlerle birlikte tek seferde kontrol edilir; decorator sadece
+    tanımı taşır. Kurulu değilse kontrolü kendisi yapar.
     """
+    if callable(endpoint):
+        # Parantezsiz kullanım: @rate_limit
+        return rate_limit()(endpoint)
+    
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if getattr(g, 'rate_limit_admitted', False):
+                return func(*args, **kwargs)
+            
             # Determine endpoint name
             ep = endpoint or f"{request.endpoint}"
             
@@ -152,8 +569,10 @@ def rate_limit(endpoint: str = None, requests: int = None, window: int = None):
             # Check rate limit
             identifier = rate_limiter.get_identifier(request)
             is_limited, metadata = rate_limiter.is_rate_limited(
-                identifier, ep, req_limit, time_window
+                identifier, ep, req_limit, time_window,
+                config.get("algorithm"), config.get("mode")
             )
+            record_rate_limit(ep, is_limited)
             
             if is_limited:
                 logger.warning(f"⚠️  Rate limit exceeded: {identifier} on {ep}")
@@ -172,6 +591,8 @@ def rate_limit(endpoint: str = None, requests: int = None, window: int = None):
             
             return func(*args, **kwargs)
         
+        # @wraps __dict__'i kopyaladığı için üstteki decorator'lardan geçer
+        wrapper._rate_limit = {"name": endpoint, "requests": requests, "window": window}
         return wrapper
     return decorator
 
@@ -180,13 +601,19 @@ def global_rate_limit():
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if getattr(g, 'rate_limit_admitted', False):
+                return func(*args, **kwargs)
+            
             identifier = rate_limiter.get_identifier(request)
             is_limited, metadata = rate_limiter.is_rate_limited(
                 identifier,
                 "global",
                 RATE_LIMITS["global"]["requests"],
-                RATE_LIMITS["global"]["window"]
+                RATE_LIMITS["global"]["window"],
+                RATE_LIMITS["global"].get("algorithm"),
+                RATE_LIMITS["global"].get("mode")
             )
+            record_rate_limit("global", is_limited)
             
             if is_limited:
                 logger.warning(f"⚠️  Global rate limit: {identifier}")
@@ -204,46 +631,144 @@ def global_rate_limit():
         return wrapper
     return decorator
 
+# ========== ADMISSION PLANS ==========
+
+AdmissionRule = namedtuple(
+    "AdmissionRule", ["name", "scope", "requests", "window", "algorithm", "mode"]
+)
+
+# update_limit/disable_limit her değişiklikte artırır; derlenmiş planlar yenilenir
+_limits_version = 0
+
+
+def _rule(name: str, scope: str, config: dict, requests: int = None, window: int = None):
+    return AdmissionRule(
+        name,
+        scope,
+        requests or config.get("requests", 100),
+        window or config.get("window", 60),
+        config.get("algorithm"),
+        config.get("mode"),
+    )
+
+
+def resolve_rules(endpoint: str, view_func=None) -> tuple:
+    """Resolve every limit that applies to a route (global, endpoint, user)"""
+    if endpoint is None or endpoint in EXEMPT_ENDPOINTS or endpoint.endswith(".health"):
+        return ()
+    
+    rules = []
+    global_config = RATE_LIMITS.get("global")
+    if global_config:
+        rules.append(_rule("global", "ip", global_config))
+    
+    declared = getattr(view_func, "_rate_limit", None) or {}
+    name = declared.get("name") or ENDPOINT_ALIASES.get(endpoint, endpoint)
+    config = RATE_LIMITS.get(name)
+    if config is None and (declared.get("requests") or declared.get("window")):
+        config = {}
+    if config is not None and name not in ("global", "user", "public"):
+        rules.append(
+            _rule(name, "ip", config, declared.get("requests"), declared.get("window"))
+        )
+    
+    user_config = RATE_LIMITS.get("user")
+    if user_config:
+        rules.append(_rule("user", "user", user_config))
+    
+    return tuple(rules)
+
+
+def compile_rate_limit_plans(app) -> dict:
+    """
+    Resolve limits for every registered route once
+    register_blueprints() sonrasında çağrılır; sonradan eklenen route'lar
+    ilk istekte derlenir
+    """
+    plans = {
+        endpoint: resolve_rules(endpoint, view_func)
+        for endpoint, view_func in app.view_functions.items()
+    }
+    app.extensions["rate_limit_plans"] = (_limits_version, plans)
+    logger.info(f"✅ Rate limit planları derlendi ({len(plans)} endpoint)")
+    return plans
+
+
+def _get_plan(app, endpoint: str) -> tuple:
+    version, plans = app.extensions.get("rate_limit_plans", (None, None))
+    if version != _limits_version:
+        plans = compile_rate_limit_plans(app)
+    plan = plans.get(endpoint)
+    if plan is None:
+        plan = plans[endpoint] = resolve_rules(endpoint, app.view_functions.get(endpoint))
+    return plan
+
+
+def _user_identifier(request_obj) -> Optional[str]:
+    """user_id from the Bearer token, None for anonymous requests"""
+    token = request_obj.headers.get('Authorization', '')
+    if not token.startswith('Bearer '):
+        return None
+    from .auth import decode_token
+    payload = decode_token(token[7:])
+    return payload.get("user_id") if payload else None
+
+
 # ========== MIDDLEWARE REGISTRATION ==========
 
 def init_rate_limiting(app):
     """Initialize rate limiting for Flask app"""
+    init_rate_limit_redis()
     
     @app.before_request
     def check_rate_limit():
-        """Check rate limit for every request"""
+        """
+        Single-pass admission: global, endpoint ve user limitleri tek
+        pipeline'da kontrol edilir; @rate_limit/@global_rate_limit tekrar saymaz
+        """
         if not REDIS_AVAILABLE:
             return
         
-        # Skip health check
-        if request.path == '/health':
+        plan = _get_plan(app, request.endpoint)
+        g.rate_limit_admitted = True
+        if not plan:
             return
         
-        identifier = rate_limiter.get_identifier(request)
-        endpoint = request.endpoint or request.path
-        
-        config = RATE_LIMITS.get(endpoint) or RATE_LIMITS.get("global")
+        ip = rate_limiter.get_identifier(request)
+        user_id = None
+        if any(rule.scope == "user" for rule in plan):
+            user_id = _user_identifier(request)
         
-        if config is None:
-            return
+        checks = []
+        for rule in plan:
+            identifier = ip if rule.scope == "ip" else user_id
+            if identifier is not None:
+                checks.append((rule, identifier))
         
-        is_limited, metadata = rate_limiter.is_rate_limited(
-            identifier,
-            endpoint,
-            config.get("requests", 100),
-            config.get("window", 60)
-        )
+        results = rate_limiter.check_many(checks)
         
-        request.rate_limit_metadata = metadata
+        # Header'lar için en kısıtlayıcı sonuç
+        metadata = None
+        for (rule, identifier), (is_limited, meta) in zip(checks, results):
+            record_rate_limit(rule.name, is_limited)
+            if is_limited:
+                logger.warning(f"⚠️  Rate limit exceeded: {identifier} on {rule.name}")
+                request.rate_limit_metadata = meta
+                return jsonify({
+                    "success": False,
+                    "error": {
+                        "code": "RATE_001",
+                        "message": "Rate limit exceeded",
+                        "retry_after": meta.get("reset_in", rule.window)
+                    }
+                }), 429
+            if "remaining" in meta and (
+                metadata is None or meta["remaining"] < metadata["remaining"]
+            ):
+                metadata = meta
         
-        if is_limited:
-            return jsonify({
-                "success": False,
-                "error": {
-                    "code": "RATE_001",
-                    "message": "Rate limit exceeded"
-                }
-            }), 429
+        if metadata is not None:
+            request.rate_limit_metadata = metadata
     
     @app.after_request
     def add_rate_limit_headers(response):
@@ -275,7 +800,9 @@ def get_rate_limit_status():
         identifier,
         endpoint,
         config.get("requests", 100),
-        config.get("window", 60)
+        config.get("window", 60),
+        config.get("algorithm"),
+        config.get("mode")
     )
     
     return {
@@ -289,14 +816,28 @@ def get_all_limits() -> dict:
     """Get all configured rate limits"""
     return RATE_LIMITS
 
-def update_limit(endpoint: str, requests: int, window: int):
+def update_limit(
+    endpoint: str, requests: int, window: int, algorithm: str = None, mode: str = None
+):
     """Update rate limit for endpoint"""
+    if algorithm is not None and algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Unknown rate limit mode: {mode}")
+    global _limits_version
     RATE_LIMITS[endpoint] = {"requests": requests, "window": window}
-    logger.info(f"Updated rate limit for {endpoint}: {requests}/{window}s")
+    _limits_version += 1
+    if algorithm:
+        RATE_LIMITS[endpoint]["algorithm"] = algorithm
+    if mode:
+        RATE_LIMITS[endpoint]["mode"] = mode
+    logger.info(f"Updated rate limit for {endpoint}: {requests}/{window}s ({algorithm or DEFAULT_ALGORITHM})")
 
 def disable_limit(endpoint: str):
     """Disable rate limit for endpoint"""
+    global _limits_version
     RATE_LIMITS[endpoint] = None
+    _limits_version += 1
     logger.info(f"Disabled rate limit for {endpoint}")
 
 def reset_all_limits():
@@ -306,11 +847,17 @@ def reset_all_limits():
         return
     
     try:
-        # Delete all rate limit keys
+        # Delete all rate limit keys (SCAN, Redis'i bloklamadan)
         pattern = "rate_limit:*"
-        keys = redis_client.keys(pattern)
-        if keys:
-            redis_client.delete(*keys)
-        logger.info(f"Reset {len(keys)} rate limit entries")
+        deleted = 0
+        batch = []
+        for key in redis_client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += redis_client.unlink(*batch)
+        logger.info(f"Reset {deleted} rate limit entries")
     except Exception as e:
         logger.error(f"Error resetting limits: {e}")
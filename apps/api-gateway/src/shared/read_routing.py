@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-preference routing
+Route/repository bazında okuma profili:
+- primary: varsayılan, güncel veri gerektiren okumalar
+- tolerant: secondaryPreferred + maxStalenessSeconds (GET trafiği)
+Kullanıcı kısa süre önce yazdıysa (upload sonrası status polling gibi)
+tolerant okumalar primary'ye döner. Gerektiğinde causal-consistency
+session ile bir akıştaki tüm işlemler sıralı görülür.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional
+
+from loguru import logger
+from pymongo import ReadPreference, monitoring
+from pymongo.read_preferences import SecondaryPreferred
+
+PRIMARY = "primary"
+TOLERANT = "tolerant"
+
+# pymongo alt sınırı 90 saniye
+MAX_STALENESS_SECONDS = max(90, int(os.getenv("MONGO_MAX_STALENESS_SECONDS", 90)))
+# Yazan kullanıcının okumaları bu süre boyunca primary'den yapılır
+READ_AFTER_WRITE_SECONDS = int(os.getenv("MONGO_READ_AFTER_WRITE_SECONDS", 10))
+# Middleware'in kimliksiz istekler için koyduğu user_id; herkes paylaştığı
+# için read-after-write kaydı tutulmaz (aynı request içindeki yazma yine sayılır)
+ANONYMOUS_USER = "anonymous"
+
+READ_PREFERENCES = {
+    PRIMARY: ReadPreference.PRIMARY,
+    TOLERANT: SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS),
+}
+
+_profile: ContextVar[Optional[str]] = ContextVar("db_read_profile", default=None)
+_session: ContextVar = ContextVar("db_session", default=None)
+
+# Redis yoksa process içi read-after-write kayıtları {user_id: expires_at}
+_local_writers: Dict[str, float] = {}
+
+routing_stats = {"tolerant_reads": 0, "read_after_write_primary": 0}
+
+
+# ============================================================================
+# PROFILES
+# ============================================================================
+
+
+@contextmanager
+def read_profile(profile: str):
+    """Bu blok içindeki okumalar verilen profil ile yapılır"""
+    if profile not in READ_PREFERENCES:
+        raise ValueError(f"Bilinmeyen read profile: {profile}")
+    token = _profile.set(profile)
+    try:
+        yield
+    finally:
+        _profile.reset(token)
+
+
+def reads_from(profile: str):
+    """Route decorator: @reads_from(TOLERANT)"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with read_profile(profile):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _request_user() -> Optional[str]:
+    try:
+        from flask import g, has_request_context
+    except ImportError:  # pragma: no cover
+        return None
+    if not has_request_context():
+        return None
+    user_id = g.get("user_id")
+    if user_id == ANONYMOUS_USER:
+        return None
+    return user_id
+
+
+def mark_write() -> None:
+    """Yazma sonrası: bu request ve kullanıcının sonraki okumaları primary"""
+    try:
+        from flask import g, has_request_context
+
+        if has_request_context():
+            g.db_wrote = True
+    except ImportError:  # pragma: no cover
+        pass
+
+    user_id = _request_user()
+    if not user_id or not READ_AFTER_WRITE_SECONDS:
+        return
+    from .cache import _get_cache_or_none
+
+    cache = _get_cache_or_none()
+    if cache is not None:
+        try:
+            cache.client.set(f"ryw:{user_id}", 1, ex=READ_AFTER_WRITE_SECONDS)
+            return
+        except Exception as e:
+            logger.debug(f"read-after-write kaydı yazılamadı: {e}")
+    _local_writers[user_id] = time.monotonic() + READ_AFTER_WRITE_SECONDS
+
+
+def _recent_writer() -> bool:
+    """Bu request'te veya son READ_AFTER_WRITE_SECONDS içinde yazdı mı?"""
+    from flask import g, has_request_context
+
+    if not has_request_context():
+        return False
+    if g.get("db_wrote"):
+        return True
+    if "db_recent_writer" in g:
+        return g.db_recent_writer
+
+    recent = False
+    user_id = _request_user()
+    if user_id:
+        from .cache import _get_cache_or_none
+
+        cache = _get_cache_or_none()
+        try:
+            if cache is not None:
+                recent = bool(cache.client.exists(f"ryw:{user_id}"))
+            else:
+                recent = _local_writers.get(user_id, 0) > time.monotonic()
+        except Exception:
+            recent = True  # emin değilsek güncel oku
+    g.db_recent_writer = recent
+    return recent
+
+
+def effective_profile() -> str:
+    """Aktif profil; read-after-write durumunda primary"""
+    profile = _profile.get() or PRIMARY
+    if profile == PRIMARY:
+        return PRIMARY
+    if _session.get() is None and _recent_writer():
+        routing_stats["read_after_write_primary"] += 1
+        return PRIMARY
+    routing_stats["tolerant_reads"] += 1
+    return profile
+
+
+# ============================================================================
+# CAUSAL SESSIONS
+# ============================================================================
+
+
+@contextmanager
+def causal_session():
+    """
+    Causal-consistency session: blok içindeki okumalar (secondary'de bile)
+    önceki yazmaları görür
+    """
+    from . import database
+
+    if _session.get() is not None:
+        yield _session.get()
+        return
+    with database.client.start_session(causal_consistency=True) as session:
+        token = _session.set(session)
+        try:
+            yield session
+        finally:
+            _session.reset(token)
+
+
+def current_session():
+    return _session.get()
+
+
+# ============================================================================
+# SERVER USAGE METRICS
+# ============================================================================
+
+READ_COMMANDS = {"find", "aggregate", "count", "distinct", "getMore"}
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify", "createIndexes"}
+
+
+class ServerUsageListener(monitoring.CommandListener):
+    """Hangi node'un hangi okumaları/yazmaları sunduğunu say"""
+
+    def __init__(self):
+        self._pending: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self.servers = defaultdict(
+            lambda: {"reads": 0, "writes": 0, "collections": defaultdict(int)}
+        )
+
+    def started(self, event):
+        name = event.command_name
+        if name in READ_COMMANDS or name in WRITE_COMMANDS:
+            collection = event.command.get(name)
+            if name == "getMore":
+                collection = event.command.get("collection")
+            self._pending[event.request_id] = (name, collection)
+
+    def succeeded(self, event):
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        name, collection = pending
+        host = "%s:%s" % event.connection_id
+        with self._lock:
+            server = self.servers[host]
+            if name in READ_COMMANDS:
+                server["reads"] += 1
+                if isinstance(collection, str):
+                    server["collections"][collection] += 1
+            else:
+                server["writes"] += 1
+
+    def failed(self, event):
+        self._pending.pop(event.request_id, None)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                host: {
+                    "reads": s["reads"],
+                    "writes": s["writes"],
+                    "reads_by_collection": dict(s["collections"]),
+                }
+                for host, s in self.servers.items()
+            }
+
+
+server_usage = ServerUsageListener()
+
+
+def get_routing_stats() -> Dict:
+    return {
+        "max_staleness_seconds": MAX_STALENESS_SECONDS,
+        **routing_stats,
+        "servers": server_usage.snapshot(),
+    }
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming list responses
+Sınırsız liste endpoint'leri için opt-in streaming: Mongo cursor'ı sınırlı
+batch'lerle dolaşılır, dokümanlar geldikçe encode edilip yazılır. Bellek
+sonuç boyutundan bağımsız kalır, ilk byte ilk batch ile gider.
+
+    Accept: application/x-ndjson  -> satır başına bir doküman
+    ?stream=ndjson                -> aynı (header gönderemeyen istemciler)
+    ?stream=json                  -> chunked JSON ({...,"key":[...]})
+
+Accept'te */* veya application/* gibi wildcard'lar streaming seçtirmez;
+NDJSON ancak açıkça ve application/json'dan yüksek q ile istenirse döner.
+"""
+
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from flask import Response, request, stream_with_context
+from loguru import logger
+
+from .json_provider import dumps
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+# Küçük write'ları birleştir; ilk doküman beklemeden gönderilir
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", 64 * 1024))
+
+
+def stream_mode() -> Optional[str]:
+    """İstek streaming istiyor mu: "ndjson" | "json" | None"""
+    stream = request.args.get("stream")
+    if stream in ("json", "ndjson"):
+        return stream
+    # Sadece açıkça listelenen tipler (wildcard eşleşmesi yok)
+    explicit = {value.lower(): quality for value, quality in request.accept_mimetypes}
+    ndjson_q = explicit.get(NDJSON_MIMETYPE, 0)
+    if ndjson_q > 0 and ndjson_q > explicit.get("application/json", 0):
+        return "ndjson"
+    return None
+
+
+def _chunked(parts: Iterable[bytes]) -> Iterator[bytes]:
+    """Parçaları STREAM_CHUNK_BYTES'a kadar birleştir (ilk parça hemen gider)"""
+    buffer, size, first = [], 0, True
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if first or size >= STREAM_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size, first = [], 0, False
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _ndjson_parts(documents: Iterable[Dict]) -> Iterator[bytes]:
+    for document in documents:
+        yield dumps(document) + b"\n"
+
+
+def _json_array_parts(documents: Iterable[Dict], key: str, envelope: Dict) -> Iterator[bytes]:
+    head = dumps({**{k: v for k, v in envelope.items() if k != key}, key: []})
+    # {...,"key":[]} -> {...,"key":[  ... ]} (key en sonda)
+    yield head[:-2]
+    separator = b""
+    for document in documents:
+        yield separator + dumps(document)
+        separator = b","
+    yield b"]}"
+
+
+def stream_documents(
+    documents: Iterable[Dict],
+    mode: str,
+    key: str = "data",
+    envelope: Optional[Dict[str, Any]] = None,
+    on_close: Optional[Callable[[], None]] = None,
+) -> Response:
+    """
+    Cursor/iterable -> streaming Response
+    Hata stream başladıktan sonra olursa status değiştirilemez: NDJSON'da
+    son satır {"error": ...} olur, JSON array'de gövde yarım kalır.
+
+    Cursor ve on_close response kapanınca çalışır (call_on_close): generator
+    hiç başlatılmasa da (HEAD, erken kopan istemci) kaynaklar bırakılır.
+    """
+    if hasattr(documents, "batch_size"):
+        documents = documents.batch_size(STREAM_BATCH_SIZE)
+
+    def generate():
+        try:
+            if mode == "ndjson":
+                parts = _ndjson_parts(documents)
+            else:
+                parts = _json_array_parts(documents, key, envelope or {"success": True})
+            yield from _chunked(parts)
+        except Exception as e:
+            logger.error(f"❌ Stream hatası ({request.path}): {e}")
+            if mode == "ndjson":
+                yield dumps({"error": "stream_failed"}) + b"\n"
+
+    def close():
+        try:
+            if hasattr(documents, "close"):
+                documents.close()
+        finally:
+            if on_close is not None:
+                on_close()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE if mode == "ndjson" else "application/json",
+    )
+    response.call_on_close(close)
+    # Proxy buffering kapalı: TTFB sonuç boyutuna bağlı kalmasın
+    response.headers["X-Accel-Buffering"] = "no"
+    response.headers["Cache-Control"] = "no-store"
+    return response
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Request tracing
+OpenTelemetry uyumlu hafif tracer: W3C traceparent propagation, OTLP/JSON
+export (dosya veya OTLP/HTTP collector). HTTP istekleri, pymongo komutları
+(CommandListener), Redis çağrıları ve Celery publish/execute span üretir;
+trace context Celery task header'larıyla worker'a taşınır.
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from loguru import logger
+from pymongo import monitoring
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+# Root span örnekleme oranı; child span'ler parent kararını izler
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.1))
+# none | file | otlp (none: traceparent yayılır, span export edilmez)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+# file exporter: bu boyutu aşınca TRACE_FILE.1'e döndürülür (tek yedek)
+TRACE_FILE_MAX_MB = int(os.getenv("TRACE_FILE_MAX_MB", 100))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "api-gateway")
+# Export kuyruğu sınırlı: dolarsa span düşürülür, istek yolu bloklanmaz
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", 10000))
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", 512))
+TRACE_EXPORT_INTERVAL_MS = int(os.getenv("TRACE_EXPORT_INTERVAL_MS", 2000))
+# Aktif span yokken (arka plan thread'leri) Mongo/Redis span'i açılsın mı
+TRACE_ORPHAN_SPANS = os.getenv("TRACE_ORPHAN_SPANS", "false").lower() == "true"
+
+# OTLP SpanKind
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+KIND_PRODUCER = 4
+KIND_CONSUMER = 5
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACEPARENT = "traceparent"
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Tek span (sampled=False ise sadece id taşır, kaydedilmez)"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    def __init__(self, name, kind, trace_id, parent_id, sampled, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {}) if sampled else {}
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def set_error(self, error) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:500]
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _processor.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status:
+            span["status"] = {"code": self.status, "message": self.status_message}
+        return span
+
+
+def _otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _should_sample(trace_id: str) -> bool:
+    """trace_id'ye göre deterministik oran örnekleme (tüm servislerde aynı karar)"""
+    return int(trace_id[16:], 16) < TRACE_SAMPLE_RATE * (1 << 64)
+
+
+def parse_traceparent(value: Optional[str]):
+    """traceparent -> (trace_id, parent_span_id, sampled) veya None"""
+    if not value:
+        return None
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) < 2:
+        return None
+    try:
+        trace_id, parent_id = int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    # Tamamı sıfır id'ler geçersiz (W3C)
+    if not trace_id or not parent_id:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    attributes: Optional[Dict] = None,
+    traceparent: Optional[str] = None,
+) -> Span:
+    """Span başlat (parent: traceparent veya aktif span); bitirmek çağırana ait"""
+    remote = parse_traceparent(traceparent)
+    parent = _current.get()
+    if remote:
+        trace_id, parent_id, sampled = remote
+    elif parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        trace_id = "%032x" % random.getrandbits(128)
+        parent_id, sampled = None, TRACE_ENABLED and _should_sample(trace_id)
+    return Span(name, kind, trace_id, parent_id, sampled and TRACE_ENABLED, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Iterator[Span]:
+    """Aktif span olarak çalıştır"""
+    current = start_span(name, kind, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def activate(current: Optional[Span]):
+    """Span'i aktif yap, reset için token döndür"""
+    return _current.set(current)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+def inject(carrier: Dict) -> Dict:
+    """Aktif trace context'i carrier'a (header dict) yaz"""
+    current = _current.get()
+    if current is not None:
+        carrier[TRACEPARENT] = current.traceparent
+    return carrier
+
+
+# ========== EXPORT ==========
+
+
+class BatchSpanProcessor:
+    """Sınırlı kuyruk + process başına export thread'i (fork-safe)"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._pid = None
+        self.stats = {"exported": 0, "dropped": 0, "export_errors": 0}
+
+    def submit(self, finished: Span) -> None:
+        if TRACE_EXPORTER == "none":
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _ensure_thread(self) -> None:
+        if TRACE_EXPORTER == "none" or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+            threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _drain(self, timeout: float):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=timeout))
+            while len(batch) < TRACE_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        interval = TRACE_EXPORT_INTERVAL_MS / 1000
+        while True:
+            batch = self._drain(interval)
+            if not batch:
+                continue
+            try:
+                export(batch)
+                self.stats["exported"] += len(batch)
+            except Exception as e:
+                self.stats["export_errors"] += 1
+                logger.warning(f"⚠️ Trace export hatası: {e}")
+
+
+def _otlp_payload(spans) -> Dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        _otlp_attribute("service.name", TRACE_SERVICE_NAME),
+                        _otlp_attribute("process.pid", os.getpid()),
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "ultrarslanoglu.tracing"},
+                        "spans": [s.to_otlp() for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def export(spans) -> None:
+    """OTLP/JSON: dosyaya satır olarak veya OTLP/HTTP collector'a"""
+    payload = json.dumps(_otlp_payload(spans), separators=(",", ":"))
+    if TRACE_EXPORTER == "otlp":
+        req = urllib.request.Request(
+            TRACE_OTLP_ENDPOINT,
+            data=payload.encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(req, timeout=5).close()
+    elif TRACE_EXPORTER == "file":
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        _rotate_trace_file()
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+
+def _rotate_trace_file() -> None:
+    """Dosya TRACE_FILE_MAX_MB'ı aştıysa .1'e taşı (diskte en fazla 2 dosya)"""
+    try:
+        if os.path.getsize(TRACE_FILE) < TRACE_FILE_MAX_MB * 1024 * 1024:
+            return
+        os.replace(TRACE_FILE, f"{TRACE_FILE}.1")
+    except FileNotFoundError:
+        pass  # henüz yok veya başka worker döndürdü
+
+
+_processor = BatchSpanProcessor()
+
+
+def get_tracing_stats() -> Dict:
+    return {
+        "enabled": TRACE_ENABLED,
+        "sample_rate": TRACE_SAMPLE_RATE,
+        "exporter": TRACE_EXPORTER,
+        **_processor.stats,
+    }
+
+
+# ========== FLASK ==========
+
+
+def init_tracing(app):
+    """Her HTTP isteği için SERVER span (gelen traceparent'ı devam ettirir)"""
+    from flask import g, request
+
+    if not TRACE_ENABLED:
+        return
+
+    instrument_redis()
+    instrument_celery()
+
+    @app.before_request
+    def _start_request_span():
+        server_span = start_span(
+            f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+            KIND_SERVER,
+            {"http.method": request.method, "http.target": request.path},
+            traceparent=request.headers.get(TRACEPARENT),
+        )
+        g.trace_span = server_span
+        g.trace_token = activate(server_span)
+
+    @app.after_request
+    def _annotate_response(response):
+        server_span = getattr(g, "trace_span", None)
+        if server_span is not None:
+            server_span.set_attribute("http.status_code", response.status_code)
+            server_span.set_attribute("http.route", str(request.url_rule or ""))
+            if getattr(g, "request_id", None):
+                server_span.set_attribute("request.id", g.request_id)
+            if response.status_code >= 500:
+                server_span.status = STATUS_ERROR
+            response.headers[TRACEPARENT] = server_span.traceparent
+        return response
+
+    @app.teardown_request
+    def _end_request_span(error=None):
+        server_span = g.pop("trace_span", None)
+        if server_span is None:
+            return
+        if error is not None:
+            server_span.set_error(error)
+        deactivate(g.pop("trace_token"))
+        server_span.end()
+
+    logger.info(
+        f"✅ Tracing: {TRACE_EXPORTER} exporter, sample rate {TRACE_SAMPLE_RATE}"
+    )
+
+
+# ========== MONGO ==========
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """pymongo komutları için CLIENT span (aktif span'in child'ı)"""
+
+    def __init__(self):
+        self._spans: Dict[int, Span] = {}
+
+    def started(self, event):
+        if _current.get() is None and not TRACE_ORPHAN_SPANS:
+            return
+        name = event.command_name
+        collection = event.command.get(name)
+        self._spans[event.request_id] = start_span(
+            f"mongo {name}",
+            KIND_CLIENT,
+            {
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": name,
+                "db.mongodb.collection": collection if isinstance(collection, str) else "",
+                "net.peer.name": "%s:%s" % event.connection_id,
+            },
+        )
+
+    def succeeded(self, event):
+        command_span = self._spans.pop(event.request_id, None)
+        if command_span is not None:
+            command_span.end()
+
+    def failed(self, event):
+        command_span = self._spans.pop(event.request_id, None)
+        if command_span is not None:
+            command_span.set_error(event.failure)
+            command_span.end()
+
+
+command_tracer = TracingCommandListener()
+
+
+# ========== REDIS ==========
+
+_redis_instrumented = False
+
+
+def instrument_redis() -> None:
+    """redis-py Redis.execute_command ve Pipeline.execute'u span ile sar"""
+    global _redis_instrumented
+    if _redis_instrumented or not TRACE_ENABLED:
+        return
+    import redis
+    from redis.client import Pipeline
+
+    original_execute_command = redis.Redis.execute_command
+    original_pipeline_execute = Pipeline.execute
+
+    def execute_command(self, *args, **options):
+        if _current.get() is None and not TRACE_ORPHAN_SPANS:
+            return original_execute_command(self, *args, **options)
+        command = str(args[0]) if args else ""
+        with span(f"redis {command}", KIND_CLIENT, **{"db.system": "redis", "db.operation": command}):
+            return original_execute_command(self, *args, **options)
+
+    def pipeline_execute(self, *args, **kwargs):
+        if _current.get() is None and not TRACE_ORPHAN_SPANS:
+            return original_pipeline_execute(self, *args, **kwargs)
+        attributes = {"db.system": "redis", "db.operation": "PIPELINE", "db.redis.commands": len(self.command_stack)}
+        with span("redis PIPELINE", KIND_CLIENT, **attributes):
+            return original_pipeline_execute(self, *args, **kwargs)
+
+    redis.Redis.execute_command = execute_command
+    Pipeline.execute = pipeline_execute
+    _redis_instrumented = True
+
+
+# ========== CELERY ==========
+
+_celery_instrumented = False
+_task_spans: Dict[str, tuple] = {}
+_publish_spans: Dict[str, Span] = {}
+
+
+def instrument_celery() -> None:
+    """Publish: PRODUCER span + traceparent header; worker: CONSUMER span"""
+    global _celery_instrumented
+    if _celery_instrumented or not TRACE_ENABLED:
+        return
+    from celery import signals
+
+    @signals.before_task_publish.connect(weak=False)
+    def _before_publish(sender=None, headers=None, **kwargs):
+        if headers is None or _current.get() is None:
+            return
+        publish_span = start_span(f"celery publish {sender}", KIND_PRODUCER, {"celery.task": sender})
+        headers[TRACEPARENT] = publish_span.traceparent
+        request_id = _request_id()
+        if request_id:
+            headers["request_id"] = request_id
+        _publish_spans[headers.get("id", "")] = publish_span
+
+    @signals.after_task_publish.connect(weak=False)
+    def _after_publish(sender=None, headers=None, **kwargs):
+        publish_span = _publish_spans.pop((headers or {}).get("id", ""), None)
+        if publish_span is not None:
+            publish_span.end()
+
+    @signals.task_prerun.connect(weak=False)
+    def _task_prerun(task_id=None, task=None, **kwargs):
+        request = getattr(task, "request", None)
+        consumer_span = start_span(
+            f"celery run {task.name}",
+            KIND_CONSUMER,
+            {"celery.task": task.name, "celery.task_id": task_id},
+            traceparent=getattr(request, TRACEPARENT, None),
+        )
+        request_id = getattr(request, "request_id", None)
+        if request_id:
+            consumer_span.set_attribute("request.id", request_id)
+        _task_spans[task_id] = (consumer_span, activate(consumer_span))
+
+    @signals.task_failure.connect(weak=False)
+    def _task_failure(task_id=None, exception=None, **kwargs):
+        entry = _task_spans.get(task_id)
+        if entry is not None:
+            entry[0].set_error(exception)
+
+    @signals.task_postrun.connect(weak=False)
+    def _task_postrun(task_id=None, state=None, **kwargs):
+        entry = _task_spans.pop(task_id, None)
+        if entry is None:
+            return
+        consumer_span, token = entry
+        consumer_span.set_attribute("celery.state", str(state))
+        deactivate(token)
+        consumer_span.end()
+
+    _celery_instrumented = True
+
+
+def _request_id() -> Optional[str]:
+    try:
+        from flask import g, has_request_context
+
+        if has_request_context():
+            return getattr(g, "request_id", None)
+    except ImportError:
+        pass
+    return None
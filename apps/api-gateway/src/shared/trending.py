@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trending engine
+Her event, pencere başına Redis sorted set'lere (global, kategori, platform)
+zamanla azalan (exponential decay) bir skor ekler. Forward decay: artış
+weight * 2^((now - epoch) / half_life) olarak yazılır, böylece eski skorlar
+hiç güncellenmeden göreli olarak küçülür. Periyodik compaction epoch'u
+ileri alıp skorları yeniden ölçekler (overflow yok) ve küçük skorları atar.
+
+Okuma: ZREVRANGE + toplu metadata (cache MGET, eksikler için tek $in sorgusu)
+"""
+
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .database import MongoDBConnection
+
+TRENDING_PREFIX = "trending:z"
+EPOCHS_KEY = "trending:epochs"
+
+# pencere -> half-life (saniye); TRENDING_HALF_LIVES="hour=3600,day=86400"
+DEFAULT_HALF_LIVES = "hour=3600,day=86400,week=604800"
+DEFAULT_WINDOW = "day"
+
+EVENT_WEIGHTS = {
+    "view": 1.0,
+    "like": 3.0,
+    "comment": 4.0,
+    "share": 5.0,
+}
+# watch_time: dakika başına skor
+WATCH_TIME_WEIGHT_PER_MINUTE = 0.5
+
+# Compaction: bu skorun altındakiler atılır, set başına en fazla N üye
+MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", 0.01))
+MAX_MEMBERS = int(os.getenv("TRENDING_MAX_MEMBERS", 10000))
+
+VIDEO_META_PROJECTION = {"title": 1, "category": 1, "platform": 1, "user_id": 1, "created_at": 1}
+
+# Compaction hiç çalışmasa da çarpan bu üssü aşarsa set yerinde yeniden ölçeklenir
+# (2^64 * ağırlık float için güvenli; sınırsız büyüme ~1024 half-life'ta inf olur)
+MAX_DECAY_EXPONENT = 64
+
+# KEYS: epochs hash, zset'ler | ARGV: now, half_life, member, weight, max_exponent
+# Epoch'u Redis içinde okur, compaction ile yarış olmaz
+INCREMENT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+local max_exponent = tonumber(ARGV[5])
+for i = 2, #KEYS do
+    local epoch = tonumber(redis.call('HGET', KEYS[1], KEYS[i]))
+    if not epoch then
+        epoch = now
+        redis.call('HSET', KEYS[1], KEYS[i], now)
+    end
+    local exponent = (now - epoch) / half_life
+    if exponent > max_exponent then
+        redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', math.pow(2, -exponent))
+        redis.call('HSET', KEYS[1], KEYS[i], now)
+        exponent = 0
+    end
+    local score = tonumber(ARGV[4]) * math.pow(2, exponent)
+    redis.call('ZINCRBY', KEYS[i], score, ARGV[3])
+end
+return #KEYS - 1
+"""
+
+# KEYS: epochs hash, zset | ARGV: now, half_life, min_score, max_members
+COMPACT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local epoch = tonumber(redis.call('HGET', KEYS[1], KEYS[2]))
+if not epoch then
+    return 0
+end
+local factor = math.pow(2, -(now - epoch) / tonumber(ARGV[2]))
+redis.call('ZUNIONSTORE', KEYS[2], 1, KEYS[2], 'WEIGHTS', factor)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[3])
+local size = redis.call('ZCARD', KEYS[2])
+local max_members = tonumber(ARGV[4])
+if size > max_members then
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, size - max_members - 1)
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('HSET', KEYS[1], KEYS[2], now)
+else
+    redis.call('HDEL', KEYS[1], KEYS[2])
+end
+return redis.call('ZCARD', KEYS[2])
+"""
+
+
+def _parse_half_lives(raw: str) -> Dict[str, float]:
+    half_lives = {}
+    for part in raw.split(","):
+        name, _, seconds = part.strip().partition("=")
+        if name and seconds:
+            half_lives[name] = float(seconds)
+    return half_lives
+
+
+HALF_LIVES = _parse_half_lives(os.getenv("TRENDING_HALF_LIVES", DEFAULT_HALF_LIVES))
+
+
+def trending_key(window: str, scope: str = "global", value: Optional[str] = None) -> str:
+    """trending:z:{window}:global | :category:{x} | :platform:{x}"""
+    if scope == "global":
+        return f"{TRENDING_PREFIX}:{window}:global"
+    return f"{TRENDING_PREFIX}:{window}:{scope}:{value}"
+
+
+def event_weight(event: Dict) -> float:
+    if event.get("event_type") == "watch_time":
+        try:
+            return float(event.get("value") or 0) / 60.0 * WATCH_TIME_WEIGHT_PER_MINUTE
+        except (TypeError, ValueError):
+            return 0.0
+    return EVENT_WEIGHTS.get(event.get("event_type"), 0.0)
+
+
+class TrendingEngine:
+    """Decayed skorlu trending sorted set'leri"""
+
+    def __init__(self, redis_client, half_lives: Optional[Dict[str, float]] = None):
+        self.redis = redis_client
+        self.half_lives = half_lives or HALF_LIVES
+        self._increment = redis_client.register_script(INCREMENT_SCRIPT)
+        self._compact = redis_client.register_script(COMPACT_SCRIPT)
+
+    def _keys_for(self, window: str, meta: Dict) -> List[str]:
+        keys = [trending_key(window)]
+        if meta.get("category"):
+            keys.append(trending_key(window, "category", meta["category"]))
+        if meta.get("platform"):
+            keys.append(trending_key(window, "platform", meta["platform"]))
+        return keys
+
+    def record(self, weights: Dict[str, float], metadata: Dict[str, Dict]) -> int:
+        """
+        Video başına toplam ağırlıkları tüm pencerelere uygula
+        (tek pipeline, video x pencere başına bir EVALSHA)
+        """
+        if not weights:
+            return 0
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        for video_id, weight in weights.items():
+            meta = metadata.get(video_id, {})
+            for window, half_life in self.half_lives.items():
+                self._increment(
+                    keys=[EPOCHS_KEY] + self._keys_for(window, meta),
+                    args=[now, half_life, video_id, weight, MAX_DECAY_EXPONENT],
+                    client=pipe,
+                )
+        pipe.execute()
+        return len(weights)
+
+    def top(
+        self,
+        window: str = DEFAULT_WINDOW,
+        scope: str = "global",
+        value: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict]:
+        """En yüksek skorlu videolar, skorlar bugüne indirgenmiş halde"""
+        if window not in self.half_lives:
+            raise ValueError(f"Geçersiz trending penceresi: {window}")
+        key = trending_key(window, scope, value)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrevrange(key, 0, limit - 1, withscores=True)
+        pipe.hget(EPOCHS_KEY, key)
+        members, epoch = pipe.execute()
+        if not members:
+            return []
+        decay = 2 ** (-(time.time() - float(epoch or time.time())) / self.half_lives[window])
+        return [
+            {"video_id": member, "score": round(score * decay, 4)}
+            for member, score in members
+        ]
+
+    def compact(self) -> Dict[str, int]:
+        """Tüm trending set'lerini yeniden ölçekle ve buda"""
+        now = time.time()
+        sizes = {}
+        for window, half_life in self.half_lives.items():
+            pattern = f"{TRENDING_PREFIX}:{window}:*"
+            for key in self.redis.scan_iter(match=pattern, count=500):
+                sizes[key] = self._compact(
+                    keys=[EPOCHS_KEY, key], args=[now, half_life, MIN_SCORE, MAX_MEMBERS]
+                )
+        return sizes
+
+
+def _video_metadata(video_ids: Iterable[str], cache=None) -> Dict[str, Dict]:
+    """Cache MGET + eksikler için tek $in sorgusu"""
+    video_ids = list(dict.fromkeys(video_ids))
+    metadata: Dict[str, Dict] = {}
+    if cache is not None:
+        cached = cache.get_many(f"video:meta:{vid}" for vid in video_ids)
+        for vid in video_ids:
+            value = cached.get(f"video:meta:{vid}")
+            if value is not None:
+                metadata[vid] = value
+
+    missing = [vid for vid in video_ids if vid not in metadata]
+    if missing:
+        rows = MongoDBConnection().find(
+            "videos", {"_id": {"$in": missing}}, projection=VIDEO_META_PROJECTION
+        )
+        for row in rows:
+            vid = row.pop("_id")
+            metadata[vid] = row
+            if cache is not None:
+                cache.set_video_metadata(vid, row)
+    return metadata
+
+
+_engine: Optional[TrendingEngine] = None
+
+
+def get_trending_engine() -> Optional[TrendingEngine]:
+    """Cache'in Redis bağlantısı üzerinde paylaşılan engine (Redis yoksa None)"""
+    global _engine
+    if _engine is None:
+        from .cache import _get_cache_or_none
+
+        cache = _get_cache_or_none()
+        if cache is not None:
+            _engine = TrendingEngine(cache.client)
+    return _engine
+
+
+def record_events(events: Iterable[Dict]) -> int:
+    """Flush edilen event batch'ini trending skorlarına uygula"""
+    engine = get_trending_engine()
+    if engine is None:
+        return 0
+    weights: Dict[str, float] = defaultdict(float)
+    for event in events:
+        weight = event_weight(event)
+        if weight and event.get("video_id"):
+            weights[event["video_id"]] += weight
+    if not weights:
+        return 0
+
+    from .cache import _get_cache_or_none
+
+    metadata = _video_metadata(weights, _get_cache_or_none())
+    return engine.record(weights, metadata)
+
+
+def get_trending(
+    window: str = DEFAULT_WINDOW,
+    category: Optional[str] = None,
+    platform: Optional[str] = None,
+    limit: int = 10,
+) -> List[Dict]:
+    """Trending listesi + video metadata"""
+    engine = get_trending_engine()
+    if engine is None:
+        return []
+    if category:
+        scope, value = "category", category
+    elif platform:
+        scope, value = "platform", platform
+    else:
+        scope, value = "global", None
+
+    ranked = engine.top(window, scope, value, limit)
+    from .cache import _get_cache_or_none
+
+    metadata = _video_metadata((r["video_id"] for r in ranked), _get_cache_or_none())
+    return [
+        {**metadata.get(r["video_id"], {}), "id": r["video_id"], "score": r["score"]}
+        for r in ranked
+        if r["video_id"] in metadata  # silinmiş videolar atlanır
+    ]
+
+
+def compact_trending() -> Dict[str, int]:
+    engine = get_trending_engine()
+    if engine is None:
+        return {}
+    sizes = engine.compact()
+    logger.info(f"✅ Trending compaction: {len(sizes)} set")
+    return sizes
@@ -0,0 +1,1149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit Tests
+Shared katman ve route'ların Mongo/Redis gerektirmeyen testleri
+"""
+
+import asyncio
+import gc
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask import Flask
+
+
+class TrendingRouteTests(unittest.TestCase):
+    """/api/analytics/trending (trending motoru mock'lanır)"""
+
+    MODULES = ("src.modules.analytics", "src.modules.analytics_extended")
+
+    def _client(self, module):
+        app = Flask(__name__)
+        app.register_blueprint(module.analytics_bp)
+        app.testing = True
+        return app.test_client()
+
+    def test_trending_calls_engine(self):
+        """View motoru çağırır, kendini değil"""
+        import importlib
+
+        for name in self.MODULES:
+            module = importlib.import_module(name)
+            items = [{"video_id": "v1", "score": 3.5}]
+            with mock.patch.object(module, "trending_top", return_value=items) as top:
+                response = self._client(module).get(
+                    "/api/analytics/trending?window=day&limit=5&category=mac"
+                )
+            self.assertEqual(response.status_code, 200, name)
+            data = json.loads(response.data)["data"]
+            self.assertEqual(data["trending"], items)
+            self.assertEqual(data["count"], 1)
+            top.assert_called_once_with("day", category="mac", platform=None, limit=5)
+
+    def test_trending_invalid_window(self):
+        """Geçersiz window 400 döner"""
+        import importlib
+
+        module = importlib.import_module(self.MODULES[0])
+        with mock.patch.object(module, "trending_top") as top:
+            response = self._client(module).get("/api/analytics/trending?window=year")
+        self.assertEqual(response.status_code, 400)
+        top.assert_not_called()
+
+
+class PaginationCursorTests(unittest.TestCase):
+    """Keyset cursor encode/decode ve filtre"""
+
+    SORT = [("created_at", -1), ("_id", -1)]
+
+    def test_round_trip_keeps_types(self):
+        from datetime import datetime
+
+        from bson import ObjectId
+
+        from src.shared.pagination import decode_cursor, encode_cursor
+
+        values = [datetime(2024, 5, 1, 12, 30), ObjectId()]
+        self.assertEqual(decode_cursor(encode_cursor(values), 2), values)
+
+    def test_rejects_operator_values(self):
+        from src.shared.error_handler import ValidationError
+        from src.shared.pagination import decode_cursor, encode_cursor
+
+        for values in ([{"$ne": None}, "x"], [["a"], "x"]):
+            with self.assertRaises(ValidationError):
+                decode_cursor(encode_cursor(values), 2)
+
+    def test_rejects_malformed_tokens(self):
+        import base64
+
+        from src.shared.error_handler import ValidationError
+        from src.shared.pagination import decode_cursor, encode_cursor
+
+        bad_oid = base64.urlsafe_b64encode(b'[{"$oid": "nope"}, 1]').decode().rstrip("=")
+        for token in ("***", encode_cursor([1]), bad_oid):
+            with self.assertRaises(ValidationError):
+                decode_cursor(token, 2)
+
+    def test_after_filter(self):
+        from src.shared.pagination import _after
+
+        self.assertEqual(
+            _after(self.SORT, ["t", "id"]),
+            {"$or": [{"created_at": {"$lt": "t"}}, {"created_at": "t", "_id": {"$lt": "id"}}]},
+        )
+        self.assertEqual(_after([("n", 1)], [5]), {"$or": [{"n": {"$gt": 5}}]})
+
+
+class _FakeCollection:
+    """list_indexes/create_indexes/find_one/update_one taklidi"""
+
+    def __init__(self, indexes=None, error=None):
+        self.indexes = indexes or [{"name": "_id_", "key": {"_id": 1}}]
+        self.error = error
+        self.docs = {}
+
+    def list_indexes(self):
+        return list(self.indexes)
+
+    def create_indexes(self, models):
+        if self.error:
+            raise self.error
+        return [model.document["name"] for model in models]
+
+    def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {})
+        doc.update(update.get("$set", {}))
+
+    def delete_one(self, query):
+        pass
+
+
+class _FakeDB(dict):
+    def __missing__(self, name):
+        return self.setdefault(name, _FakeCollection())
+
+
+class IndexManagerTests(unittest.TestCase):
+    """Manifest hash, list_indexes farkı ve hata durumu"""
+
+    def test_manifest_hash_is_order_independent(self):
+        from src.shared.index_manager import idx, manifest_hash
+
+        a = {"videos": [idx("user_id"), idx([("created_at", -1)], sparse=True)]}
+        b = {"videos": [idx([("created_at", -1)], sparse=True), idx("user_id")]}
+        self.assertEqual(manifest_hash(a), manifest_hash(b))
+        c = {"videos": [idx("user_id"), idx([("created_at", -1)])]}
+        self.assertNotEqual(manifest_hash(a), manifest_hash(c))
+
+    def test_diff_indexes(self):
+        from src.shared.index_manager import diff_indexes, idx
+
+        db = _FakeDB(
+            videos=_FakeCollection(
+                [
+                    {"name": "_id_", "key": {"_id": 1}},
+                    {"name": "user_id_1", "key": {"user_id": 1}, "unique": True},
+                    {"name": "old_1", "key": {"old": 1}},
+                ]
+            )
+        )
+        manifest = {"videos": [idx("user_id"), idx([("created_at", -1)])]}
+        diff = diff_indexes(db, manifest)
+        self.assertEqual(diff["missing"], {"videos": [idx([("created_at", -1)])]})
+        self.assertEqual(len(diff["conflicts"]), 1)
+        self.assertIn("user_id_1", diff["conflicts"][0])
+        self.assertEqual(diff["unmanaged"], ["videos.old_1"])
+
+    def test_failed_build_does_not_store_hash(self):
+        from pymongo.errors import OperationFailure
+
+        from src.shared.index_manager import META_COLLECTION, ensure_indexes, idx
+
+        manifest = {"videos": [idx("user_id")]}
+        db = _FakeDB(videos=_FakeCollection(error=OperationFailure("disk full")))
+        report = ensure_indexes(db, manifest, name="test", mode="auto")
+        self.assertEqual(report["status"], "failed")
+        self.assertEqual(report["created"], [])
+        meta = db[META_COLLECTION].docs["test"]
+        self.assertEqual(meta["status"], "failed")
+        self.assertNotIn("hash", meta)
+
+        db["videos"].error = None
+        report = ensure_indexes(db, manifest, name="test", mode="auto")
+        self.assertEqual(report["status"], "applied")
+        self.assertEqual(db[META_COLLECTION].docs["test"]["hash"], report["hash"])
+
+    def test_conflict_does_not_store_hash(self):
+        from src.shared.index_manager import META_COLLECTION, ensure_indexes, idx
+
+        manifest = {"videos": [idx("user_id")]}
+        db = _FakeDB(
+            videos=_FakeCollection(
+                [
+                    {"name": "_id_", "key": {"_id": 1}},
+                    {"name": "user_id_1", "key": {"user_id": 1}, "unique": True},
+                ]
+            )
+        )
+        for _ in range(2):
+            report = ensure_indexes(db, manifest, name="test", mode="auto")
+            self.assertEqual(report["status"], "conflict")
+            self.assertEqual(len(report["conflicts"]), 1)
+        meta = db[META_COLLECTION].docs["test"]
+        self.assertEqual(meta["status"], "conflict")
+        self.assertNotIn("hash", meta)
+
+
+class TracingTests(unittest.TestCase):
+    """traceparent parse ve deterministik örnekleme"""
+
+    TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+    PARENT_ID = "00f067aa0ba902b7"
+
+    def test_parse_traceparent(self):
+        from src.shared.tracing import parse_traceparent
+
+        header = f"00-{self.TRACE_ID}-{self.PARENT_ID}-01"
+        self.assertEqual(parse_traceparent(header), (self.TRACE_ID, self.PARENT_ID, True))
+        self.assertEqual(
+            parse_traceparent(f"00-{self.TRACE_ID.upper()}-{self.PARENT_ID}-00"),
+            (self.TRACE_ID, self.PARENT_ID, False),
+        )
+
+    def test_parse_traceparent_rejects_invalid(self):
+        from src.shared.tracing import parse_traceparent
+
+        for header in (
+            None,
+            "",
+            "garbage",
+            f"00-{self.TRACE_ID}-{self.PARENT_ID}",
+            f"00-{'z' * 32}-{self.PARENT_ID}-01",
+            f"00-{'0' * 32}-{self.PARENT_ID}-01",
+            f"00-{self.TRACE_ID}-{'0' * 16}-01",
+            f"00-{self.TRACE_ID[:-1]}-{self.PARENT_ID}-01",
+        ):
+            self.assertIsNone(parse_traceparent(header), header)
+
+    def test_sampling_is_deterministic_by_trace_id(self):
+        from src.shared import tracing
+
+        low, high = "0" * 16 + "0" * 15 + "1", "0" * 16 + "f" * 16
+        with mock.patch.object(tracing, "TRACE_SAMPLE_RATE", 0.5):
+            self.assertTrue(tracing._should_sample(low))
+            self.assertFalse(tracing._should_sample(high))
+        with mock.patch.object(tracing, "TRACE_SAMPLE_RATE", 0.0):
+            self.assertFalse(tracing._should_sample(low))
+        with mock.patch.object(tracing, "TRACE_SAMPLE_RATE", 1.0):
+            self.assertTrue(tracing._should_sample(high))
+
+    def test_child_follows_remote_decision(self):
+        from src.shared import tracing
+
+        with mock.patch.object(tracing, "TRACE_ENABLED", True):
+            for flag, sampled in (("01", True), ("00", False)):
+                child = tracing.start_span(
+                    "child", traceparent=f"00-{self.TRACE_ID}-{self.PARENT_ID}-{flag}"
+                )
+                self.assertEqual(child.trace_id, self.TRACE_ID)
+                self.assertEqual(child.parent_id, self.PARENT_ID)
+                self.assertIs(child.sampled, sampled)
+
+    def test_none_exporter_does_not_queue(self):
+        from src.shared import tracing
+
+        processor = tracing.BatchSpanProcessor()
+        finished = tracing.Span("s", tracing.KIND_INTERNAL, self.TRACE_ID, None, True)
+        with mock.patch.object(tracing, "TRACE_EXPORTER", "none"):
+            processor.submit(finished)
+        self.assertEqual(processor._queue.qsize(), 0)
+        self.assertIsNone(processor._pid)
+
+
+class CompressionTests(unittest.TestCase):
+    """Accept-Encoding negotiation ve precompressed cache"""
+
+    def test_negotiate(self):
+        from src.shared import compression
+
+        with mock.patch.object(compression, "PREFERENCE", ["zstd", "br", "gzip"]):
+            negotiate = compression.negotiate
+            self.assertIsNone(negotiate(""))
+            self.assertEqual(negotiate("gzip, deflate, br"), "br")
+            self.assertEqual(negotiate("gzip;q=1.0, br;q=0.5"), "gzip")
+            self.assertEqual(negotiate("*"), "zstd")
+            self.assertEqual(negotiate("*;q=0.5, zstd;q=0"), "br")
+            self.assertEqual(negotiate("GZIP;q=0.8"), "gzip")
+            self.assertIsNone(negotiate("identity, gzip;q=0"))
+            self.assertIsNone(negotiate("gzip;q=bad"))
+
+    def test_precompressed_cache_lru(self):
+        from src.shared.compression import PrecompressedCache
+
+        cache = PrecompressedCache(max_bytes=10)
+        cache.set("a", "gzip", b"1234")
+        cache.set("b", "gzip", b"1234")
+        self.assertEqual(cache.get("a", "gzip"), b"1234")  # a en yeni olur
+        cache.set("c", "gzip", b"1234")
+        self.assertIsNone(cache.get("b", "gzip"))
+        self.assertEqual(cache.stats(), {"entries": 2, "bytes": 8})
+        cache.set("big", "gzip", b"x" * 11)
+        self.assertIsNone(cache.get("big", "gzip"))
+
+    def test_precompressed_cache_replace(self):
+        from src.shared.compression import PrecompressedCache
+
+        cache = PrecompressedCache(max_bytes=100)
+        cache.set("a", "gzip", b"12345")
+        cache.set("a", "gzip", b"12")
+        self.assertEqual(cache.get("a", "gzip"), b"12345")
+        cache.set("a", "gzip", b"12", replace=True)
+        self.assertEqual(cache.get("a", "gzip"), b"12")
+        self.assertEqual(cache.stats(), {"entries": 1, "bytes": 2})
+
+    def _app(self):
+        from src.shared.compression import compress_response
+
+        app = Flask(__name__)
+
+        @app.route("/static")
+        def static_json():
+            response = app.response_class(json.dumps({"items": ["x" * 20] * 200}))
+            response.mimetype = "application/json"
+            response.headers["Cache-Control"] = "public, max-age=60"
+            response.set_etag("v1")
+            return response
+
+        app.after_request(compress_response)
+        return app.test_client()
+
+    def test_request_path_uses_normal_level(self):
+        import gzip
+
+        from src.shared import compression
+
+        cache = compression.PrecompressedCache()
+        recompressor = compression.StaticRecompressor(cache)
+        levels = []
+        real_gzip = compression.ENCODERS["gzip"]
+
+        def encoder(data, level):
+            levels.append(level)
+            return real_gzip(data, level)
+
+        with mock.patch.dict(compression.ENCODERS, {"gzip": encoder}), mock.patch.object(
+            compression, "_precompressed", cache
+        ), mock.patch.object(compression, "_recompressor", recompressor), mock.patch.object(
+            recompressor, "_ensure_thread"
+        ):
+            client = self._app()
+            first = client.get("/static", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(first.headers["Content-Encoding"], "gzip")
+            self.assertEqual(levels, [compression.LEVELS["gzip"]])
+
+            # Kuyruktaki iş arka plan thread'i yerine burada çalıştırılır
+            recompressor.upgrade(*recompressor._queue.get_nowait())
+            self.assertEqual(levels[-1], compression.STATIC_LEVELS["gzip"])
+
+            second = client.get("/static", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(len(levels), 2)  # cache'ten, istek yolunda sıkıştırma yok
+            self.assertEqual(gzip.decompress(second.data), gzip.decompress(first.data))
+            self.assertEqual(second.headers["ETag"], 'W/"v1"')
+
+
+class LocalCacheTests(unittest.TestCase):
+    """L1 sınırları, TTL ve invalidation"""
+
+    def test_entry_and_byte_bounds(self):
+        from src.shared.cache import LocalCache
+
+        l1 = LocalCache(max_entries=2, max_bytes=100)
+        l1.set("a", b"a", 60, 10)
+        l1.set("b", b"b", 60, 10)
+        l1.get("a")  # a en yeni olur
+        l1.set("c", b"c", 60, 10)
+        self.assertIsNone(l1.get("b"))
+        self.assertEqual((len(l1), l1.size_bytes, l1.evictions), (2, 20, 1))
+
+        l1.set("d", b"d", 60, 95)
+        self.assertEqual(len(l1), 1)
+        self.assertLessEqual(l1.size_bytes, 100)
+        l1.set("huge", b"x", 60, 101)
+        self.assertIsNone(l1.get("huge"))
+
+    def test_ttl_expiry(self):
+        from src.shared import cache
+
+        l1 = cache.LocalCache()
+        with mock.patch.object(cache.time, "monotonic", return_value=1000.0):
+            l1.set("k", b"v", 1.5, 1)
+            l1.set("zero", b"v", 0, 1)
+        with mock.patch.object(cache.time, "monotonic", return_value=1001.0):
+            self.assertEqual(l1.get("k"), b"v")
+            self.assertIsNone(l1.get("zero"))
+        with mock.patch.object(cache.time, "monotonic", return_value=1001.5):
+            self.assertIsNone(l1.get("k"))
+        self.assertEqual(l1.size_bytes, 0)
+
+    def test_delete_by_pattern(self):
+        from src.shared.cache import LocalCache
+
+        l1 = LocalCache()
+        for key in ("user:profile:1", "user:profile:2", "video:meta:1"):
+            l1.set(key, b"v", 60, 1)
+        self.assertEqual(l1.delete_by_pattern("user:*"), 2)
+        self.assertEqual(len(l1), 1)
+
+    def _redis_cache(self, pipeline_result):
+        from src.shared import cache
+
+        client = mock.MagicMock()
+        with mock.patch.object(cache.redis, "from_url", return_value=client):
+            redis_cache = cache.RedisCache(l1_enabled=True)
+        # subscriber thread açılmasın, sağlıklı görünsün
+        redis_cache._pubsub_pid = os.getpid()
+        redis_cache._pubsub_thread = mock.Mock(is_alive=lambda: True)
+        client.pipeline.return_value.execute.return_value = pipeline_result
+        return redis_cache
+
+    def test_l1_fill_respects_remaining_redis_ttl(self):
+        from src.shared import cache
+
+        key = "user:profile:42"
+        payload = cache.CacheCodec().encode({"name": "Ali"})
+        redis_cache = self._redis_cache([payload, 1500])
+        with mock.patch.object(redis_cache.l1, "set") as l1_set:
+            self.assertEqual(redis_cache.get(key), {"name": "Ali"})
+        l1_set.assert_called_once_with(key, payload, 1.5, len(payload))
+
+        self.assertEqual(cache._remaining_ttl(3600, -1), 3600)
+        self.assertEqual(cache._remaining_ttl(3600, -2), 0)
+        self.assertEqual(cache._remaining_ttl(10, 60000), 10)
+
+    def test_l1_ttl_capped_while_subscriber_down(self):
+        from src.shared import cache
+
+        key = "user:profile:42"
+        payload = cache.CacheCodec().encode({"name": "Ali"})
+        redis_cache = self._redis_cache([payload, 3600000])
+        redis_cache._pubsub_thread = None
+        redis_cache.client.pubsub.return_value.subscribe.side_effect = ConnectionError("down")
+        with mock.patch.object(redis_cache.l1, "set") as l1_set:
+            redis_cache.get(key)
+        l1_set.assert_called_once_with(key, payload, cache.L1_DEGRADED_TTL, len(payload))
+        redis_cache.client.pubsub.return_value.close.assert_called_once()
+
+    def test_listener_error_clears_l1_and_resubscribes(self):
+        redis_cache = self._redis_cache([None, -2])
+        redis_cache.l1.set("user:profile:1", b"v", 60, 1)
+        thread = redis_cache._pubsub_thread
+        redis_cache._on_subscriber_error(ConnectionError("reset"), None, thread)
+        thread.stop.assert_called_once()
+        self.assertEqual(len(redis_cache.l1), 0)
+
+        self.assertTrue(redis_cache._ensure_subscriber())
+        run_in_thread = redis_cache.client.pubsub.return_value.run_in_thread
+        self.assertEqual(
+            run_in_thread.call_args.kwargs["exception_handler"], redis_cache._on_subscriber_error
+        )
+
+    def test_invalidation_message(self):
+        redis_cache = self._redis_cache([None, -2])
+        l1 = redis_cache.l1
+        for key in ("user:profile:1", "user:profile:2", "video:meta:1"):
+            l1.set(key, b"v", 60, 1)
+
+        own = {"origin": redis_cache.instance_id, "keys": ["video:meta:1"]}
+        redis_cache._on_invalidation({"data": json.dumps(own)})
+        self.assertEqual(len(l1), 3)
+
+        other = {"origin": "other", "keys": ["video:meta:1"], "patterns": ["user:profile:1"]}
+        redis_cache._on_invalidation({"data": json.dumps(other)})
+        self.assertIsNone(l1.get("video:meta:1"))
+        self.assertIsNone(l1.get("user:profile:1"))
+        self.assertEqual(l1.get("user:profile:2"), b"v")
+
+        redis_cache._on_invalidation({"data": json.dumps({"origin": "other", "flush": True})})
+        self.assertEqual(len(l1), 0)
+
+
+class CacheCodecTests(unittest.TestCase):
+    """Cache codec round-trip ve eski (codec öncesi) değerler"""
+
+    def setUp(self):
+        from datetime import date, datetime
+
+        from bson import ObjectId
+
+        self.value = {
+            "id": ObjectId(),
+            "created_at": datetime(2024, 5, 1, 12, 30, 15),
+            "day": date(2024, 5, 1),
+            "tags": ["a", "b"],
+            "nested": {"score": 1.5, "views": 10, "ok": True, "none": None},
+            "text": "Galatasaray " * 200,
+        }
+
+    def test_round_trip_all_serializers(self):
+        from src.shared.cache_codec import SERIALIZERS, CacheCodec
+
+        for serializer in SERIALIZERS.values():
+            for min_bytes in (0, 64):
+                codec = CacheCodec(serializer.name, compress_min_bytes=min_bytes)
+                payload = codec.encode(self.value)
+                self.assertEqual(codec.decode(payload), self.value, serializer.name)
+
+    def test_compression_threshold(self):
+        from src.shared.cache_codec import COMPRESSION_NONE, COMPRESSION_ZLIB, CacheCodec
+
+        codec = CacheCodec("json", compress_min_bytes=64)
+        self.assertEqual(codec.encode(self.value)[2:3], COMPRESSION_ZLIB)
+        self.assertEqual(codec.encode({"a": 1})[2:3], COMPRESSION_NONE)
+
+    def test_decodes_other_serializer_payloads(self):
+        from src.shared.cache_codec import SERIALIZERS, CacheCodec
+
+        reader = CacheCodec("json")
+        for serializer in SERIALIZERS.values():
+            payload = CacheCodec(serializer.name).encode(self.value)
+            self.assertEqual(reader.decode(payload), self.value)
+
+    def test_legacy_plain_values(self):
+        from src.shared.cache_codec import CacheCodec
+
+        codec = CacheCodec("json")
+        self.assertEqual(codec.decode(b'{"views": 3, "tags": ["x"]}'), {"views": 3, "tags": ["x"]})
+        self.assertEqual(codec.decode('{"views": 3}'), {"views": 3})
+        self.assertEqual(codec.decode(b"plain-token"), "plain-token")
+
+    def test_unknown_serializer_raises(self):
+        from src.shared.cache_codec import MAGIC, CacheCodec
+
+        with self.assertRaises(ValueError):
+            CacheCodec("json").decode(MAGIC + b"?n{}")
+
+
+class CacheTagTests(unittest.TestCase):
+    """Tag set'leri üyelerinden uzun yaşamaz, ölü üyeler temizlenir"""
+
+    def _redis_cache(self):
+        from src.shared import cache
+
+        client = mock.MagicMock()
+        with mock.patch.object(cache.redis, "from_url", return_value=client):
+            return cache.RedisCache(l1_enabled=False), client
+
+    def test_tag_ttl_only_extended_to_member_ttl(self):
+        redis_cache, client = self._redis_cache()
+        redis_cache.set("metrics:daily", {"views": 1}, 60, tags=["metrics"])
+        pipe = client.pipeline.return_value
+        pipe.expire.assert_has_calls([
+            mock.call("tag:metrics", 60, nx=True),
+            mock.call("tag:metrics", 60, gt=True),
+        ])
+
+    def test_compact_prunes_each_tag_set(self):
+        redis_cache, client = self._redis_cache()
+        client.scan_iter.return_value = iter(["tag:metrics", "tag:metrics:purge:abc"])
+        client.sscan_iter.return_value = iter(["metrics:a", "metrics:b"])
+        redis_cache._prune_tag_script = mock.MagicMock(return_value=1)
+
+        self.assertEqual(redis_cache.compact_tags(), 1)
+        redis_cache._prune_tag_script.assert_called_once_with(
+            keys=["tag:metrics"], args=["metrics:a", "metrics:b"]
+        )
+
+    def test_invalidate_user_scans_untagged_keys_by_default(self):
+        redis_cache, _ = self._redis_cache()
+        with mock.patch.object(redis_cache, "invalidate_tags", return_value=1), mock.patch.object(
+            redis_cache, "delete_by_pattern", return_value=2
+        ) as delete_by_pattern:
+            self.assertEqual(redis_cache.invalidate_user("42"), 3)
+        delete_by_pattern.assert_called_once_with("user:*:42")
+
+
+class RateLimiterPipelineTests(unittest.TestCase):
+    """check_many: EVALSHA doğrudan pipeline'da, NOSCRIPT'te tek tekrar"""
+
+    def _limiter(self, *executions):
+        from src.shared import rate_limiter
+
+        client = mock.MagicMock()
+        client.register_script.side_effect = lambda script: mock.MagicMock(sha=f"sha-{len(script)}", script=script)
+        client.pipeline.return_value.execute.side_effect = list(executions)
+        limiter = rate_limiter.RateLimiter(client)
+        rules = [
+            rate_limiter.AdmissionRule("user", "user", 10, 60, "gcra", "strict"),
+            rate_limiter.AdmissionRule("ip", "ip", 100, 60, "fixed_window", "strict"),
+        ]
+        return rate_limiter, limiter, client, [(rule, "u1") for rule in rules]
+
+    def test_single_round_trip(self):
+        rate_limiter, limiter, client, checks = self._limiter([[1, 9, 1000, 1], [1, 99, 1000, 1]])
+        with mock.patch.object(rate_limiter, "REDIS_AVAILABLE", True):
+            results = limiter.check_many(checks)
+        self.assertEqual([limited for limited, _ in results], [False, False])
+        pipe = client.pipeline.return_value
+        self.assertEqual(pipe.evalsha.call_count, 2)
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+        client.script_load.assert_not_called()
+
+    def test_noscript_reloads_and_retries_only_failed_calls(self):
+        from redis.exceptions import NoScriptError
+
+        rate_limiter, limiter, client, checks = self._limiter(
+            [[1, 9, 1000, 1], NoScriptError("NOSCRIPT")], [[0, 0, 5000, 100]]
+        )
+        with mock.patch.object(rate_limiter, "REDIS_AVAILABLE", True):
+            results = limiter.check_many(checks)
+        self.assertEqual([limited for limited, _ in results], [False, True])
+        client.script_load.assert_called_once_with(rate_limiter.FIXED_WINDOW_SCRIPT)
+        self.assertEqual(client.pipeline.return_value.evalsha.call_count, 3)
+
+
+class CachedAsyncTests(unittest.TestCase):
+    """Async single-flight: takılan lider beklenmez, refresh task'ı tutulur"""
+
+    def test_waiter_computes_after_timeout(self):
+        from src.shared import cache
+
+        fake = mock.MagicMock()
+        fake.get.return_value = None
+        fake.acquire_lock.return_value = "token"
+        release = asyncio.Event()
+        calls = []
+
+        @cache.cached("slow:{n}", lock_timeout=0.05)
+        async def slow(n):
+            calls.append(n)
+            if len(calls) == 1:
+                await release.wait()
+            return n * 2
+
+        async def run():
+            leader = asyncio.ensure_future(slow(1))
+            await asyncio.sleep(0)
+            self.assertEqual(await slow(1), 2)
+            release.set()
+            self.assertEqual(await leader, 2)
+
+        with mock.patch.object(cache, "_get_cache_or_none", return_value=fake):
+            asyncio.run(run())
+        self.assertEqual(calls, [1, 1])
+
+    def test_background_refresh_keeps_task_reference(self):
+        from src.shared import cache
+
+        fake = mock.MagicMock()
+        fake.get.return_value = cache._make_envelope(1, 0, 1.0)
+        fake.acquire_lock.return_value = "token"
+        refreshed = []
+
+        @cache.cached("value", ttl=0, stale_ttl=60)
+        async def value():
+            refreshed.append(True)
+            return 2
+
+        async def run():
+            self.assertEqual(await value(), 1)
+            gc.collect()  # task'a tek güçlü referans decorator'da
+            await asyncio.sleep(0.01)
+
+        with mock.patch.object(cache, "_get_cache_or_none", return_value=fake):
+            asyncio.run(run())
+        self.assertEqual(refreshed, [True])
+        fake.release_lock.assert_called_once_with("value", "token")
+
+
+class JsonProviderTests(unittest.TestCase):
+    """orjson provider, Flask'ın varsayılan çıktısıyla aynı kalır"""
+
+    def test_matches_flask_default(self):
+        from datetime import date, datetime
+        from decimal import Decimal
+
+        from flask.json.provider import DefaultJSONProvider
+
+        from src.shared import json_provider
+
+        value = {"at": datetime(2026, 5, 1, 12), "day": date(2026, 5, 1), "price": Decimal("1.10")}
+        expected = json.loads(DefaultJSONProvider(Flask(__name__)).dumps(value))
+        self.assertEqual(json_provider.loads(json_provider.dumps(value)), expected)
+        self.assertEqual(expected["price"], "1.10")
+
+    def test_iso_datetime_opt_in(self):
+        from datetime import datetime
+
+        from src.shared import json_provider
+
+        with mock.patch.object(json_provider, "DATETIME_FORMAT", "iso"), mock.patch.object(
+            json_provider, "_OPTIONS", json_provider.orjson.OPT_NON_STR_KEYS
+        ):
+            self.assertEqual(
+                json_provider.dumps({"at": datetime(2026, 5, 1, 12)}), b'{"at":"2026-05-01T12:00:00"}'
+            )
+
+
+class CountInvalidationTests(unittest.TestCase):
+    """Cache'li count'lar sahip tag'i ile yazılır, sadece o sahibinki silinir"""
+
+    def test_count_tagged_and_invalidated(self):
+        from src.shared import cache, pagination
+
+        fake = mock.MagicMock()
+        fake.get.return_value = None
+        fake.acquire_lock.return_value = "token"
+        with mock.patch.object(cache, "_get_cache_or_none", return_value=fake), mock.patch.object(
+            pagination, "MongoDBConnection"
+        ) as mongo:
+            mongo.return_value.count.return_value = 7
+            self.assertEqual(pagination.cached_count("videos", {"user_id": "u1"}), 7)
+            self.assertEqual(fake.set.call_args.kwargs["tags"], ["count:videos:user_id:u1"])
+
+            pagination.cached_count("videos", {"status": "ready"})
+            self.assertEqual(fake.set.call_args.kwargs["tags"], ["count:videos"])
+
+            pagination.invalidate_counts("videos", "u1")
+        fake.invalidate_tags.assert_called_once_with("count:videos", "count:videos:user_id:u1")
+
+    def test_operator_filter_not_scoped(self):
+        from src.shared import pagination
+
+        self.assertEqual(pagination._count_tag("videos", {"user_id": {"$in": ["u1", "u2"]}}), "count:videos")
+
+    def test_invalidate_without_cache(self):
+        from src.shared import cache, pagination
+
+        with mock.patch.object(cache, "_get_cache_or_none", return_value=None):
+            pagination.invalidate_counts("videos")
+
+
+class _FakeSummaryDB:
+    """dashboard_summary'nin kullandığı Mongo işlemleri (bellekte)"""
+
+    def __init__(self, legacy_metrics=None):
+        self.applied = {}
+        self.summary = {"u1": {"_id": "u1", "total_videos": 1, "videos_with_metrics": 0,
+                               "total_views": 0, "total_likes": 0, "total_engagement": 0}}
+        self.legacy_metrics = legacy_metrics
+        self.db = mock.MagicMock()
+        self.db.__getitem__.side_effect = self._collection
+        self.db.video_metrics.find_one.side_effect = lambda *a, **k: self.legacy_metrics
+        self.max_time_ms = 1000
+
+    def _collection(self, name):
+        collection = mock.MagicMock()
+        if name == "video_summary_applied":
+            collection.find_one_and_update.side_effect = self._swap
+            collection.find_one_and_delete.side_effect = (
+                lambda query: self.applied.pop(query["_id"], None)
+            )
+        else:
+            collection.update_one.side_effect = self._inc
+        return collection
+
+    def _swap(self, query, update, upsert, return_document):
+        before = self.applied.get(query["_id"])
+        self.applied[query["_id"]] = dict(update["$set"])
+        return before
+
+    def _inc(self, query, update):
+        summary = self.summary.get(query["_id"])
+        if summary is not None:
+            for field, amount in update["$inc"].items():
+                summary[field] = summary.get(field, 0) + amount
+
+    def find_one(self, collection, query, projection=None):
+        return {"_id": query["_id"], "user_id": "u1"}
+
+
+class DashboardSummaryTests(unittest.TestCase):
+    """Özet farkları applied dokümanının takasından hesaplanır"""
+
+    def _patched(self, fake):
+        from src.shared import dashboard_summary
+
+        return mock.patch.object(dashboard_summary, "MongoDBConnection", return_value=fake)
+
+    def test_increments_telescope_to_latest_values(self):
+        from src.shared.dashboard_summary import apply_video_metrics
+
+        fake = _FakeSummaryDB()
+        with self._patched(fake):
+            apply_video_metrics("v1", {"views": 10, "likes": 2, "engagement_rate": 0.2})
+            apply_video_metrics("v1", {"views": 25, "likes": 3, "engagement_rate": 0.1})
+            apply_video_metrics("v1", {"views": 40, "likes": 5, "engagement_rate": 0.3})
+        summary = fake.summary["u1"]
+        self.assertEqual(summary["total_views"], 40)
+        self.assertEqual(summary["total_likes"], 5)
+        self.assertAlmostEqual(summary["total_engagement"], 0.3)
+        self.assertEqual(summary["videos_with_metrics"], 1)
+        fake.db.video_metrics.find_one.assert_called_once()  # sadece ilk (legacy) çağrı
+
+    def test_legacy_baseline(self):
+        from src.shared.dashboard_summary import apply_video_metrics
+
+        fake = _FakeSummaryDB(legacy_metrics={"metrics": {"views": 7, "likes": 1}})
+        fake.summary["u1"].update(total_views=7, total_likes=1, videos_with_metrics=1)
+        with self._patched(fake):
+            apply_video_metrics("v1", {"views": 9, "likes": 1})
+        self.assertEqual(fake.summary["u1"]["total_views"], 9)
+        self.assertEqual(fake.summary["u1"]["videos_with_metrics"], 1)
+
+    def test_delete_reverts_contribution(self):
+        from src.shared.dashboard_summary import apply_video_deleted, apply_video_metrics
+
+        fake = _FakeSummaryDB()
+        with self._patched(fake):
+            apply_video_metrics("v1", {"views": 10, "likes": 2})
+            apply_video_deleted("v1", "u1")
+            apply_video_deleted("v1", "u1")  # applied yok, legacy metrik yok
+        summary = fake.summary["u1"]
+        self.assertEqual((summary["total_views"], summary["total_likes"]), (0, 0))
+        self.assertEqual(summary["videos_with_metrics"], 0)
+        self.assertNotIn("v1", fake.applied)
+
+
+class StreamingTests(unittest.TestCase):
+    """Chunk birleştirme, JSON array gövdesi ve kaynak kapatma"""
+
+    def test_chunked_sends_first_part_then_batches(self):
+        from src.shared import streaming
+
+        with mock.patch.object(streaming, "STREAM_CHUNK_BYTES", 4):
+            chunks = list(streaming._chunked([b"a", b"bb", b"cc", b"d", b"e"]))
+        self.assertEqual(chunks, [b"a", b"bbcc", b"de"])
+        self.assertEqual(list(streaming._chunked([])), [])
+
+    def test_json_array_parts(self):
+        from src.shared.streaming import _json_array_parts
+
+        envelope = {"status": "success", "country": "TR"}
+        for documents in ([], [{"name": "a"}, {"name": "b", "n": 2}]):
+            body = b"".join(_json_array_parts(iter(documents), "data", envelope))
+            self.assertEqual(json.loads(body), {**envelope, "data": documents})
+        # Envelope'taki aynı key gövdeyi bozmamalı
+        body = b"".join(_json_array_parts(iter([{"x": 1}]), "data", {"data": "old"}))
+        self.assertEqual(json.loads(body), {"data": [{"x": 1}]})
+
+    def _app(self, cursor, on_close):
+        from src.shared.streaming import stream_documents
+
+        app = Flask(__name__)
+
+        @app.route("/items", methods=["GET"])
+        def items():
+            return stream_documents(cursor, "ndjson", on_close=on_close)
+
+        return app.test_client()
+
+    def test_closes_on_response_close(self):
+        cursor, on_close = mock.MagicMock(), mock.MagicMock()
+        cursor.batch_size.return_value = cursor
+        cursor.__iter__.return_value = iter([{"a": 1}, {"a": 2}])
+        response = self._app(cursor, on_close).get("/items")
+        self.assertEqual(response.data.splitlines(), [b'{"a":1}', b'{"a":2}'])
+        response.close()
+        cursor.close.assert_called_once()
+        on_close.assert_called_once()
+
+    def test_closes_when_body_never_iterated(self):
+        cursor, on_close = mock.MagicMock(), mock.MagicMock()
+        cursor.batch_size.return_value = cursor
+        cursor.__iter__.return_value = iter([{"a": 1}] * 10)
+        response = self._app(cursor, on_close).get("/items", buffered=False)
+        response.close()  # gövde tüketilmeden kopan istemci
+        cursor.close.assert_called_once()
+        on_close.assert_called_once()
+
+
+class StreamModeTests(unittest.TestCase):
+    """Streaming opt-in: wildcard Accept düz JSON almaya devam eder"""
+
+    def _mode(self, path="/", accept=None):
+        from src.shared.streaming import stream_mode
+
+        headers = {"Accept": accept} if accept is not None else {}
+        with Flask(__name__).test_request_context(path, headers=headers):
+            return stream_mode()
+
+    def test_wildcards_do_not_stream(self):
+        for accept in (None, "*/*", "application/json, text/plain, */*", "application/*"):
+            self.assertIsNone(self._mode(accept=accept), accept)
+
+    def test_explicit_ndjson(self):
+        self.assertEqual(self._mode(accept="application/x-ndjson"), "ndjson")
+        self.assertEqual(
+            self._mode(accept="application/x-ndjson, application/json;q=0.5"), "ndjson"
+        )
+        self.assertIsNone(self._mode(accept="application/x-ndjson, application/json"))
+        self.assertIsNone(self._mode(accept="application/x-ndjson;q=0, */*"))
+
+    def test_query_parameter(self):
+        self.assertEqual(self._mode("/?stream=ndjson"), "ndjson")
+        self.assertEqual(self._mode("/?stream=json", accept="*/*"), "json")
+        self.assertIsNone(self._mode("/?stream=xml"))
+
+    def test_wildcard_client_gets_plain_json_array(self):
+        from flask import jsonify
+
+        from src.shared.streaming import stream_documents, stream_mode
+
+        app = Flask(__name__)
+
+        @app.route("/calendar")
+        def calendar():
+            documents = [{"a": 1}, {"a": 2}]
+            mode = stream_mode()
+            if mode:
+                return stream_documents(iter(documents), mode, key="calendar")
+            return jsonify({"success": True, "calendar": documents})
+
+        response = app.test_client().get("/calendar", headers={"Accept": "*/*"})
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.get_json()["calendar"], [{"a": 1}, {"a": 2}])
+
+
+class _FakeEventStore:
+    """video_events: insert_many (kısmi hata), applied bayrağı"""
+
+    def __init__(self):
+        self.docs = {}
+        self.fail_after = None
+        self.db = {"video_events": self}
+
+    def insert_many(self, collection, docs, ordered=False):
+        from pymongo.errors import AutoReconnect, BulkWriteError
+
+        errors = []
+        for index, doc in enumerate(docs):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise AutoReconnect("connection reset")
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.docs[doc["_id"]] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    def find(self, query, projection=None):
+        ids = set(query["_id"]["$in"])
+        return [
+            {"_id": _id} for _id, doc in self.docs.items()
+            if _id in ids and doc.get("applied") == query["applied"]
+        ]
+
+    def update_many(self, collection, query, update):
+        for _id in query["_id"]["$in"]:
+            self.docs[_id].update(update["$set"])
+
+
+class EventIngestTests(unittest.TestCase):
+    """Kısmi insert sonrası tekrar flush, dead-letter ve backpressure"""
+
+    def _entries(self, count):
+        from src.shared.cache_codec import JsonSerializer
+
+        payload = JsonSerializer().dumps({"video_id": "v1", "event_type": "view"}).decode()
+        return [(f"{1700000000000 + i}-0", payload) for i in range(count)]
+
+    def _ingestor(self, store, redis_client=None):
+        from src.shared import event_ingest
+
+        patches = [
+            mock.patch.object(event_ingest, "MongoDBConnection", return_value=store),
+            mock.patch.object(event_ingest, "rollup_events"),
+            mock.patch.object(event_ingest, "record_events"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return event_ingest.EventIngestor(redis_client, spill_dir="/nonexistent")
+
+    def _applied_ids(self, mocked):
+        return [d["_id"] for call in mocked.call_args_list for d in call.args[0]]
+
+    def test_partial_insert_is_applied_on_retry(self):
+        from pymongo.errors import AutoReconnect
+
+        from src.shared import event_ingest
+
+        store = _FakeEventStore()
+        ingestor = self._ingestor(store)
+        entries = self._entries(4)
+
+        store.fail_after = 2  # ilk iki doküman yazıldı, sonra bağlantı koptu
+        with self.assertRaises(AutoReconnect):
+            ingestor._write(entries)
+        event_ingest.rollup_events.assert_not_called()
+
+        store.fail_after = None
+        ingestor._write(entries)
+        self.assertEqual(self._applied_ids(event_ingest.rollup_events), [e[0] for e in entries])
+        self.assertEqual(self._applied_ids(event_ingest.record_events), [e[0] for e in entries])
+        self.assertTrue(all(doc["applied"] for doc in store.docs.values()))
+
+        # Tamamı uygulanmış tekrar flush hiçbir şey saymaz
+        ingestor._write(entries)
+        self.assertEqual(event_ingest.rollup_events.call_count, 1)
+        self.assertEqual(ingestor.stats["duplicates"], 4)
+
+    def test_poisoned_entries_dead_lettered_after_max_deliveries(self):
+        from src.shared import event_ingest
+
+        store = _FakeEventStore()
+        redis_client = mock.MagicMock()
+        ingestor = self._ingestor(store, redis_client)
+        entries = self._entries(2) + [("1700000000009-0", "not json")]
+        redis_client.xpending_range.return_value = [
+            {"message_id": eid, "times_delivered": event_ingest.MAX_DELIVERIES}
+            for eid, _ in entries
+        ]
+        with mock.patch.object(ingestor, "_read_stream_batch", return_value=entries), \
+                mock.patch.object(ingestor, "_flush_spill"):
+            self.assertEqual(ingestor.flush_once(), 3)
+
+        redis_client.xadd.assert_called_once()
+        self.assertEqual(redis_client.xadd.call_args.args[0], event_ingest.DEAD_LETTER_STREAM)
+        self.assertEqual(redis_client.xadd.call_args.args[1]["id"], "1700000000009-0")
+        acked = redis_client.pipeline.return_value.xack.call_args.args[2:]
+        self.assertEqual(sorted(acked), sorted(eid for eid, _ in entries))
+        self.assertEqual(ingestor.stats["dead_lettered"], 1)
+
+    def test_failed_batch_stays_pending_below_max_deliveries(self):
+        store = _FakeEventStore()
+        redis_client = mock.MagicMock()
+        ingestor = self._ingestor(store, redis_client)
+        entries = [("1700000000009-0", "not json")]
+        redis_client.xpending_range.return_value = [
+            {"message_id": "1700000000009-0", "times_delivered": 1}
+        ]
+        with mock.patch.object(ingestor, "_read_stream_batch", return_value=entries), \
+                mock.patch.object(ingestor, "_flush_spill"):
+            self.assertEqual(ingestor.flush_once(), 0)
+        redis_client.xadd.assert_not_called()
+        redis_client.pipeline.return_value.xack.assert_not_called()
+
+    def test_backpressure_refreshes_spill_size_on_flush_interval(self):
+        store = _FakeEventStore()
+        ingestor = self._ingestor(store)
+        with mock.patch.object(ingestor, "_spill_bytes", return_value=0) as spill_bytes:
+            for _ in range(50):
+                ingestor._check_backpressure(1)
+        self.assertEqual(spill_bytes.call_count, 1)
+
+
+class _StandInCollection:
+    """Okumanın hangi read preference ile yapıldığını döndüren collection"""
+
+    def __init__(self, read_preference=None):
+        self.read_preference = read_preference
+
+    def with_options(self, read_preference=None):
+        return _StandInCollection(read_preference)
+
+    def find_one(self, query, projection=None, **kwargs):
+        return {"mode": self.read_preference.mongos_mode if self.read_preference else "primary"}
+
+    def insert_one(self, data, session=None):
+        return mock.Mock(inserted_id="new")
+
+
+class ReadRoutingTests(unittest.TestCase):
+    """Tolerant GET'ler secondary'ye, yazma sonrası okumalar primary'ye"""
+
+    def setUp(self):
+        from src.shared import cache, database, read_routing
+
+        self.app = Flask(__name__)
+        self.read_routing = read_routing
+        read_routing._local_writers.clear()
+        database.MongoDBConnection.reset()
+        patches = [
+            mock.patch.object(database, "db", mock.MagicMock(__getitem__=lambda _, name: _StandInCollection())),
+            mock.patch.object(cache, "_get_cache_or_none", return_value=None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(database.MongoDBConnection.reset)
+
+    def _get(self, user_id):
+        from flask import g
+
+        from src.shared.database import MongoDBConnection
+
+        @self.read_routing.reads_from(self.read_routing.TOLERANT)
+        def view():
+            return MongoDBConnection().find_one("videos", {})["mode"]
+
+        with self.app.test_request_context("/", method="GET"):
+            g.user_id = user_id
+            return view()
+
+    def _write(self, user_id):
+        from flask import g
+
+        from src.shared.database import MongoDBConnection
+
+        with self.app.test_request_context("/", method="POST"):
+            g.user_id = user_id
+            MongoDBConnection().insert_one("videos", {"title": "x"})
+
+    def test_tolerant_get_reads_secondary(self):
+        self.assertEqual(self._get("u1"), "secondaryPreferred")
+
+    def test_read_after_write_goes_to_primary(self):
+        self._write("u1")
+        self.assertEqual(self._get("u1"), "primary")
+        self.assertEqual(self._get("u2"), "secondaryPreferred")
+
+    def test_anonymous_writes_do_not_pin_other_anonymous_reads(self):
+        self._write("anonymous")
+        self.assertEqual(self._get("anonymous"), "secondaryPreferred")
+        self.assertEqual(self.read_routing._local_writers, {})
+
+
+class EventRollupRebuildTests(unittest.TestCase):
+    """Rebuild sadece kapanmış bucket'lara dokunur (flusher $inc'leriyle çakışmaz)"""
+
+    def test_rebuild_skips_open_buckets(self):
+        from datetime import datetime, timedelta
+
+        from src.shared import event_rollups
+
+        now = datetime(2026, 5, 10, 12, 30)
+        events = [
+            {"video_id": "v1", "event_type": "view", "timestamp": datetime(2026, 5, 9, 8, 0)},
+            {"video_id": "v1", "event_type": "view", "timestamp": datetime(2026, 5, 10, 11, 0)},
+        ]
+        with mock.patch.object(event_rollups, "MongoDBConnection") as mongo, mock.patch.object(
+            event_rollups, "CLOSE_DELAY", timedelta(minutes=15)
+        ):
+            mongo.return_value.db.video_events.find.return_value.batch_size.return_value = events
+            event_rollups.rebuild_rollups("v1", datetime(2026, 5, 9, 8, 0), now=now)
+
+        deleted = mongo.return_value.delete_many.call_args.args[1]["$or"]
+        self.assertIn({"granularity": "day", "bucket": {"$gte": datetime(2026, 5, 9), "$lt": datetime(2026, 5, 10)}}, deleted)
+        self.assertIn({"granularity": "hour", "bucket": {"$gte": datetime(2026, 5, 9), "$lt": datetime(2026, 5, 10, 12)}}, deleted)
+        requests = mongo.return_value.bulk_write.call_args.args[1]
+        ids = sorted(request._filter["_id"] for request in requests)
+        self.assertNotIn("v1:day:2026-05-10T00:00:00", ids)
+        self.assertIn("v1:hour:2026-05-10T11:00:00", ids)
+        self.assertIn("v1:day:2026-05-09T00:00:00", ids)
+        self.assertEqual(len(ids), 5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI giriş noktası (production)
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+GATEWAY_APP=main_v2 ile v2 gateway servis edilir.
+"""
+
+import importlib
+import os
+
+_module = importlib.import_module(os.getenv("GATEWAY_APP", "main"))
+app = _module.create_app()
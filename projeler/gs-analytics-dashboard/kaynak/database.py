@@ -88,10 +88,6 @@ class Database:
         
         metrics = list(self.metrics.find(query).sort('timestamp', DESCENDING).limit(limit))
         
-        # Convert ObjectId to string
-        for metric in metrics:
-            metric['_id'] = str(metric['_id'])
-        
         return metrics
     
     def aggregate_metrics(self, pipeline: List[Dict]) -> List[Dict]:
@@ -114,9 +110,6 @@ class Database:
         from bson.objectid import ObjectId
         
         report = self.reports.find_one({"_id": ObjectId(report_id)})
-        if report:
-            report['_id'] = str(report['_id'])
-        
         return report
     
     def update_report_status(self, report_id: str, status: str, data: Optional[Dict] = None) -> bool:
@@ -156,9 +149,6 @@ class Database:
             .limit(limit)
         )
         
-        for report in reports:
-            report['_id'] = str(report['_id'])
-        
         return reports
     
     # Dashboards operations
@@ -174,9 +164,6 @@ class Database:
     def get_dashboard(self, dashboard_id: str) -> Optional[Dict]:
         """Dashboard getir"""
         dashboard = self.dashboards.find_one({"dashboard_id": dashboard_id})
-        if dashboard:
-            dashboard['_id'] = str(dashboard['_id'])
-        
         return dashboard
     
     def update_dashboard(self, dashboard_id: str, updates: Dict) -> bool:
@@ -199,9 +186,6 @@ class Database:
             .limit(limit)
         )
         
-        for dashboard in dashboards:
-            dashboard['_id'] = str(dashboard['_id'])
-        
         return dashboards
     
     # Insights operations
@@ -229,9 +213,6 @@ class Database:
             .limit(limit)
         )
         
-        for insight in insights:
-            insight['_id'] = str(insight['_id'])
-        
         return insights
 
 
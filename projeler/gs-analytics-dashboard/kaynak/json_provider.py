@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GS Analytics Dashboard - JSON Provider
+orjson ile hızlı yanıt serialization; Mongo dokümanları (ObjectId,
+datetime) dönüştürme döngüsü olmadan doğrudan jsonify edilir
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """orjson'un native desteklemediği tipler"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Python objesi -> JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """app.json provider (bytes payload'lar olduğu gibi yazılır)"""
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s) if orjson is not None else json.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = bytes(obj) if isinstance(obj, (bytes, bytearray)) else dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Flask app'e hızlı JSON provider'ı bağla"""
+    app.json = FastJSONProvider(app)
+    return app.json
@@ -20,12 +20,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'kaynak'))
 
 from kaynak.database import get_database
 from kaynak.github_models import get_github_models_client
+from kaynak.json_provider import init_json
 
 # Environment variables
 load_dotenv()
 
 # Flask app
 app = Flask(__name__)
+init_json(app)
 CORS(app)
 
 # Loglama
@@ -10,9 +10,33 @@ from pymongo import MongoClient
 from loguru import logger
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+import importlib.util
 import json
+import os
 from config.config import Config
 
+
+def _load_index_manager():
+    """
+    api-gateway'in index manager'ı (manifest hash + leader lock + hata durumu)
+    Gateway paketi import edilemediği için dosyadan yüklenir; monorepo
+    dışında GATEWAY_SHARED_PATH ile gösterilebilir
+    """
+    shared = os.getenv(
+        "GATEWAY_SHARED_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "apps", "api-gateway", "src", "shared"),
+    )
+    path = os.path.join(shared, "index_manager.py")
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location("gateway_index_manager", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+index_manager = _load_index_manager()
+
 class CosmosDBManager:
     """Azure Cosmos DB Yöneticisi"""
     
@@ -216,14 +240,25 @@ class MongoDBManager:
             ]
         }
         
-        for collection_name, index_list in indexes.items():
-            collection = self.database[collection_name]
-            for index_spec in index_list:
+        if index_manager is None:
+            # Gateway kaynağı yok: createIndexes mevcut aynı index'ler için no-op
+            logger.warning("⚠️ index_manager bulunamadı, index'ler doğrudan oluşturuluyor")
+            for collection_name, index_list in indexes.items():
                 try:
-                    collection.create_index(index_spec)
-                    logger.debug(f"Index oluşturuldu: {collection_name}")
+                    self.database[collection_name].create_indexes(
+                        [pymongo.IndexModel(index_spec) for index_spec in index_list]
+                    )
                 except Exception as e:
                     logger.warning(f"Index oluşturma uyarısı: {e}")
+            return
+        
+        # Hash değişmediyse tek find_one; değiştiyse leader eksikleri oluşturur
+        manifest = {
+            collection_name: [index_manager.idx(index_spec) for index_spec in index_list]
+            for collection_name, index_list in indexes.items()
+        }
+        report = index_manager.ensure_indexes(self.database, manifest, name="gs_analytics")
+        logger.debug(f"Index manifest: {report['status']}")
     
     def insert_document(self, collection_name: str, document: Dict) -> str:
         """Dokuman ekle"""